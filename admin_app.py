@@ -11,10 +11,13 @@ import time
 import threading
 import random
 import shutil
+import atexit
+import queue
+from concurrent.futures import as_completed, TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from datetime import datetime, timedelta
 from functools import wraps
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, flash, redirect, url_for, session
+from flask import Flask, Response, stream_with_context, render_template, request, jsonify, send_from_directory, send_file, flash, redirect, url_for, session
 from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
 from dotenv import load_dotenv
@@ -24,10 +27,22 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import our main modules
 from core.services.suno_client import SunoClient
+from core.services.suno_async_client import AsyncSunoClient
+from core.services.suno_task_poller import get_suno_poller, task_data_from_callback
+from core.services.suno_credits import get_credit_ledger, InsufficientCreditsError
+from core.services.media_probe import get_media_probe
 from core.services.gemini_client import GeminiClient
 from core.services.image_client import ImageClient
 from core.services.ideogram_client import IdeogramClient
+from core.database.sqlite_connections import get_connection
+from core.database.youtube_channels_db import get_channels_db
+from core.automation.queue_replenisher import QueueReplenisher
 from core.utils.file_manager import FileManager
+from core.utils.task_journal import TaskJournal, TaskJournalWriter, copy_task
+from core.utils.task_archive import TaskArchive, TaskLogBuffer
+from core.utils.task_events import TaskEventBroker, format_sse
+from core.utils.periodic_job import PeriodicJob
+from core.utils.render_queue import get_render_queue, RENDER_PRIORITY_HIGH, RenderCancelledError
 from core.analytics.collector import AnalyticsCollector
 from core.analytics.analyzer import PerformanceAnalyzer
 
@@ -113,11 +128,57 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(32))
 # Import and setup YouTube OAuth system
 from core.auth.youtube_oauth_routes import create_oauth_routes
 
+# Task statuses after which no more progress updates arrive
+TERMINAL_TASK_STATUSES = ('completed', 'failed', 'cancelled')
+
+def _task_timestamp(task):
+    """Best-effort epoch time of a task's last state change, for eviction ordering"""
+    for key in ('completed_at', 'updated_at', 'created_at'):
+        value = task.get(key)
+        if not value:
+            continue
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+        if hasattr(value, 'timestamp'):
+            return value.timestamp()
+    return 0
+
+def task_progress_event(task_id, task, log_line=None):
+    """Build the progress payload pushed to task event stream subscribers"""
+    event = {
+        'task_id': task_id,
+        'status': task.get('status'),
+        'progress': task.get('progress', 0),
+        'current_step': task.get('current_step'),
+    }
+    if log_line:
+        event['log'] = log_line
+    if 'partial_tracks' in task:
+        event['partial_tracks'] = task['partial_tracks']
+        event['tracks_ready'] = task.get('tracks_ready', 0)
+    if task.get('status') in TERMINAL_TASK_STATUSES:
+        event['result'] = task.get('result')
+        event['error'] = task.get('error')
+    return event
+
 # Global state management
 class SystemState:
     def __init__(self):
         self.tasks_file = 'data/generation_tasks.json'
+        self.task_journal = TaskJournal(self.tasks_file)
+        self.task_archive = TaskArchive('data/task_archive.db')
+        self.task_events = TaskEventBroker()
         self.generation_tasks = {}
+        
+        # In-memory task store bounds; finished tasks beyond these move to the archive
+        self.max_tasks_in_memory = int(os.getenv('TASK_STORE_MAX_TASKS', '500'))
+        self.task_ttl_seconds = int(os.getenv('TASK_TTL_HOURS', '24')) * 3600
+        self.task_log_limit = int(os.getenv('TASK_LOG_LIMIT', '200'))
+        self.eviction_interval_seconds = 60
+        self.last_eviction = 0
         self.system_stats = {}
         self.active_sessions = {}
         self.api_status = {}
@@ -126,6 +187,15 @@ class SystemState:
         # Load existing tasks on startup
         self.load_generation_tasks()
         
+        # Task changes are batched and written by a background thread
+        self.task_writer = TaskJournalWriter(
+            self.task_journal,
+            self.snapshot_generation_tasks,
+            flush_interval_ms=int(os.getenv('TASK_FLUSH_INTERVAL_MS', '500'))
+        )
+        self.task_writer.start()
+        self.evict_generation_tasks()
+        
         # Mock objects for removed modules to prevent errors
         self.voice_empire = MockVoiceEmpire()
         self.trending_hijacker = MockTrendingHijacker()
@@ -135,56 +205,111 @@ class SystemState:
         self.music_analytics = MockMusicAnalytics()
         
     def load_generation_tasks(self):
-        """Load generation tasks from file on startup"""
+        """Load generation tasks from the snapshot plus journal on startup"""
         try:
-            # Ensure data directory exists
-            os.makedirs('data', exist_ok=True)
-            
-            if os.path.exists(self.tasks_file):
-                with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                    self.generation_tasks = json.load(f)
-                print(f"📁 Loaded {len(self.generation_tasks)} generation tasks from disk")
-            else:
-                print("📁 No existing generation tasks file found, starting fresh")
+            self.generation_tasks = self.task_journal.load()
+            for task in self.generation_tasks.values():
+                if isinstance(task.get('logs'), list):
+                    task['logs'] = TaskLogBuffer(task['logs'], self.task_log_limit)
+            print(f"📁 Loaded {len(self.generation_tasks)} generation tasks from disk")
         except Exception as e:
             print(f"⚠️ Error loading generation tasks: {e}")
             self.generation_tasks = {}
     
+    def snapshot_generation_tasks(self):
+        """Copy all tasks so they can be serialized while workers keep mutating them"""
+        with self.task_writer.lock:
+            return {task_id: copy_task(task) for task_id, task in list(self.generation_tasks.items())}
+    
     def save_generation_tasks(self):
-        """Save generation tasks to file"""
+        """Write a full snapshot of all tasks and truncate the journal"""
         try:
-            # Ensure data directory exists
-            os.makedirs('data', exist_ok=True)
-            
-            # Convert datetime objects to ISO strings for JSON serialization
-            serializable_tasks = {}
-            for task_id, task in self.generation_tasks.items():
-                task_copy = dict(task)
-                
-                # Convert datetime objects to strings
-                for key in ['created_at', 'completed_at', 'updated_at']:
-                    if key in task_copy and hasattr(task_copy[key], 'isoformat'):
-                        task_copy[key] = task_copy[key].isoformat()
-                
-                serializable_tasks[task_id] = task_copy
-            
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(serializable_tasks, f, indent=2, ensure_ascii=False)
-                
+            self.task_writer.compact()
         except Exception as e:
             print(f"⚠️ Error saving generation tasks: {e}")
     
-    def add_generation_task(self, task_id, task_data):
-        """Add a new generation task and save to disk"""
-        self.generation_tasks[task_id] = task_data
+    def shutdown(self):
+        """Flush pending task changes and fold the journal into the snapshot"""
+        self.task_writer.stop()
         self.save_generation_tasks()
     
-    def update_generation_task(self, task_id, updates):
-        """Update existing generation task and save to disk"""
-        if task_id in self.generation_tasks:
-            self.generation_tasks[task_id].update(updates)
-            self.save_generation_tasks()
-
+    def add_generation_task(self, task_id, task_data):
+        """Add a new generation task; the writer thread persists it"""
+        task_data['logs'] = TaskLogBuffer(task_data.get('logs') or [], self.task_log_limit)
+        with self.task_writer.lock:
+            self.generation_tasks[task_id] = task_data
+            self.task_writer.put(task_id, task_data)
+        self.task_events.publish(task_id, task_progress_event(task_id, task_data))
+        
+        if (len(self.generation_tasks) > self.max_tasks_in_memory or
+                time.time() - self.last_eviction > self.eviction_interval_seconds):
+            self.evict_generation_tasks()
+    
+    def update_generation_task(self, task_id, updates, log_line=None):
+        """Update existing generation task; only the changed fields are persisted"""
+        with self.task_writer.lock:
+            if task_id in self.generation_tasks:
+                task = self.generation_tasks[task_id]
+                task.update(updates)
+                if log_line:
+                    if not isinstance(task.get('logs'), TaskLogBuffer):
+                        task['logs'] = TaskLogBuffer(task.get('logs') or [], self.task_log_limit)
+                    task['logs'].append(log_line)
+                self.task_writer.update(
+                    task_id, updates, log=log_line,
+                    urgent=updates.get('status') in TERMINAL_TASK_STATUSES
+                )
+            else:
+                return
+        self.task_events.publish(task_id, task_progress_event(task_id, task, log_line))
+
+    def get_generation_task(self, task_id):
+        """Find a task in memory, falling back to the on-disk archive"""
+        task = self.generation_tasks.get(task_id)
+        if task is not None:
+            return task
+        try:
+            return self.task_archive.get(task_id)
+        except Exception as e:
+            print(f"⚠️ Error reading archived task {task_id}: {e}")
+            return None
+    
+    def evict_generation_tasks(self):
+        """Move finished tasks past their TTL (or beyond the size cap) into the archive"""
+        self.last_eviction = time.time()
+        cutoff = self.last_eviction - self.task_ttl_seconds
+        
+        with self.task_writer.lock:
+            finished = sorted(
+                ((_task_timestamp(task), task_id) for task_id, task in self.generation_tasks.items()
+                 if task.get('status') in TERMINAL_TASK_STATUSES),
+            )
+            overflow = len(self.generation_tasks) - self.max_tasks_in_memory
+            evict_ids = []
+            for finished_at, task_id in finished:
+                if finished_at < cutoff or len(evict_ids) < overflow:
+                    evict_ids.append(task_id)
+                else:
+                    break
+            if not evict_ids:
+                return 0
+            evicted = {task_id: copy_task(self.generation_tasks[task_id]) for task_id in evict_ids}
+        
+        # Archive before dropping from memory so status lookups never miss
+        try:
+            self.task_archive.archive(evicted)
+        except Exception as e:
+            print(f"⚠️ Error archiving generation tasks: {e}")
+            return 0
+        
+        with self.task_writer.lock:
+            for task_id in evict_ids:
+                self.generation_tasks.pop(task_id, None)
+                self.task_writer.delete(task_id)
+        
+        print(f"🗄️ Archived {len(evict_ids)} finished generation tasks")
+        return len(evict_ids)
+    
     def update_api_status(self):
         """Update API connection status"""
         status = {}
@@ -192,9 +317,8 @@ class SystemState:
         # Suno API
         try:
             if os.getenv('SUNO_API_KEY') and os.getenv('SUNO_API_KEY') != 'your_suno_api_key_here':
-                suno = SunoClient()
-                credit_status = suno.get_credits_with_status()
-                status['suno'] = credit_status
+                # Cached balance; a stale value is refreshed in the background
+                status['suno'] = get_credit_ledger().get_status()
             else:
                 status['suno'] = {'status': 'not_configured', 'credits': 0, 'error': 'API key not configured', 'message': 'Please configure your Suno API key'}
         except Exception as e:
@@ -282,6 +406,36 @@ class SystemState:
 # Global system state
 system_state = SystemState()
 
+# Fold the task journal into a fresh snapshot on shutdown
+atexit.register(system_state.shutdown)
+
+# Channel status follows its credentials; reconciled in one batch instead of on every list_channels()
+channel_reconcile_job = PeriodicJob(
+    'channel-status-reconcile',
+    int(os.getenv('CHANNEL_RECONCILE_INTERVAL_SECONDS', '300')),
+    lambda: get_channels_db().reconcile_channel_statuses()
+)
+channel_reconcile_job.start()
+
+# Keep the gallery's cached file_exists flags in step with the disk
+gallery_file_sweep_job = PeriodicJob(
+    'gallery-file-sweep',
+    int(os.getenv('GALLERY_FILE_SWEEP_INTERVAL_SECONDS', '600')),
+    lambda: get_channels_db().refresh_video_file_flags()
+)
+gallery_file_sweep_job.start()
+
+# Optional: pre-generate tracks so scheduled uploads are queue hits (spends Suno credits)
+queue_replenish_job = None
+if os.getenv('QUEUE_REPLENISH_ENABLED', 'false').lower() == 'true':
+    queue_replenish_job = PeriodicJob(
+        'music-queue-replenish',
+        int(os.getenv('QUEUE_REPLENISH_INTERVAL_SECONDS', '1800')),
+        lambda: QueueReplenisher(get_channels_db()).run_once(),
+        run_immediately=False
+    )
+    queue_replenish_job.start()
+
 # Authentication functions
 from functools import wraps
 from dataclasses import asdict
@@ -295,8 +449,8 @@ def require_auth(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Initialize YouTube OAuth routes
-create_oauth_routes(app, require_auth)
+# Initialize YouTube OAuth routes; a channel's status is reconciled as soon as its credentials change
+create_oauth_routes(app, require_auth, on_credentials_changed=channel_reconcile_job.trigger)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -526,7 +680,8 @@ def api_system_status():
     return jsonify({
         'api_status': system_state.api_status,
         'system_stats': system_state.system_stats,
-        'generation_tasks': system_state.generation_tasks,
+        'generation_tasks': system_state.snapshot_generation_tasks(),
+        'render_queue': get_render_queue().status(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -632,9 +787,10 @@ def run_demo_generation(task_id, parameters):
     
     # Update progress step by step
     def update_progress(progress, step):
-        system_state.generation_tasks[task_id]['progress'] = progress
-        system_state.generation_tasks[task_id]['current_step'] = step
-        system_state.generation_tasks[task_id]['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
+        system_state.update_generation_task(task_id, {
+            'progress': progress,
+            'current_step': step
+        }, log_line=f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
         time.sleep(random.uniform(1, 3))  # Realistic timing
     
     try:
@@ -891,7 +1047,7 @@ def create_demo_project_summary(project_dir, metadata):
 @require_auth
 def api_generation_status(task_id):
     """Get generation task status"""
-    task = system_state.generation_tasks.get(task_id, {})
+    task = system_state.get_generation_task(task_id) or {}
     return jsonify(task)
 
 @app.route('/api/demo/quick-test', methods=['POST'])
@@ -911,7 +1067,7 @@ def api_demo_quick_test():
     task_id = f"demo_quick_{int(time.time())}"
     
     # Store task info
-    system_state.generation_tasks[task_id] = {
+    system_state.add_generation_task(task_id, {
         'id': task_id,
         'status': 'queued',
         'progress': 0,
@@ -921,18 +1077,22 @@ def api_demo_quick_test():
         'created_at': datetime.now().isoformat(),
         'result': None,
         'demo_mode': True
-    }
+    })
     
     # Start demo generation
     def run_quick_demo():
         try:
-            system_state.generation_tasks[task_id]['status'] = 'running'
+            system_state.update_generation_task(task_id, {'status': 'running'})
             result = run_demo_generation(task_id, demo_params)
-            system_state.generation_tasks[task_id]['result'] = result
-            system_state.generation_tasks[task_id]['status'] = 'completed'
+            system_state.update_generation_task(task_id, {
+                'result': result,
+                'status': 'completed'
+            })
         except Exception as e:
-            system_state.generation_tasks[task_id]['status'] = 'failed'
-            system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
+            system_state.update_generation_task(task_id, {
+                'status': 'failed',
+                'result': {'success': False, 'error': str(e)}
+            })
     
     thread = threading.Thread(target=run_quick_demo, daemon=True)
     thread.start()
@@ -960,7 +1120,7 @@ def api_demo_full_process():
     task_id = f"demo_full_{int(time.time())}"
     
     # Store task info
-    system_state.generation_tasks[task_id] = {
+    system_state.add_generation_task(task_id, {
         'id': task_id,
         'status': 'queued',
         'progress': 0,
@@ -970,18 +1130,22 @@ def api_demo_full_process():
         'created_at': datetime.now().isoformat(),
         'result': None,
         'demo_mode': True
-    }
+    })
     
     # Start comprehensive demo
     def run_full_demo():
         try:
-            system_state.generation_tasks[task_id]['status'] = 'running'
+            system_state.update_generation_task(task_id, {'status': 'running'})
             result = run_demo_generation(task_id, demo_params)
-            system_state.generation_tasks[task_id]['result'] = result
-            system_state.generation_tasks[task_id]['status'] = 'completed'
+            system_state.update_generation_task(task_id, {
+                'result': result,
+                'status': 'completed'
+            })
         except Exception as e:
-            system_state.generation_tasks[task_id]['status'] = 'failed'
-            system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
+            system_state.update_generation_task(task_id, {
+                'status': 'failed',
+                'result': {'success': False, 'error': str(e)}
+            })
     
     thread = threading.Thread(target=run_full_demo, daemon=True)
     thread.start()
@@ -1012,10 +1176,10 @@ def trending_hijacker():
 def api_youtube_channels():
     """Get YouTube channels for video gallery (redirect to proper endpoint)"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
-        db = YouTubeChannelsDB()
-        channels = db.list_channels()
+        db = get_channels_db()
+        # The gallery's channel picker only needs these; credentials stay server-side
+        channels = db.list_channels(columns=['id', 'channel_name', 'status', 'oauth_authorized'])
         
         return jsonify({
             'success': True,
@@ -1176,9 +1340,8 @@ def api_music_gallery():
 def api_youtube_channels_statistics():
     """Get comprehensive statistics for all channels"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         stats = db.get_statistics()
         
         return jsonify({
@@ -1226,7 +1389,7 @@ def api_youtube_batch_generate():
     task_id = f"youtube_batch_{int(time.time())}"
     
     # Store task info
-    system_state.generation_tasks[task_id] = {
+    system_state.add_generation_task(task_id, {
         'id': task_id,
         'status': 'queued',
         'progress': 0,
@@ -1237,22 +1400,23 @@ def api_youtube_batch_generate():
         'result': None,
         'youtube_batch': True,
         'batch_size': batch_size
-    }
+    })
     
     def run_youtube_batch():
         try:
             from youtube_empire_manager import YouTubeEmpireManager
             import asyncio
             
-            system_state.generation_tasks[task_id]['status'] = 'running'
+            system_state.update_generation_task(task_id, {'status': 'running'})
             
             manager = YouTubeEmpireManager()
             
             # Update progress
             def update_progress(progress, step):
-                system_state.generation_tasks[task_id]['progress'] = progress
-                system_state.generation_tasks[task_id]['current_step'] = step
-                system_state.generation_tasks[task_id]['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
+                system_state.update_generation_task(task_id, {
+                    'progress': progress,
+                    'current_step': step
+                }, log_line=f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
             
             update_progress(10, "🚀 Inicijuojama YouTube imperija...")
             time.sleep(1)
@@ -1283,19 +1447,23 @@ def api_youtube_batch_generate():
             
             update_progress(100, f"✅ Baigta! Sukurta {len(results)} video projektų")
             
-            system_state.generation_tasks[task_id]['result'] = {
-                'success': True,
-                'videos_generated': len(results),
-                'batch_directory': str(batch_dir),
-                'empire_report': report,
-                'estimated_monthly_revenue': report['empire_overview']['total_estimated_monthly_revenue'],
-                'annual_projection': report['empire_overview']['annual_revenue_projection']
-            }
-            system_state.generation_tasks[task_id]['status'] = 'completed'
+            system_state.update_generation_task(task_id, {
+                'result': {
+                    'success': True,
+                    'videos_generated': len(results),
+                    'batch_directory': str(batch_dir),
+                    'empire_report': report,
+                    'estimated_monthly_revenue': report['empire_overview']['total_estimated_monthly_revenue'],
+                    'annual_projection': report['empire_overview']['annual_revenue_projection']
+                },
+                'status': 'completed'
+            })
             
         except Exception as e:
-            system_state.generation_tasks[task_id]['status'] = 'failed'
-            system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
+            system_state.update_generation_task(task_id, {
+                'status': 'failed',
+                'result': {'success': False, 'error': str(e)}
+            })
     
     thread = threading.Thread(target=run_youtube_batch, daemon=True)
     thread.start()
@@ -2539,10 +2707,10 @@ def generate_channel_content(task_id, channel_id, content_type):
     """Generate content for a specific YouTube channel"""
     
     def update_progress(progress, step):
-        if task_id in system_state.generation_tasks:
-            system_state.generation_tasks[task_id]['progress'] = progress
-            system_state.generation_tasks[task_id]['current_step'] = step
-            system_state.generation_tasks[task_id]['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
+        system_state.update_generation_task(task_id, {
+            'progress': progress,
+            'current_step': step
+        }, log_line=f"[{datetime.now().strftime('%H:%M:%S')}] {step}")
         time.sleep(random.uniform(0.5, 2))
     
     try:
@@ -2586,18 +2754,20 @@ def generate_channel_content(task_id, channel_id, content_type):
             time.sleep(3)
         
         # Mark as completed
-        if task_id in system_state.generation_tasks:
-            system_state.generation_tasks[task_id]['status'] = 'completed'
-            system_state.generation_tasks[task_id]['progress'] = 100
-            system_state.generation_tasks[task_id]['current_step'] = f"✅ {content_type.title()} generation completed!"
-            system_state.generation_tasks[task_id]['completed_at'] = datetime.now()
+        system_state.update_generation_task(task_id, {
+            'status': 'completed',
+            'progress': 100,
+            'current_step': f"✅ {content_type.title()} generation completed!",
+            'completed_at': datetime.now()
+        })
             
     except Exception as e:
         # Mark as failed
-        if task_id in system_state.generation_tasks:
-            system_state.generation_tasks[task_id]['status'] = 'failed'
-            system_state.generation_tasks[task_id]['error'] = str(e)
-            system_state.generation_tasks[task_id]['current_step'] = f"❌ Error: {str(e)}"
+        system_state.update_generation_task(task_id, {
+            'status': 'failed',
+            'error': str(e),
+            'current_step': f"❌ Error: {str(e)}"
+        })
 
 # ===================================================================
 # PROFESSIONAL MUSIC GENERATOR API ENDPOINTS
@@ -2650,7 +2820,7 @@ def api_music_generate():
             'status': 'queued',
             'progress': 0,
             'current_step': 'Initializing music generation...',
-            'created_at': datetime.now(),
+            'created_at': datetime.now().isoformat(),
             'data': data,
             'logs': []
         }
@@ -2677,11 +2847,35 @@ def api_music_generate():
             'error': str(e)
         }), 500
 
+@app.route('/api/suno/callback', methods=['POST'])
+def api_suno_callback():
+    """Receive Suno callBackUrl notifications and resolve the matching pending task.
+    
+    Not behind require_auth: Suno calls it directly, so CALLBACK_URL must carry
+    SUNO_CALLBACK_TOKEN as ?token=...; without a configured token every callback is rejected.
+    """
+    expected_token = os.getenv('SUNO_CALLBACK_TOKEN')
+    if not expected_token:
+        return jsonify({'success': False, 'error': 'Callbacks disabled: SUNO_CALLBACK_TOKEN is not set'}), 403
+    if not secrets.compare_digest(request.args.get('token', ''), expected_token):
+        return jsonify({'success': False, 'error': 'Invalid callback token'}), 403
+    
+    task_data = task_data_from_callback(request.get_json(silent=True))
+    if task_data is None:
+        return jsonify({'success': False, 'error': 'Unrecognised callback payload'}), 400
+    
+    resolved = get_suno_poller().resolve(task_data['taskId'], task_data)
+    print(f"📬 Suno callback for {str(task_data['taskId'])[:8]}: {task_data['status']}"
+          f"{'' if resolved else ' (no pending task)'}")
+    
+    # Always acknowledge so Suno does not retry callbacks for tasks we no longer track
+    return jsonify({'success': True, 'resolved': resolved})
+
 @app.route('/api/music/status/<task_id>')
 @require_auth
 def api_music_status(task_id):
     """Get music generation task status with progressive updates"""
-    task = system_state.generation_tasks.get(task_id, {})
+    task = system_state.get_generation_task(task_id) or {}
     if not task:
         return jsonify({'error': 'Task not found'}), 404
     
@@ -2693,32 +2887,136 @@ def api_music_status(task_id):
     
     return jsonify(response)
 
+def task_cancelled(task_id):
+    """True once the task was cancelled through /api/tasks/<id>/cancel or /api/music/cancel"""
+    task = system_state.generation_tasks.get(task_id)
+    return bool(task) and task.get('status') == 'cancelled'
+
+def process_audio_merge(task_id, tracks, fade_transitions, create_video):
+    """Background merge of batch tracks into one long-form mix (and optionally a video)"""
+    last_percent = {'value': -1}
+
+    def update_progress(percent, step):
+        # FFmpeg reports several times a second; only publish whole-percent changes
+        if percent != last_percent['value'] and not task_cancelled(task_id):
+            last_percent['value'] = percent
+            system_state.update_generation_task(task_id, {'progress': percent, 'current_step': step})
+
+    try:
+        system_state.update_generation_task(task_id, {'status': 'processing'}, log_line=f"Merging {len(tracks)} tracks")
+        from core.utils.audio_merger import AudioMerger
+
+        audio_filename = f"{task_id}.mp3"
+        audio_path = os.path.join('output', 'audio', audio_filename)
+        steps = 90 if create_video else 100
+        merged = AudioMerger().merge(
+            tracks, audio_path, fade_transitions=fade_transitions,
+            progress=lambda percent, step: update_progress(percent * steps // 100, step),
+            render_tag=task_id,
+            is_cancelled=lambda: task_cancelled(task_id)
+        )
+        if not merged['success']:
+            raise Exception(merged['error'])
+
+        result = {
+            'success': True,
+            'merged_audio_url': f"/api/files/audio/{audio_filename}",
+            'merged_video_url': None,
+            'total_duration': merged['total_duration'],
+            'track_count': merged['track_count'],
+            'skipped_tracks': merged['skipped_tracks'],
+            'fade_transitions': fade_transitions
+        }
+
+        image_url = next((track.get('image_url') for track in tracks if track.get('image_url')), None)
+        if create_video and image_url:
+            from core.utils.video_creator import VideoCreator
+            if task_cancelled(task_id):
+                raise RenderCancelledError(f"Merge {task_id} cancelled before the video render")
+            update_progress(90, "🎥 Rendering video for the merged mix...")
+            video_filename = f"{task_id}.mp4"
+            video = VideoCreator().create_video(
+                music_url=os.path.abspath(audio_path),
+                thumbnail_url=image_url,
+                output_path=os.path.join('output', 'videos', video_filename),
+                title=f"{merged['track_count']} Track Mix",
+                render_tag=task_id
+            )
+            if video.get('success'):
+                result['merged_video_url'] = f"/api/files/videos/{video_filename}"
+            else:
+                result['video_error'] = video.get('error')
+        elif create_video:
+            result['video_error'] = 'No cover image available for the merged video'
+
+        if task_cancelled(task_id):
+            raise RenderCancelledError(f"Merge {task_id} cancelled")
+        system_state.update_generation_task(task_id, {
+            'status': 'completed',
+            'progress': 100,
+            'current_step': f"✅ Merged {merged['track_count']} tracks ({merged['total_duration'] / 60:.0f} min)",
+            'result': result
+        })
+
+    except RenderCancelledError:
+        # api_task_cancel already marked the task; don't overwrite that with 'failed'
+        print(f"🛑 Audio merge {task_id} cancelled")
+    except Exception as e:
+        print(f"❌ Audio merge failed: {e}")
+        system_state.update_generation_task(task_id, {
+            'status': 'failed',
+            'error': str(e),
+            'result': {'success': False, 'error': str(e)},
+            'current_step': f"❌ Merge failed: {str(e)}"
+        })
+
+def is_allowed_merge_source(url):
+    """Merge inputs must be remote audio or files the app itself wrote under output/audio"""
+    if url.startswith(('http://', 'https://')):
+        return True
+    local_path = Path(url[len('file://'):] if url.startswith('file://') else url).resolve()
+    return local_path.is_relative_to(Path('output/audio').resolve())
+
 @app.route('/api/music/merge-batch', methods=['POST'])
 @require_auth
 def api_music_merge_batch():
-    """Merge multiple audio tracks into single long-form audio and create video"""
+    """Merge multiple audio tracks into single long-form audio and create video (background task)"""
     try:
         data = request.get_json()
-        tracks = data.get('tracks', [])
+        tracks = [track for track in data.get('tracks', []) if track.get('url')]
         fade_transitions = data.get('fade_transitions', True)
         create_video = data.get('create_video', True)
         
         if len(tracks) < 2:
             return jsonify({'error': 'At least 2 tracks required for merging'}), 400
         
-        # TODO: Implement actual audio merging using FFmpeg or similar
-        # For now, return a placeholder response
+        rejected = [track['url'] for track in tracks if not is_allowed_merge_source(str(track['url']))]
+        if rejected:
+            return jsonify({'error': f'Track URLs must be http(s) or files in output/audio: {rejected[0]}'}), 400
+        
+        task_id = f"merge_{int(time.time() * 1000)}"
+        system_state.add_generation_task(task_id, {
+            'task_id': task_id,
+            'type': 'audio_merge',
+            'status': 'queued',
+            'progress': 0,
+            'current_step': f'Queued merge of {len(tracks)} tracks...',
+            'created_at': datetime.now().isoformat(),
+            'logs': []
+        })
         
-        merged_result = {
+        threading.Thread(
+            target=process_audio_merge,
+            args=(task_id, tracks, fade_transitions, create_video),
+            daemon=True
+        ).start()
+        
+        return jsonify({
             'success': True,
-            'merged_audio_url': 'https://example.com/merged-audio.mp3',  # Placeholder
-            'merged_video_url': 'https://example.com/merged-video.mp4' if create_video else None,
-            'total_duration': sum(track.get('duration', 120) for track in tracks),
+            'task_id': task_id,
             'track_count': len(tracks),
-            'fade_transitions': fade_transitions
-        }
-        
-        return jsonify(merged_result)
+            'message': 'Audio merge started'
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2729,8 +3027,11 @@ def api_music_cancel(task_id):
     """Cancel music generation task"""
     task = system_state.generation_tasks.get(task_id)
     if task and task['status'] in ['queued', 'processing']:
-        task['status'] = 'cancelled'
-        task['current_step'] = 'Generation cancelled by user'
+        system_state.update_generation_task(task_id, {
+            'status': 'cancelled',
+            'current_step': 'Generation cancelled by user'
+        })
+        get_render_queue().cancel_tag(task_id)
         return jsonify({'success': True, 'message': 'Task cancelled'})
     return jsonify({'success': False, 'error': 'Task not found or not cancellable'})
 
@@ -2743,13 +3044,18 @@ def api_task_cancel(task_id):
         if not task:
             return jsonify({'success': False, 'error': 'Task not found'})
         
-        if task['status'] not in ['queued', 'processing', 'uploading']:
+        if task['status'] not in ['queued', 'running', 'processing', 'uploading']:
             return jsonify({'success': False, 'error': 'Task is not cancellable'})
         
         # Mark task as cancelled
-        task['status'] = 'cancelled'
-        task['current_step'] = 'Cancelled by user'
-        task['progress'] = 0
+        system_state.update_generation_task(task_id, {
+            'status': 'cancelled',
+            'current_step': 'Cancelled by user',
+            'progress': 0
+        })
+        
+        # Stop any FFmpeg render the task is running or waiting for
+        get_render_queue().cancel_tag(task_id)
         
         # If it's a video upload task, also update video status in video gallery
         if 'youtube_upload_gallery' in task_id:
@@ -2757,8 +3063,7 @@ def api_task_cancel(task_id):
                 video_id = task.get('video_id')
                 if video_id:
                     # Update video status to ready (so it can be retried)
-                    from core.database.youtube_channels_db import YouTubeChannelsDB
-                    video_db = YouTubeChannelsDB()
+                    video_db = get_channels_db()
                     video_db.update_video_upload_status(video_id, {
                         'upload_status': 'ready',
                         'upload_response': {'error': 'Cancelled by user'}
@@ -2776,24 +3081,25 @@ def api_task_cancel(task_id):
 def api_video_cancel_upload(video_id):
     """Cancel video upload for specific video"""
     try:
-        # Find any active upload task for this video
+        # Find any active upload task for this video (under the lock: eviction may resize the dict)
         upload_task_id = None
-        for task_id, task in system_state.generation_tasks.items():
-            if ('youtube_upload_gallery' in task_id and 
-                task.get('video_id') == video_id and
-                task['status'] in ['queued', 'processing', 'uploading']):
-                upload_task_id = task_id
-                break
+        with system_state.task_writer.lock:
+            for task_id, task in system_state.generation_tasks.items():
+                if ('youtube_upload_gallery' in task_id and 
+                    task.get('video_id') == video_id and
+                    task['status'] in ['queued', 'running', 'processing', 'uploading']):
+                    upload_task_id = task_id
+                    break
         
         if upload_task_id:
             # Cancel the task
-            task = system_state.generation_tasks[upload_task_id]
-            task['status'] = 'cancelled'
-            task['current_step'] = 'Upload cancelled by user'
+            system_state.update_generation_task(upload_task_id, {
+                'status': 'cancelled',
+                'current_step': 'Upload cancelled by user'
+            })
         
         # Update video status to ready (so it can be retried)
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        video_db = YouTubeChannelsDB()
+        video_db = get_channels_db()
         video_db.update_video_upload_status(video_id, {
             'upload_status': 'ready',
             'upload_response': {'error': 'Cancelled by user'}
@@ -2872,12 +3178,8 @@ def process_music_extension(task_id, data):
                 'progress': progress,
                 'current_step': step
             }
-            if log_message:
-                if 'logs' not in task:
-                    task['logs'] = []
-                task['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] {log_message}")
-                updates['logs'] = task['logs']
-            system_state.update_generation_task(task_id, updates)
+            log_line = f"[{datetime.now().strftime('%H:%M:%S')}] {log_message}" if log_message else None
+            system_state.update_generation_task(task_id, updates, log_line=log_line)
         
         # Update status to processing
         system_state.update_generation_task(task_id, {'status': 'processing'})
@@ -2946,12 +3248,8 @@ def process_music_generation(task_id, data):
                 'progress': progress,
                 'current_step': step
             }
-            if log_message:
-                if 'logs' not in task:
-                    task['logs'] = []
-                task['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] {log_message}")
-                updates['logs'] = task['logs']
-            system_state.update_generation_task(task_id, updates)
+            log_line = f"[{datetime.now().strftime('%H:%M:%S')}] {log_message}" if log_message else None
+            system_state.update_generation_task(task_id, updates, log_line=log_line)
         
         # Update status to processing
         system_state.update_generation_task(task_id, {'status': 'processing'})
@@ -2996,10 +3294,11 @@ def process_music_generation(task_id, data):
             suno = SunoClient()
             update_progress(55, "🔑 Validating API credentials...", "Checking Suno API key")
             
-            # Check credits first
-            credits = suno.get_credits()
-            if credits <= 0:
-                raise Exception("Insufficient Suno AI credits. Please add credits to your account at https://api.sunoapi.org/")
+            # Admit the job against the projected balance before submitting anything
+            is_batch_mode = data.get('batch_mode', False)
+            track_count = data.get('track_count', 1)
+            reserved_generations = max(1, track_count // 2) if is_batch_mode and track_count > 1 else 1
+            credits = get_credit_ledger().reserve(reserved_generations)
                 
             update_progress(60, f"💳 Credits available: {credits}", f"Ready to generate with {credits} credits")
             
@@ -3007,13 +3306,12 @@ def process_music_generation(task_id, data):
             if credits < 10:
                 update_progress(62, f"⚠️ Low credits warning: {credits} remaining", "Consider topping up soon")
             
+        except InsufficientCreditsError:
+            raise
         except Exception as e:
             raise Exception(f"Suno API connection failed: {str(e)}")
         
         # Check if this is batch mode (specialized with multiple tracks)
-        is_batch_mode = data.get('batch_mode', False)
-        track_count = data.get('track_count', 1)
-        
         if is_batch_mode and track_count > 1:
             update_progress(65, f"🎵 Preparing batch generation: {track_count} tracks...", "Starting specialized batch generation")
             try:
@@ -3070,6 +3368,8 @@ def process_music_generation(task_id, data):
                 raise Exception("Suno API returned null/empty response")
                 
         except Exception as suno_error:
+            if reserved_generations == 1:
+                get_credit_ledger().release(1)
             error_msg = f"Suno API call failed: {str(suno_error)}"
             update_progress(0, f"❌ {error_msg}", error_msg)
             raise Exception(error_msg)
@@ -3090,9 +3390,11 @@ def process_music_generation(task_id, data):
             update_progress(100, "🎉 Batch generation complete!", f"Generated {generation_result.get('track_count', 0)} tracks")
             
             # Mark task as completed with batch result
-            task['status'] = 'completed'
-            task['result'] = generation_result
-            task['completed_at'] = datetime.now().isoformat()
+            system_state.update_generation_task(task_id, {
+                'status': 'completed',
+                'result': generation_result,
+                'completed_at': datetime.now().isoformat()
+            })
             return jsonify({'message': 'Batch generation completed!', 'task_id': task_id})
         
         # Single track mode - wait for completion with real-time updates
@@ -3225,91 +3527,71 @@ def process_music_generation(task_id, data):
             'progress': 0,
             'current_step': f"❌ Generation failed: {str(e)}",
             'result': {'error': str(e)}
-        })
-        task['logs'].append(f"[{datetime.now().strftime('%H:%M:%S')}] ERROR: {str(e)}")
+        }, log_line=f"[{datetime.now().strftime('%H:%M:%S')}] ERROR: {str(e)}")
 
 def wait_for_completion_with_progressive_updates(suno, task_id, task, update_progress, max_wait_time=300):
-    """Wait for Suno completion with progressive track updates"""
-    import time
+    """Wait for Suno completion with progressive track updates.
     
+    Polling is done by the shared SunoTaskPoller; this thread only waits on the future.
+    """
     start_time = time.time()
-    check_interval = 3  # Check every 3 seconds for faster updates
     last_track_count = 0
     
     update_progress(75, "🎵 Waiting for Suno AI generation...", "Starting generation process")
     
-    while time.time() - start_time < max_wait_time:
-        try:
-            # Get current status
-            task_data = suno.get_task_status(task_id)
-            
-            if not task_data:
-                time.sleep(check_interval)
-                continue
-            
-            status = task_data.get('status', 'UNKNOWN')
-            elapsed = int(time.time() - start_time)
-            
-            update_progress(
-                75 + (elapsed / max_wait_time) * 20,  # Progress from 75% to 95% over time
-                f"🎛️ Suno AI working... ({elapsed}s)",
-                f"Status: {status}"
-            )
+    def on_update(task_data):
+        nonlocal last_track_count
+        status = task_data.get('status', 'UNKNOWN')
+        elapsed = int(time.time() - start_time)
+        
+        update_progress(
+            75 + (elapsed / max_wait_time) * 20,  # Progress from 75% to 95% over time
+            f"🎛️ Suno AI working... ({elapsed}s)",
+            f"Status: {status}"
+        )
+        
+        # Check for partial results
+        if 'response' in task_data and task_data['response']:
+            suno_data = task_data['response'].get('sunoData', [])
             
-            # Check for partial results
-            if 'response' in task_data and task_data['response']:
-                suno_data = task_data['response'].get('sunoData', [])
+            # If we have new tracks, update the task with partial results
+            if len(suno_data) > last_track_count:
+                update_progress(
+                    80 + (len(suno_data) * 5),  # More progress as tracks appear
+                    f"🎵 {len(suno_data)} track(s) ready for preview!",
+                    "Processing audio streams..."
+                )
                 
-                # If we have new tracks, update the task with partial results
-                if len(suno_data) > last_track_count:
-                    update_progress(
-                        80 + (len(suno_data) * 5),  # More progress as tracks appear
-                        f"🎵 {len(suno_data)} track(s) ready for preview!",
-                        "Processing audio streams..."
-                    )
-                    
-                    # Store partial results for progressive loading
-                    partial_tracks = []
-                    for i, track in enumerate(suno_data):
-                        processed_track = {
-                            'clip_number': i + 1,
-                            'title': track.get('title', f"Track {i + 1}"),
-                            'audio_url': track.get('streamAudioUrl') or track.get('audioUrl') or track.get('sourceStreamAudioUrl'),
-                            'image_url': track.get('imageUrl') or track.get('sourceImageUrl'),
-                            'duration': track.get('duration'),
-                            'suno_clip_id': track.get('id'),
-                            'tags': track.get('tags', ''),
-                            'prompt': track.get('prompt', ''),
-                            'model_name': track.get('modelName'),
-                            'ready': bool(track.get('streamAudioUrl') or track.get('audioUrl')),  # Is playable?
-                            'loading': not bool(track.get('duration'))  # Still processing?
-                        }
-                        partial_tracks.append(processed_track)
-                    
-                    # Update task with partial results for progressive loading
-                    task['partial_tracks'] = partial_tracks
-                    task['tracks_ready'] = len([t for t in partial_tracks if t['ready']])
-                    
-                    last_track_count = len(suno_data)
-            
-            # Check completion status
-            if status in ['SUCCESS', 'TEXT_SUCCESS', 'AUDIO_SUCCESS', 'COMPLETE']:
-                return task_data
-            elif status in ['FAILED', 'CREATE_TASK_FAILED', 'GENERATE_AUDIO_FAILED']:
-                error_msg = task_data.get('errorMessage', task_data.get('msg', 'Unknown error'))
-                raise Exception(f"Generation failed: {error_msg}")
-            elif status == 'SENSITIVE_WORD_ERROR':
-                raise Exception("Content policy violation")
-            
-            time.sleep(check_interval)
-            
-        except Exception as e:
-            if "Generation failed" in str(e) or "Content policy" in str(e):
-                raise e
-            # For other errors, continue waiting
-            time.sleep(check_interval)
+                # Store partial results for progressive loading
+                partial_tracks = []
+                for i, track in enumerate(suno_data):
+                    processed_track = {
+                        'clip_number': i + 1,
+                        'title': track.get('title', f"Track {i + 1}"),
+                        'audio_url': track.get('streamAudioUrl') or track.get('audioUrl') or track.get('sourceStreamAudioUrl'),
+                        'image_url': track.get('imageUrl') or track.get('sourceImageUrl'),
+                        'duration': track.get('duration'),
+                        'suno_clip_id': track.get('id'),
+                        'tags': track.get('tags', ''),
+                        'prompt': track.get('prompt', ''),
+                        'model_name': track.get('modelName'),
+                        'ready': bool(track.get('streamAudioUrl') or track.get('audioUrl')),  # Is playable?
+                        'loading': not bool(track.get('duration'))  # Still processing?
+                    }
+                    partial_tracks.append(processed_track)
+                
+                # Update task with partial results for progressive loading
+                system_state.update_generation_task(task.get('task_id'), {
+                    'partial_tracks': partial_tracks,
+                    'tracks_ready': len([t for t in partial_tracks if t['ready']])
+                })
+                
+                last_track_count = len(suno_data)
     
-    raise Exception(f'Generation timeout after {max_wait_time} seconds')
+    future = get_suno_poller().track(suno_task_id=task_id, client=suno, on_update=on_update,
+                                     max_wait_time=max_wait_time)
+    # The poller enforces max_wait_time itself; the extra margin only guards against a stalled poller
+    return future.result(timeout=max_wait_time + 60)
 
 def save_to_music_gallery(track_data):
     """Save generated track to music gallery"""
@@ -3650,151 +3932,95 @@ def handle_batch_generation(task_id, data, suno, suno_request, update_progress):
     
     update_progress(75, f"🚀 Starting {api_requests_needed} simultaneous API calls...", "All batches will be generated in parallel")
     
-    # Make all API calls simultaneously
-    import threading
-    import queue
-    
-    results_queue = queue.Queue()
+    # Submit all batches concurrently on one event loop (bounded by SUNO_MAX_CONCURRENCY);
+    # every batch gets a result, late ones are reported as failures rather than dropped
+    submissions = AsyncSunoClient().generate_many_sync(batch_requests, request_deadline=60)
     
-    def generate_single_batch(batch_info):
-        try:
-            batch_num = batch_info['batch_num']
-            print(f"🔧 DEBUG - Batch {batch_num+1}: Calling Suno API with:")
-            print(f"   Prompt: {batch_info['prompt']}")
-            print(f"   Params: {batch_info['params']}")
-            
-            # Generate this batch (will create 2 tracks)
-            generation_result = suno.generate_music_simple(
-                prompt=batch_info['prompt'],
-                **batch_info['params']
-            )
-            
-            print(f"🔧 DEBUG - Batch {batch_num+1} result: {generation_result}")
-            
-            results_queue.put({
-                'batch_num': batch_num,
-                'result': generation_result,
-                'success': bool(generation_result),
-                'error': None
-            })
-            
-        except Exception as e:
-            print(f"❌ Batch {batch_num+1} failed: {e}")
-            results_queue.put({
-                'batch_num': batch_num,
-                'result': None,
-                'success': False,
-                'error': str(e)
-            })
-    
-    # Start all threads simultaneously
-    threads = []
-    for batch_info in batch_requests:
-        thread = threading.Thread(target=generate_single_batch, args=(batch_info,))
-        thread.start()
-        threads.append(thread)
-    
-    # Collect results as they come in
     task_ids = [None] * api_requests_needed  # Pre-allocate list
-    completed_batches = 0
-    
-    while completed_batches < api_requests_needed:
-        try:
-            result = results_queue.get(timeout=30)  # Wait up to 30 seconds for each result
-            batch_num = result['batch_num']
-            
-            if result['success']:
-                task_ids[batch_num] = result['result']
-                update_progress(
-                    75 + ((completed_batches + 1) * 15 // api_requests_needed),
-                    f"✅ Batch {batch_num+1} queued successfully",
-                    f"Task ID: {str(result['result'])[:8]}... ({completed_batches + 1}/{api_requests_needed} complete)"
-                )
-            else:
-                update_progress(
-                    75 + ((completed_batches + 1) * 15 // api_requests_needed),
-                    f"⚠️ Batch {batch_num+1} failed to queue",
-                    f"Error: {result['error'][:30]}... ({completed_batches + 1}/{api_requests_needed} complete)"
-                )
-            
-            completed_batches += 1
-            
-        except queue.Empty:
+    for completed_batches, result in enumerate(submissions, start=1):
+        batch_num = result['batch_num']
+        
+        if result['success']:
+            task_ids[batch_num] = result['result']
             update_progress(
                 75 + (completed_batches * 15 // api_requests_needed),
-                f"⏳ Waiting for batch results... ({completed_batches}/{api_requests_needed})",
-                "Some API calls are taking longer than expected"
+                f"✅ Batch {batch_num+1} queued successfully",
+                f"Task ID: {str(result['result'])[:8]}... ({completed_batches}/{api_requests_needed} complete)"
+            )
+        else:
+            update_progress(
+                75 + (completed_batches * 15 // api_requests_needed),
+                f"⚠️ Batch {batch_num+1} failed to queue",
+                f"Error: {result['error'][:30]}... ({completed_batches}/{api_requests_needed} complete)"
             )
-            break
-    
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join(timeout=5)  # Give each thread 5 seconds to finish
     
     # Filter out None results (failed batches)
     task_ids = [task_id for task_id in task_ids if task_id is not None]
+    # Refund the credits reserved for batches Suno never accepted
+    get_credit_ledger().release(api_requests_needed - len(task_ids))
     
     update_progress(90, f"🎯 All API calls complete! Queued {len(task_ids)} successful batches", f"Now waiting for generation to complete...")
     
-    # Wait for all batches to complete
+    # Wait for all batches at once: the shared poller tracks them together, so the
+    # total wait is the slowest batch rather than the sum of all of them
     update_progress(90, f"⏳ Waiting for {len(task_ids)} batches to complete...", f"Each batch generates 2 tracks (total: {track_count} tracks)")
     
-    completed_audio_urls = []
-    track_counter = 0
+    poller = get_suno_poller()
+    batch_futures = {
+        poller.track(str(task_id), client=suno, max_wait_time=300): i
+        for i, task_id in enumerate(task_ids)
+    }
     
-    for i, task_id in enumerate(task_ids):
-        try:
-            update_progress(
-                90 + (i * 8 // len(task_ids)), 
-                f"⏳ Waiting for batch {i+1}/{len(task_ids)}...", 
-                f"Task: {str(task_id)[:8]}... (expecting 2 tracks)"
-            )
-            
-            # Wait for this specific batch
-            track_result = suno.wait_for_generation_completion(str(task_id), max_wait_time=300)
-            
-            if track_result and track_result.get('status') in ['SUCCESS', 'COMPLETE']:
-                # Extract audio URLs from the completed batch (should be 2 tracks)
+    batch_results = [None] * len(task_ids)
+    finished_batches = 0
+    try:
+        for future in as_completed(batch_futures, timeout=360):
+            i = batch_futures[future]
+            finished_batches += 1
+            try:
+                track_result = future.result()
+                batch_results[i] = track_result
+                
                 if 'response' in track_result and 'sunoData' in track_result['response']:
-                    suno_data = track_result['response']['sunoData']
-                    batch_tracks_found = 0
-                    for track in suno_data:
-                        audio_url = track.get('streamAudioUrl') or track.get('audioUrl')
-                        if audio_url:
-                            track_counter += 1
-                            batch_tracks_found += 1
-                            completed_audio_urls.append({
-                                'url': audio_url,
-                                'title': track.get('title', f'Track {track_counter}'),
-                                'duration': track.get('duration', 120),
-                                'track_number': track_counter,
-                                'batch_number': i + 1
-                            })
-                    
                     update_progress(
-                        90 + ((i+1) * 8 // len(task_ids)), 
-                        f"✅ Batch {i+1} completed ({batch_tracks_found} tracks)", 
-                        f"Total ready: {len(completed_audio_urls)} tracks"
+                        90 + (finished_batches * 8 // len(task_ids)), 
+                        f"✅ Batch {i+1} completed ({len(track_result['response']['sunoData'])} tracks)", 
+                        f"{finished_batches}/{len(task_ids)} batches finished"
                     )
                 else:
                     update_progress(
-                        90 + ((i+1) * 8 // len(task_ids)), 
+                        90 + (finished_batches * 8 // len(task_ids)), 
                         f"⚠️ Batch {i+1} - No tracks found in response", 
-                        f"Total ready: {len(completed_audio_urls)} tracks"
+                        f"{finished_batches}/{len(task_ids)} batches finished"
                     )
-            else:
+            except Exception as e:
                 update_progress(
-                    90 + ((i+1) * 8 // len(task_ids)), 
-                    f"❌ Batch {i+1} failed or incomplete", 
-                    f"Status: {track_result.get('status', 'Unknown') if track_result else 'No response'}"
+                    90 + (finished_batches * 8 // len(task_ids)), 
+                    f"❌ Batch {i+1} failed", 
+                    f"Error: {str(e)[:30]}..."
                 )
-        except Exception as e:
-            update_progress(
-                90 + ((i+1) * 8 // len(task_ids)), 
-                f"❌ Batch {i+1} failed", 
-                f"Error: {str(e)[:30]}..."
-            )
+    except FuturesTimeoutError:
+        update_progress(98, "⚠️ Some batches did not finish in time", f"{finished_batches}/{len(task_ids)} batches finished")
+    
+    # Collect tracks in batch order so track numbering is stable
+    completed_audio_urls = []
+    track_counter = 0
+    
+    for i, track_result in enumerate(batch_results):
+        if not track_result or 'response' not in track_result or 'sunoData' not in track_result['response']:
             continue
+        for track in track_result['response']['sunoData']:
+            audio_url = track.get('streamAudioUrl') or track.get('audioUrl')
+            if audio_url:
+                track_counter += 1
+                completed_audio_urls.append({
+                    'url': audio_url,
+                    'title': track.get('title', f'Track {track_counter}'),
+                    'duration': track.get('duration', 120),
+                    'image_url': track.get('imageUrl') or track.get('sourceImageUrl'),
+                    'track_number': track_counter,
+                    'batch_number': i + 1
+                })
     
     if not completed_audio_urls:
         raise Exception("No tracks were successfully generated")
@@ -3928,6 +4154,7 @@ def api_save_config():
         # Update environment variables for current session
         if 'suno_api_key' in data and data['suno_api_key']:
             os.environ['SUNO_API_KEY'] = data['suno_api_key']
+            get_credit_ledger().invalidate()
             print(f"✅ Updated SUNO_API_KEY in memory: {data['suno_api_key'][:8]}...")
         
         if 'suno_model' in data and data['suno_model']:
@@ -4469,10 +4696,10 @@ def api_create_video():
             }), 400
         
         # Create background task for video creation
-        task_id = f"video_creation_{int(time.time())}"
+        task_id = f"video_creation_{int(time.time() * 1000)}"
         
         # Store task info
-        system_state.generation_tasks[task_id] = {
+        system_state.add_generation_task(task_id, {
             'id': task_id,
             'status': 'running',
             'progress': 0,
@@ -4482,21 +4709,22 @@ def api_create_video():
             'created_at': datetime.now().isoformat(),
             'result': None,
             'type': 'video_creation'
-        }
+        })
         
         # Start video creation in background
         def create_video_background():
             try:
                 from core.utils.video_creator import VideoCreator
-                import requests
                 import tempfile
                 import os
                 
                 video_creator = VideoCreator()
                 
                 # Update progress
-                system_state.generation_tasks[task_id]['progress'] = 10
-                system_state.generation_tasks[task_id]['current_step'] = 'Downloading audio file...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 10,
+                    'current_step': 'Preparing audio...'
+                })
                 
                 # Handle audio and image files (demo mode support)
                 with tempfile.TemporaryDirectory() as temp_dir:
@@ -4513,30 +4741,30 @@ def api_create_video():
                         else:
                             raise Exception("Demo audio file not found")
                     else:
-                        # Download real audio
-                        audio_response = requests.get(audio_url, timeout=30)
-                        audio_response.raise_for_status()
-                        audio_path = os.path.join(temp_dir, 'audio.mp3')
-                        with open(audio_path, 'wb') as f:
-                            f.write(audio_response.content)
+                        # Real audio is streamed straight into FFmpeg by the video creator
+                        audio_path = audio_url
                     
-                    system_state.generation_tasks[task_id]['progress'] = 30
-                    system_state.generation_tasks[task_id]['current_step'] = 'Processing image file...'
+                    system_state.update_generation_task(task_id, {
+                        'progress': 30,
+                        'current_step': 'Processing image file...'
+                    })
                     
                     # Handle image file
                     if image_url and os.path.exists(image_url):
                         # Local file path
                         image_path = image_url
                     else:
-                        # Download image (works for both demo and real URLs)
-                        image_response = requests.get(image_url, timeout=30)
-                        image_response.raise_for_status()
+                        # Download image (works for both demo and real URLs), streamed to disk
                         image_path = os.path.join(temp_dir, 'image.png')
-                        with open(image_path, 'wb') as f:
-                            f.write(image_response.content)
+                        if not video_creator.download_file(image_url, image_path, "image"):
+                            raise Exception(f"Failed to download image: {image_url}")
                     
-                    system_state.generation_tasks[task_id]['progress'] = 50
-                    system_state.generation_tasks[task_id]['current_step'] = 'Creating video...'
+                    if task_cancelled(task_id):
+                        raise RenderCancelledError(f"Video creation {task_id} cancelled before rendering")
+                    system_state.update_generation_task(task_id, {
+                        'progress': 50,
+                        'current_step': 'Creating video...'
+                    })
                     
                     # Create video
                     output_dir = 'output/videos'
@@ -4546,9 +4774,15 @@ def api_create_video():
                         image_path=image_path,
                         audio_path=audio_path, 
                         output_path=output_dir,
-                        title=track_title
+                        title=track_title,
+                        priority=RENDER_PRIORITY_HIGH,
+                        render_tag=task_id
                     )
                     
+                    # The creator reports a killed render as a plain failure
+                    if task_cancelled(task_id):
+                        raise RenderCancelledError(f"Video creation {task_id} cancelled")
+                    
                     if success:
                         # Find created video file
                         safe_title = "".join(c for c in track_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -4560,12 +4794,13 @@ def api_create_video():
                             file_size_bytes = os.path.getsize(video_file)
                             file_size_mb = file_size_bytes / (1024 * 1024)
                             
-                            system_state.generation_tasks[task_id]['progress'] = 90
-                            system_state.generation_tasks[task_id]['current_step'] = 'Adding video to gallery...'
+                            system_state.update_generation_task(task_id, {
+                                'progress': 90,
+                                'current_step': 'Adding video to gallery...'
+                            })
                             
                             # Add video to gallery
-                            from core.database.youtube_channels_db import YouTubeChannelsDB
-                            db = YouTubeChannelsDB()
+                            db = get_channels_db()
                             
                             # Prepare video data for gallery
                             video_data = {
@@ -4590,20 +4825,22 @@ def api_create_video():
                             
                             gallery_result = db.add_to_video_gallery(video_data)
                             
-                            system_state.generation_tasks[task_id]['progress'] = 100
-                            system_state.generation_tasks[task_id]['current_step'] = f'Video created and added to gallery! ({file_size_mb:.1f} MB)'
-                            system_state.generation_tasks[task_id]['status'] = 'completed'
-                            system_state.generation_tasks[task_id]['result'] = {
-                                'success': True,
-                                'video_path': video_file,
-                                'video_url': f'/api/files/videos/{safe_title}.mp4',
-                                'file_size_bytes': file_size_bytes,
-                                'file_size_mb': round(file_size_mb, 1),
-                                'audio_source': 'demo' if 'demo_assets' in audio_path else 'downloaded',
-                                'image_source': 'downloaded',
-                                'gallery_video_id': gallery_result.get('video_id') if gallery_result['success'] else None,
-                                'added_to_gallery': gallery_result['success']
-                            }
+                            system_state.update_generation_task(task_id, {
+                                'progress': 100,
+                                'current_step': f'Video created and added to gallery! ({file_size_mb:.1f} MB)',
+                                'status': 'completed',
+                                'result': {
+                                    'success': True,
+                                    'video_path': video_file,
+                                    'video_url': f'/api/files/videos/{safe_title}.mp4',
+                                    'file_size_bytes': file_size_bytes,
+                                    'file_size_mb': round(file_size_mb, 1),
+                                    'audio_source': 'demo' if 'demo_assets' in audio_path else 'downloaded',
+                                    'image_source': 'downloaded',
+                                    'gallery_video_id': gallery_result.get('video_id') if gallery_result['success'] else None,
+                                    'added_to_gallery': gallery_result['success']
+                                }
+                            })
                         else:
                             raise Exception("Video file was not created")
                     else:
@@ -4612,11 +4849,16 @@ def api_create_video():
                         print(f"❌ VideoCreator result: {result}")
                         raise Exception("Video creation failed")
                         
+            except RenderCancelledError:
+                # api_task_cancel already marked the task; don't overwrite that with 'failed'
+                print(f"🛑 Video creation {task_id} cancelled")
             except Exception as e:
-                system_state.generation_tasks[task_id]['status'] = 'failed'
-                system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
-                system_state.generation_tasks[task_id]['progress'] = -1
-                system_state.generation_tasks[task_id]['current_step'] = f'Failed: {str(e)}'
+                system_state.update_generation_task(task_id, {
+                    'status': 'failed',
+                    'result': {'success': False, 'error': str(e)},
+                    'progress': -1,
+                    'current_step': f'Failed: {str(e)}'
+                })
         
         # Start background thread
         import threading
@@ -4751,7 +4993,7 @@ def api_upload_to_youtube():
         task_id = f"youtube_upload_{int(time.time())}"
         
         # Store task info
-        system_state.generation_tasks[task_id] = {
+        system_state.add_generation_task(task_id, {
             'id': task_id,
             'status': 'running', 
             'progress': 0,
@@ -4761,14 +5003,16 @@ def api_upload_to_youtube():
             'created_at': datetime.now().isoformat(),
             'result': None,
             'type': 'youtube_upload'
-        }
+        })
         
         # Start YouTube upload in background
         def upload_youtube_background():
             try:
                 # Generate metadata using Gemini
-                system_state.generation_tasks[task_id]['progress'] = 20
-                system_state.generation_tasks[task_id]['current_step'] = 'Generating metadata with Gemini AI...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 20,
+                    'current_step': 'Generating metadata with Gemini AI...'
+                })
                 
                 from core.services.gemini_client import GeminiClient
                 gemini_client = GeminiClient()
@@ -4795,12 +5039,13 @@ def api_upload_to_youtube():
                 
                 metadata_response = gemini_client.generate_content(prompt)
                 
-                system_state.generation_tasks[task_id]['progress'] = 50
-                system_state.generation_tasks[task_id]['current_step'] = 'Uploading to YouTube...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 50,
+                    'current_step': 'Uploading to YouTube...'
+                })
                 
                 # Get channel credentials from database
-                from core.database.youtube_channels_db import YouTubeChannelsDB
-                db = YouTubeChannelsDB()
+                db = get_channels_db()
                 channel = db.get_channel(channel_id)
                 
                 if not channel:
@@ -4810,8 +5055,10 @@ def api_upload_to_youtube():
                 if not channel.get('api_key') or not channel.get('client_id') or not channel.get('client_secret'):
                     raise Exception(f"Channel {channel['channel_name']} is missing YouTube API credentials. Please configure them in Channel Settings.")
                 
-                system_state.generation_tasks[task_id]['progress'] = 60
-                system_state.generation_tasks[task_id]['current_step'] = 'Initializing YouTube API...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 60,
+                    'current_step': 'Initializing YouTube API...'
+                })
                 
                 # Parse metadata response
                 try:
@@ -4877,8 +5124,7 @@ def api_upload_to_youtube():
                         credentials.refresh(Request())
                         
                         # Update database with new token
-                        from core.database.youtube_channels_db import YouTubeChannelsDB
-                        db = YouTubeChannelsDB()
+                        db = get_channels_db()
                         updated_creds = oauth_creds.copy()
                         updated_creds.update({
                             'token': credentials.token,
@@ -4890,8 +5136,10 @@ def api_upload_to_youtube():
                     # Create YouTube service
                     youtube_service = build('youtube', 'v3', credentials=credentials)
                     
-                    system_state.generation_tasks[task_id]['progress'] = 80
-                    system_state.generation_tasks[task_id]['current_step'] = f'Uploading to {channel["channel_name"]}...'
+                    system_state.update_generation_task(task_id, {
+                        'progress': 80,
+                        'current_step': f'Uploading to {channel["channel_name"]}...'
+                    })
                     
                     # Prepare video metadata
                     from pathlib import Path
@@ -4938,7 +5186,7 @@ def api_upload_to_youtube():
                             if status:
                                 uploaded_bytes = status.resumable_progress
                                 progress = 80 + (uploaded_bytes / file_size) * 15  # 80-95% range
-                                system_state.generation_tasks[task_id]['progress'] = min(int(progress), 95)
+                                system_state.update_generation_task(task_id, {'progress': min(int(progress), 95)})
                         except Exception as e:
                             print(f"⚠️  Upload chunk failed, retrying: {e}")
                             continue
@@ -4947,16 +5195,18 @@ def api_upload_to_youtube():
                     
                     if video_id:
                         video_url = f'https://www.youtube.com/watch?v={video_id}'
-                        system_state.generation_tasks[task_id]['progress'] = 100
-                        system_state.generation_tasks[task_id]['current_step'] = f'Successfully uploaded! Video ID: {video_id}'
-                        system_state.generation_tasks[task_id]['status'] = 'completed'
-                        system_state.generation_tasks[task_id]['result'] = {
-                            'success': True,
-                            'video_id': video_id,
-                            'video_url': video_url,
-                            'metadata': metadata,
-                            'channel_name': channel['channel_name']
-                        }
+                        system_state.update_generation_task(task_id, {
+                            'progress': 100,
+                            'current_step': f'Successfully uploaded! Video ID: {video_id}',
+                            'status': 'completed',
+                            'result': {
+                                'success': True,
+                                'video_id': video_id,
+                                'video_url': video_url,
+                                'metadata': metadata,
+                                'channel_name': channel['channel_name']
+                            }
+                        })
                     else:
                         raise Exception("Upload failed - no video ID returned")
                         
@@ -4973,10 +5223,12 @@ def api_upload_to_youtube():
                         del os.environ['YOUTUBE_CHANNEL_ID']
                 
             except Exception as e:
-                system_state.generation_tasks[task_id]['status'] = 'failed'
-                system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
-                system_state.generation_tasks[task_id]['progress'] = -1
-                system_state.generation_tasks[task_id]['current_step'] = f'Failed: {str(e)}'
+                system_state.update_generation_task(task_id, {
+                    'status': 'failed',
+                    'result': {'success': False, 'error': str(e)},
+                    'progress': -1,
+                    'current_step': f'Failed: {str(e)}'
+                })
         
         # Start background thread
         import threading
@@ -5000,25 +5252,15 @@ def api_upload_to_youtube():
 def api_list_youtube_channels():
     """List available YouTube channels with full database integration and credential validation"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         
-        # Get validate_credentials parameter from query string
+        # Get validate_credentials parameter from query string (annotates only, never writes)
         validate_credentials = request.args.get('validate_credentials', 'true').lower() == 'true'
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
         
-        channels = db.list_channels(validate_credentials=validate_credentials)
-        
-        # Debug: Log API credentials and validation status in the channels list
-        print(f"📤 Backend channels list - Found {len(channels)} channels (validation: {validate_credentials})")
-        for channel in channels:
-            print(f"   Channel {channel.get('id')}: API credentials = {
-                'api_key: ***set***' if channel.get('api_key') else 'api_key: empty'
-            }, {
-                'client_id: ***set***' if channel.get('client_id') else 'client_id: empty'
-            }, {
-                'client_secret: ***set***' if channel.get('client_secret') else 'client_secret: empty'
-            }, Status: {channel.get('status')}, Validation: {channel.get('credential_status', {}).get('status') if validate_credentials else 'not_checked'}")
+        channels = db.list_channels(validate_credentials=validate_credentials, limit=limit, offset=offset)
         
         return jsonify({
             'success': True,
@@ -5040,7 +5282,6 @@ def api_list_youtube_channels():
 def api_save_youtube_channel():
     """Save YouTube channel (create or update)"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
         data = request.get_json() or {}
         
@@ -5063,7 +5304,7 @@ def api_save_youtube_channel():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         
         # Check if updating existing channel
         channel_id = data.get('channel_id')
@@ -5116,9 +5357,8 @@ def api_save_youtube_channel():
 def api_delete_youtube_channel(channel_id):
     """Delete YouTube channel"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         result = db.delete_channel(channel_id)
         
         if result['success']:
@@ -5139,9 +5379,8 @@ def api_delete_youtube_channel(channel_id):
 def api_get_youtube_channel(channel_id):
     """Get specific YouTube channel details"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         channel = db.get_channel(channel_id)
         
         if channel:
@@ -5175,10 +5414,9 @@ def api_get_youtube_channel(channel_id):
 def api_enable_channel_automation(channel_id):
     """Enable 24/7 automation for a channel"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         from core.automation.youtube_automation import get_automation_engine
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         automation_engine = get_automation_engine()
         
         # Enable automation in database
@@ -5244,7 +5482,6 @@ def api_youtube_test_connection():
 def api_validate_channel_credentials():
     """Validate specific channel's YouTube API credentials"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
         data = request.get_json() or {}
         channel_id = data.get('channel_id')
@@ -5255,7 +5492,7 @@ def api_validate_channel_credentials():
                 'error': 'Channel ID is required'
             }), 400
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         channel = db.get_channel(channel_id)
         
         if not channel:
@@ -5369,7 +5606,6 @@ def api_youtube_start_oauth():
     """Start OAuth authorization flow for a channel"""
     try:
         from google_auth_oauthlib.flow import InstalledAppFlow
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         import threading
         import time
         
@@ -5479,7 +5715,6 @@ def api_complete_oauth():
     """Complete OAuth authorization with authorization code"""
     try:
         from google_auth_oauthlib.flow import InstalledAppFlow
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         import json
         
         data = request.get_json() or {}
@@ -5526,7 +5761,7 @@ def api_complete_oauth():
             credentials = flow.credentials
             
             # Store credentials in database
-            db = YouTubeChannelsDB()
+            db = get_channels_db()
             
             # Convert credentials to JSON for storage
             credentials_data = {
@@ -5565,6 +5800,7 @@ def api_complete_oauth():
                     
                     # Save to database
                     result = db.save_channel(channel_data)
+                    channel_reconcile_job.trigger()
                     
                     return jsonify({
                         'success': True,
@@ -5612,7 +5848,6 @@ def api_complete_oauth():
 def api_refresh_channel_stats_v2():
     """Refresh channel statistics from YouTube API"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         from core.youtube_api_client import youtube_client
         
         data = request.get_json() or {}
@@ -5628,7 +5863,7 @@ def api_refresh_channel_stats_v2():
                 'error': 'Channel ID is required'
             }), 400
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         channel = db.get_channel(channel_id)
         
         if not channel:
@@ -5691,11 +5926,10 @@ def api_refresh_channel_stats_v2():
 def api_get_youtube_channel_details_v2(youtube_channel_id):
     """Get detailed YouTube channel information using channel's API key"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         from core.youtube_api_client import youtube_client
         
         # Find channel in database by YouTube channel ID
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         channels = db.list_channels()
         
         # Find the channel with matching youtube_channel_id
@@ -5813,6 +6047,19 @@ def serve_video_file(filename):
             'error': str(e)
         }), 404
 
+@app.route('/api/files/audio/<filename>')
+@require_auth
+def serve_audio_file(filename):
+    """Serve merged audio files"""
+    try:
+        from flask import send_from_directory
+        return send_from_directory('output/audio', filename)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+
 @app.route('/api/files/images/<filename>')
 @require_auth
 def serve_image_file(filename):
@@ -5831,7 +6078,6 @@ def serve_image_file(filename):
 def api_generate_channel_content(channel_id):
     """Generate content for specific YouTube channel"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         import uuid
         import threading
         
@@ -5841,7 +6087,7 @@ def api_generate_channel_content(channel_id):
         print(f"🎬 Generate content request: channel_id={channel_id}, type={content_type}")
         
         # Get channel data
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         channel = db.get_channel(channel_id)
         
         if not channel:
@@ -5885,12 +6131,11 @@ def api_generate_channel_content(channel_id):
             # Start thumbnail generation in background thread
             def generate_thumbnail_task():
                 try:
-                    from core.database.youtube_channels_db import YouTubeChannelsDB
                     import json
                     import random
                     import os
                     
-                    db = YouTubeChannelsDB()
+                    db = get_channels_db()
                     
                     # Add task to database
                     task_data = {
@@ -5945,7 +6190,7 @@ def api_generate_channel_content(channel_id):
                             update_progress(3, "Thumbnail Generated Successfully", f"Saved: {thumbnail_path}")
                             
                             # Save result to database
-                            with sqlite3.connect(db.db_path) as conn:
+                            with get_connection(db.db_path) as conn:
                                 cursor = conn.cursor()
                                 cursor.execute('''
                                     UPDATE background_tasks 
@@ -5980,12 +6225,11 @@ def api_generate_channel_content(channel_id):
             # Start full video generation pipeline in background thread
             def generate_full_video_pipeline():
                 try:
-                    from core.database.youtube_channels_db import YouTubeChannelsDB
                     import json
                     import random
                     import os
                     
-                    db = YouTubeChannelsDB()
+                    db = get_channels_db()
                     
                     # Add task to database
                     task_data = {
@@ -6029,6 +6273,7 @@ def api_generate_channel_content(channel_id):
                     music_title = None
                     music_clip_id = None
                     music_duration = None
+                    credit_reserved = False
                     
                     try:
                         # Generate AI-driven vocal vs instrumental decision (80% vocal by default)
@@ -6039,12 +6284,12 @@ def api_generate_channel_content(channel_id):
                         # QUEUE CHECK: First try to use existing track from queue
                         update_progress(4, "🔍 Checking music queue", f"Looking for {vocal_type} {genre} track...")
                         
-                        from core.database.youtube_channels_db import YouTubeChannelsDB
-                        queue_db = YouTubeChannelsDB()
+                        queue_db = get_channels_db()
                         queued_track = queue_db.get_queued_track(
                             channel_id=channel_id,
                             genre=genre,
-                            vocal_type=vocal_type
+                            vocal_type=vocal_type,
+                            task_id=task_id
                         )
                         
                         if queued_track:
@@ -6071,160 +6316,158 @@ def api_generate_channel_content(channel_id):
                             # Build comprehensive music prompt using the same logic as generate music page
                             music_prompt = f"Create a professional {genre} track {'with beautiful vocals and lyrics' if is_vocal else 'instrumental'}, perfect for YouTube background music, relaxing and atmospheric, high quality production"
                         
-                        # Build request data matching the real music generation system
-                        music_data = {
-                            'mode': 'simple',
-                            'genre_category': 'ambient',  # Use ambient as base for YouTube background music
-                            'genre_specific': genre,
-                            'music_type': 'vocal' if is_vocal else 'instrumental', 
-                            'make_instrumental': not is_vocal,
-                            'wait_audio': True,
-                            'suno_model': os.getenv('SUNO_MODEL', 'V4')
-                        }
-                        
-                        update_progress(10, "🔑 Connecting to Suno AI", "Establishing API connection")
-                        
-                        # Initialize Suno client with real error handling
-                        from core.services.suno_client import SunoClient
-                        suno = SunoClient()
-                        
-                        # Check credits first (use the real get_credits method)
-                        credits_info = suno.get_credits()
-                        if isinstance(credits_info, dict):
-                            credits = credits_info.get('credits', 0)
-                        else:
-                            credits = credits_info if credits_info else 0
+                            # Build request data matching the real music generation system
+                            music_data = {
+                                'mode': 'simple',
+                                'genre_category': 'ambient',  # Use ambient as base for YouTube background music
+                                'genre_specific': genre,
+                                'music_type': 'vocal' if is_vocal else 'instrumental', 
+                                'make_instrumental': not is_vocal,
+                                'wait_audio': True,
+                                'suno_model': os.getenv('SUNO_MODEL', 'V4')
+                            }
                             
-                        if credits < 10:
-                            raise Exception(f"Insufficient Suno AI credits: {credits} remaining. Need at least 10 credits.")
-                        
-                        update_progress(15, "💳 Credits verified", f"{credits} credits available")
-                        
-                        # Build Suno API parameters
-                        suno_params = {
-                            'model': music_data.get('suno_model', 'V4_5PLUS'),  # Use model from frontend or default
-                            'instrumental': music_data['make_instrumental']
-                        }
-                        
-                        update_progress(20, "🎛️ Generating music", "Sending request to Suno AI...")
-                        
-                        # Use the same logic as process_music_generation for consistency
-                        if is_vocal:
-                            # Use advanced generation for vocal tracks 
-                            generation_result = suno.generate_music_advanced(
-                                prompt=music_prompt,
-                                style=genre,
-                                title="",  # Let Suno auto-generate
-                                instrumental=False,
-                                model=suno_params['model']
-                            )
-                        else:
-                            # Use simple generation for instrumental tracks
-                            generation_result = suno.generate_music_simple(
-                                prompt=music_prompt,
-                                **suno_params
+                            update_progress(10, "🔑 Connecting to Suno AI", "Establishing API connection")
+                            
+                            # Initialize Suno client with real error handling
+                            from core.services.suno_client import SunoClient
+                            suno = SunoClient()
+                            
+                            # Reserve credits against the cached balance (no blocking API call)
+                            credits = get_credit_ledger().reserve(1)
+                            credit_reserved = True
+                            
+                            update_progress(15, "💳 Credits verified", f"{credits} credits available")
+                            
+                            # Build Suno API parameters
+                            suno_params = {
+                                'model': music_data.get('suno_model', 'V4_5PLUS'),  # Use model from frontend or default
+                                'instrumental': music_data['make_instrumental']
+                            }
+                            
+                            update_progress(20, "🎛️ Generating music", "Sending request to Suno AI...")
+                            
+                            # Use the same logic as process_music_generation for consistency
+                            if is_vocal:
+                                # Use advanced generation for vocal tracks 
+                                generation_result = suno.generate_music_advanced(
+                                    prompt=music_prompt,
+                                    style=genre,
+                                    title="",  # Let Suno auto-generate
+                                    instrumental=False,
+                                    model=suno_params['model']
+                                )
+                            else:
+                                # Use simple generation for instrumental tracks
+                                generation_result = suno.generate_music_simple(
+                                    prompt=music_prompt,
+                                    **suno_params
+                                )
+                            
+                            update_progress(25, "⏳ Processing Suno response", "Waiting for generation...")
+                            
+                            if not generation_result:
+                                raise Exception("Suno API returned empty response")
+                            
+                            # Extract task ID and wait for completion (matching real process)
+                            if isinstance(generation_result, dict) and 'taskId' in generation_result:
+                                suno_task_id = generation_result['taskId']
+                            elif isinstance(generation_result, str):
+                                suno_task_id = generation_result
+                            else:
+                                suno_task_id = generation_result.get('id') or str(generation_result)
+                            
+                            update_progress(30, f"🎵 Suno task created", f"Task ID: {suno_task_id[:8]}...")
+                            
+                            # Wait for completion with progressive updates
+                            def wait_update_progress(progress_val, step_msg, log_msg=""):
+                                # Map the progress to our range (30-70%)
+                                mapped_progress = min(70, 30 + int((progress_val - 75) * 0.4) if progress_val >= 75 else 30)
+                                update_progress(mapped_progress, step_msg, log_msg)
+                            
+                            # Use the wait function defined in this file (no import needed)
+                            
+                            # Create a mock task object for the wait function
+                            mock_task = {'status': 'processing'}
+                            
+                            suno_result = wait_for_completion_with_progressive_updates(
+                                suno, suno_task_id, mock_task, wait_update_progress, max_wait_time=300
                             )
-                        
-                        update_progress(25, "⏳ Processing Suno response", "Waiting for generation...")
-                        
-                        if not generation_result:
-                            raise Exception("Suno API returned empty response")
-                        
-                        # Extract task ID and wait for completion (matching real process)
-                        if isinstance(generation_result, dict) and 'taskId' in generation_result:
-                            suno_task_id = generation_result['taskId']
-                        elif isinstance(generation_result, str):
-                            suno_task_id = generation_result
-                        else:
-                            suno_task_id = generation_result.get('id') or str(generation_result)
-                        
-                        update_progress(30, f"🎵 Suno task created", f"Task ID: {suno_task_id[:8]}...")
-                        
-                        # Wait for completion with progressive updates
-                        def wait_update_progress(progress_val, step_msg, log_msg=""):
-                            # Map the progress to our range (30-70%)
-                            mapped_progress = min(70, 30 + int((progress_val - 75) * 0.4) if progress_val >= 75 else 30)
-                            update_progress(mapped_progress, step_msg, log_msg)
-                        
-                        # Use the wait function defined in this file (no import needed)
-                        
-                        # Create a mock task object for the wait function
-                        mock_task = {'status': 'processing'}
-                        
-                        suno_result = wait_for_completion_with_progressive_updates(
-                            suno, suno_task_id, mock_task, wait_update_progress, max_wait_time=300
-                        )
-                        
-                        update_progress(70, "🎧 Processing results", "Extracting audio clips")
-                        
-                        if not suno_result:
-                            raise Exception("No response from Suno API")
-                        
-                        # Check status using real process logic
-                        suno_status = suno_result.get('status', '')
-                        if suno_status not in ['SUCCESS', 'TEXT_SUCCESS', 'AUDIO_SUCCESS', 'COMPLETE']:
-                            error_msg = suno_result.get('errorMessage') or suno_result.get('msg', 'Unknown error')
-                            raise Exception(f"Suno generation failed (status: {suno_status}): {error_msg}")
-                        
-                        # Extract clips using real parsing logic 
-                        if 'response' in suno_result and 'sunoData' in suno_result['response']:
-                            audio_clips = suno_result['response']['sunoData']
-                        else:
-                            audio_clips = suno_result.get('data', [])
-                        
-                        if not audio_clips:
-                            raise Exception("No audio clips generated by Suno AI")
-                        
-                        # QUEUE MANAGEMENT: Save ALL clips to music queue (Suno generates 2 tracks)
-                        update_progress(72, "🎵 Processing generated tracks", f"Found {len(audio_clips)} tracks from Suno API")
-                        
-                        # Use first clip for current generation
-                        primary_clip = audio_clips[0]
-                        music_url = primary_clip.get('streamAudioUrl') or primary_clip.get('audioUrl') or primary_clip.get('sourceStreamAudioUrl')
-                        music_title = primary_clip.get('title', f'{genre.title()} Track')
-                        music_clip_id = primary_clip.get('id')
-                        music_duration = primary_clip.get('duration', 'Unknown')
-                        
-                        if not music_url:
-                            raise Exception("No audio URL in Suno response")
-                        
-                        # Save ALL clips to queue for future use (including the one we're using)
-                        try:
-                            tracks_for_queue = []
                             
-                            for i, clip in enumerate(audio_clips):
-                                clip_data = {
-                                    'suno_task_id': suno_task_id,
-                                    'suno_clip_id': clip.get('id'),
-                                    'channel_id': channel_id,
-                                    'genre': genre,
-                                    'title': clip.get('title', f'{genre.title()} Track {i+1}'),
-                                    'audio_url': clip.get('streamAudioUrl') or clip.get('audioUrl') or clip.get('sourceStreamAudioUrl'),
-                                    'video_url': clip.get('imageUrl') or clip.get('sourceImageUrl'),
-                                    'duration': clip.get('duration', 'Unknown'),
-                                    'vocal_type': 'vocal' if is_vocal else 'instrumental',
-                                    'tags': clip.get('tags', '').split(',') if clip.get('tags') else [],
-                                    'prompt': music_prompt,
-                                    'model_name': suno_params['model']
-                                }
-                                tracks_for_queue.append(clip_data)
+                            update_progress(70, "🎧 Processing results", "Extracting audio clips")
                             
-                            # Add to database queue
-                            from core.database.youtube_channels_db import YouTubeChannelsDB
-                            queue_db = YouTubeChannelsDB()
-                            added_count = queue_db.add_to_music_queue(tracks_for_queue, task_id)
+                            if not suno_result:
+                                raise Exception("No response from Suno API")
                             
-                            update_progress(74, f"➕ Added {added_count} tracks to queue", f"Using: {music_title}")
-                            print(f"🎵 ✅ Queue management: Added {added_count} tracks, using '{music_title}' for current video")
+                            # Check status using real process logic
+                            suno_status = suno_result.get('status', '')
+                            if suno_status not in ['SUCCESS', 'TEXT_SUCCESS', 'AUDIO_SUCCESS', 'COMPLETE']:
+                                error_msg = suno_result.get('errorMessage') or suno_result.get('msg', 'Unknown error')
+                                raise Exception(f"Suno generation failed (status: {suno_status}): {error_msg}")
+                            
+                            # Extract clips using real parsing logic 
+                            if 'response' in suno_result and 'sunoData' in suno_result['response']:
+                                audio_clips = suno_result['response']['sunoData']
+                            else:
+                                audio_clips = suno_result.get('data', [])
+                            
+                            if not audio_clips:
+                                raise Exception("No audio clips generated by Suno AI")
+                            
+                            # Suno delivered the clips, so the reserved credit has been spent
+                            credit_reserved = False
+                            
+                            # QUEUE MANAGEMENT: Save ALL clips to music queue (Suno generates 2 tracks)
+                            update_progress(72, "🎵 Processing generated tracks", f"Found {len(audio_clips)} tracks from Suno API")
+                            
+                            # Use first clip for current generation
+                            primary_clip = audio_clips[0]
+                            music_url = primary_clip.get('streamAudioUrl') or primary_clip.get('audioUrl') or primary_clip.get('sourceStreamAudioUrl')
+                            music_title = primary_clip.get('title', f'{genre.title()} Track')
+                            music_clip_id = primary_clip.get('id')
+                            music_duration = primary_clip.get('duration', 'Unknown')
+                            
+                            if not music_url:
+                                raise Exception("No audio URL in Suno response")
+                            
+                            # Save the spare clips to queue for future use (the primary one is used right now)
+                            try:
+                                tracks_for_queue = []
+                                
+                                for i, clip in enumerate(audio_clips[1:], start=1):
+                                    clip_data = {
+                                        'suno_task_id': suno_task_id,
+                                        'suno_clip_id': clip.get('id'),
+                                        'channel_id': channel_id,
+                                        'genre': genre,
+                                        'title': clip.get('title', f'{genre.title()} Track {i+1}'),
+                                        'audio_url': clip.get('streamAudioUrl') or clip.get('audioUrl') or clip.get('sourceStreamAudioUrl'),
+                                        'video_url': clip.get('imageUrl') or clip.get('sourceImageUrl'),
+                                        'duration': clip.get('duration', 'Unknown'),
+                                        'vocal_type': 'vocal' if is_vocal else 'instrumental',
+                                        'tags': clip.get('tags', '').split(',') if clip.get('tags') else [],
+                                        'prompt': music_prompt,
+                                        'model_name': suno_params['model']
+                                    }
+                                    tracks_for_queue.append(clip_data)
+                                
+                                # Add to database queue
+                                queue_db = get_channels_db()
+                                added_count = queue_db.add_to_music_queue(tracks_for_queue, task_id)
+                                
+                                update_progress(74, f"➕ Added {added_count} tracks to queue", f"Using: {music_title}")
+                                print(f"🎵 ✅ Queue management: Added {added_count} tracks, using '{music_title}' for current video")
+                                
+                            except Exception as queue_error:
+                                # Don't fail the whole pipeline if queue fails
+                                print(f"🎵 ⚠️ Queue save failed (non-critical): {queue_error}")
+                                update_progress(73, "⚠️ Queue save failed", "Continuing with main generation...")
                             
-                        except Exception as queue_error:
-                            # Don't fail the whole pipeline if queue fails
-                            print(f"🎵 ⚠️ Queue save failed (non-critical): {queue_error}")
-                            update_progress(73, "⚠️ Queue save failed", "Continuing with main generation...")
-                        
                         update_progress(75, "✅ Music generated successfully", f"Title: {music_title}")
                         
                     except Exception as e:
+                        if credit_reserved:
+                            get_credit_ledger().release(1)
                         error_msg = str(e)
                         print(f"🎵 ❌ Music generation error: {error_msg}")
                         update_progress(30, "❌ Music generation failed", error_msg)
@@ -6344,7 +6587,8 @@ def api_generate_channel_content(channel_id):
                                 thumbnail_url=thumbnail_path,  # This should be the actual image URL
                                 output_path=video_path,
                                 title=video_title,
-                                progress_callback=video_progress_callback
+                                progress_callback=video_progress_callback,
+                                render_tag=task_id
                             )
                             
                             if video_creation_result and video_creation_result.get('success'):
@@ -6466,7 +6710,7 @@ def api_generate_channel_content(channel_id):
                     
                     # Step 7: Add to YouTube upload queue (or save completed upload)
                     try:
-                        db = YouTubeChannelsDB()
+                        db = get_channels_db()
                         
                         # Calculate next upload time based on channel schedule
                         from datetime import datetime, timedelta
@@ -6535,8 +6779,7 @@ def api_generate_channel_content(channel_id):
                         )
                         
                         # Save results to task
-                        import sqlite3
-                        with sqlite3.connect(db.db_path) as conn:
+                        with get_connection(db.db_path) as conn:
                             cursor = conn.cursor()
                             cursor.execute('''
                                 UPDATE background_tasks 
@@ -6610,12 +6853,11 @@ def api_generate_channel_content(channel_id):
 def api_get_background_tasks():
     """Get background tasks for batch operations monitoring"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
         status = request.args.get('status')
         limit = int(request.args.get('limit', 50))
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         tasks = db.get_background_tasks(status=status, limit=limit)
         statistics = db.get_task_statistics()
         
@@ -6639,20 +6881,17 @@ def api_get_background_tasks():
 def api_get_task_status(task_id):
     """Get task status for video gallery upload progress polling"""
     try:
-        # First check in-memory generation tasks (for real-time tasks)
-        if task_id in system_state.generation_tasks:
-            task = system_state.generation_tasks[task_id]
+        # First check generation tasks (in memory, then the archive of finished ones)
+        task = system_state.get_generation_task(task_id)
+        if task is not None:
             return jsonify({
                 'success': True,
                 'task': task
             })
         
         # Then check database background tasks (for persistent tasks)
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        db = YouTubeChannelsDB()
-        tasks = db.get_background_tasks()
-        
-        task = next((t for t in tasks if t['task_id'] == task_id), None)
+        db = get_channels_db()
+        task = db.get_background_task_progress(task_id)
         
         if task:
             return jsonify({
@@ -6673,17 +6912,61 @@ def api_get_task_status(task_id):
             'message': 'Failed to load task status'
         }), 500
 
+@app.route('/api/tasks/<task_id>/events')
+@require_auth
+def api_task_events(task_id):
+    """Server-Sent Events stream of task progress (polling endpoints remain as fallback)"""
+    if system_state.get_generation_task(task_id) is None:
+        return jsonify({'success': False, 'message': 'Task not found'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    
+    def stream():
+        subscriber, complete, current_id = system_state.task_events.subscribe(task_id, last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            
+            task = system_state.get_generation_task(task_id) or {}
+            if not complete:
+                yield format_sse(task_progress_event(task_id, task), current_id)
+            if task.get('status') in TERMINAL_TASK_STATUSES and subscriber.empty():
+                return
+            
+            # Every task write goes through update_generation_task, which publishes to the broker
+            while True:
+                try:
+                    event_id, event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                yield format_sse(event, event_id)
+                if event.get('status') in TERMINAL_TASK_STATUSES:
+                    return
+        finally:
+            system_state.task_events.unsubscribe(task_id, subscriber)
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/background-tasks/<task_id>')
 @require_auth 
 def api_get_background_task(task_id):
-    """Get specific background task details"""
+    """Get specific background task details (?view=progress returns only progress fields)"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        
-        db = YouTubeChannelsDB()
-        tasks = db.get_background_tasks()
         
-        task = next((t for t in tasks if t['task_id'] == task_id), None)
+        db = get_channels_db()
+        if request.args.get('view') == 'progress':
+            task = db.get_background_task_progress(task_id)
+        else:
+            task = db.get_background_task(task_id)
         
         if task:
             return jsonify({
@@ -6713,17 +6996,16 @@ def api_get_background_task(task_id):
 def music_queue_admin():
     """Music Queue Management Interface"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        db = YouTubeChannelsDB()
-        
-        # Get queue statistics
-        stats = db.get_music_queue_stats()
+        db = get_channels_db()
         
-        # Clean up expired tracks
+        # Clean up expired tracks first so the counter-based stats exclude them
         cleaned_count = db.cleanup_expired_tracks()
         if cleaned_count > 0:
             print(f"🗑️ Cleaned up {cleaned_count} expired tracks")
         
+        # Get queue statistics
+        stats = db.get_music_queue_stats()
+        
         return render_template_string('''
 <!DOCTYPE html>
 <html lang="en">
@@ -6931,8 +7213,7 @@ def music_queue_admin():
 def api_queue_cleanup():
     """API endpoint to cleanup expired tracks"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         
         cleaned_count = db.cleanup_expired_tracks()
         
@@ -6953,12 +7234,10 @@ def api_queue_cleanup():
 def api_queue_tracks():
     """API endpoint to get all queue tracks"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        import sqlite3
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         
-        with sqlite3.connect(db.db_path) as conn:
+        with get_connection(db.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT 
@@ -6998,22 +7277,27 @@ def video_gallery():
 def api_get_video_gallery():
     """Get videos from gallery with filters"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
         # Get filter parameters
         status = request.args.get('status')
         upload_status = request.args.get('upload_status')
         genre = request.args.get('genre')
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100 videos
+        vocal_type = request.args.get('vocal_type')
+        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100 videos per page
+        cursor = request.args.get('cursor')
+        view = 'detail' if request.args.get('view') == 'detail' else 'list'
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         
-        # Get videos
-        videos = db.get_video_gallery(
+        # Get one page of videos; pass next_cursor back as ?cursor= for the next page
+        page = db.get_video_gallery_page(
             status=status,
             upload_status=upload_status,
             genre=genre,
-            limit=limit
+            vocal_type=vocal_type,
+            limit=limit,
+            cursor=cursor,
+            view=view
         )
         
         # Get statistics
@@ -7021,9 +7305,11 @@ def api_get_video_gallery():
         
         return jsonify({
             'success': True,
-            'videos': videos,
+            'videos': page['videos'],
             'stats': stats,
-            'count': len(videos)
+            'count': len(page['videos']),
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more']
         })
         
     except Exception as e:
@@ -7038,11 +7324,10 @@ def api_get_video_gallery():
 def api_download_video(video_id):
     """Download video file"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         from pathlib import Path
         import os
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         video = db.get_video_from_gallery(video_id)
         
         if not video:
@@ -7061,61 +7346,92 @@ def api_download_video(video_id):
     except Exception as e:
         return f"Download error: {str(e)}", 500
 
-@app.route('/api/video-gallery/fix-durations', methods=['POST'])
-@require_auth
-def api_fix_video_durations():
-    """Fix video durations by analyzing actual video files"""
+def process_video_duration_scan(task_id):
+    """Background scan: probe every gallery file in parallel and correct stored durations"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        from pathlib import Path
-        import subprocess
-        import json
-        
-        db = YouTubeChannelsDB()
-        videos = db.get_video_gallery(limit=1000)  # Get all videos
-        
+        db = get_channels_db()
+        probe = get_media_probe()
+
+        system_state.update_generation_task(task_id, {
+            'status': 'processing', 'progress': 5, 'current_step': 'Collecting gallery videos...'
+        })
+        videos = []
+        cursor = None
+        while True:
+            page = db.get_video_gallery_page(limit=500, cursor=cursor)
+            videos.extend(video for video in page['videos'] if video.get('file_path') and video.get('file_exists') != 0)
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+
+        def report(done, total):
+            if done == total or done % 25 == 0:
+                system_state.update_generation_task(task_id, {
+                    'progress': 5 + int(90 * done / total),
+                    'current_step': f'Probed {done}/{total} videos'
+                })
+
+        results = probe.probe_many([video['file_path'] for video in videos], progress=report)
+        probe.prune_missing()
+
         fixed_count = 0
         errors = []
-        
         for video in videos:
-            try:
-                file_path = video.get('file_path')
-                if not file_path or not Path(file_path).exists():
-                    continue
-                
-                # Use ffprobe to get video duration
-                cmd = [
-                    'ffprobe', 
-                    '-v', 'quiet', 
-                    '-print_format', 'json', 
-                    '-show_format', 
-                    file_path
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    probe_data = json.loads(result.stdout)
-                    duration_seconds = float(probe_data.get('format', {}).get('duration', 0))
-                    
-                    if duration_seconds > 0:
-                        # Update database with correct duration
-                        db.update_video_duration(video['id'], duration_seconds)
-                        fixed_count += 1
-                        print(f"✅ Fixed duration for video {video['id']}: {duration_seconds:.2f}s")
-                    
-            except Exception as e:
-                error_msg = f"Error processing video {video.get('id', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                print(f"❌ {error_msg}")
-        
+            info = results.get(str(video['file_path']))
+            if not info or not info.get('duration'):
+                errors.append(f"Could not probe video {video['id']}: {video['file_path']}")
+                continue
+            if video.get('duration') is not None and abs(float(video['duration']) - info['duration']) < 0.01:
+                continue
+            if db.update_video_duration(video['id'], info['duration']):
+                fixed_count += 1
+
+        print(f"✅ Duration scan finished: fixed {fixed_count} of {len(videos)} videos")
+        system_state.update_generation_task(task_id, {
+            'status': 'completed',
+            'progress': 100,
+            'current_step': f'Fixed durations for {fixed_count} videos',
+            'result': {
+                'success': True,
+                'fixed_count': fixed_count,
+                'total_videos': len(videos),
+                'errors': errors,
+                'message': f'Fixed durations for {fixed_count} videos'
+            }
+        })
+
+    except Exception as e:
+        print(f"❌ Error fixing video durations: {e}")
+        system_state.update_generation_task(task_id, {
+            'status': 'failed',
+            'result': {'success': False, 'error': str(e)},
+            'current_step': f"❌ Duration scan failed: {str(e)}"
+        })
+
+@app.route('/api/video-gallery/fix-durations', methods=['POST'])
+@require_auth
+def api_fix_video_durations():
+    """Start a background scan that fixes video durations from the actual video files"""
+    try:
+        task_id = f"duration_scan_{int(time.time() * 1000)}"
+        system_state.add_generation_task(task_id, {
+            'task_id': task_id,
+            'type': 'duration_scan',
+            'status': 'queued',
+            'progress': 0,
+            'current_step': 'Queued duration scan...',
+            'created_at': datetime.now().isoformat(),
+            'logs': []
+        })
+
+        threading.Thread(target=process_video_duration_scan, args=(task_id,), daemon=True).start()
+
         return jsonify({
             'success': True,
-            'fixed_count': fixed_count,
-            'total_videos': len(videos),
-            'errors': errors,
-            'message': f'Fixed durations for {fixed_count} videos'
+            'task_id': task_id,
+            'message': 'Duration scan started'
         })
-        
+
     except Exception as e:
         print(f"❌ Error fixing video durations: {e}")
         return jsonify({
@@ -7128,12 +7444,11 @@ def api_fix_video_durations():
 def api_delete_video(video_id):
     """Delete video from gallery"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         
         data = request.get_json() or {}
         delete_file = data.get('delete_file', False)
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         result = db.delete_video_from_gallery(video_id, delete_file)
         
         if result['success']:
@@ -7152,11 +7467,10 @@ def api_delete_video(video_id):
 def api_preview_video(video_id):
     """Stream video file for preview"""
     try:
-        from core.database.youtube_channels_db import YouTubeChannelsDB
         from pathlib import Path
         import os
         
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         video = db.get_video_from_gallery(video_id)
         
         if not video:
@@ -7246,8 +7560,7 @@ def api_upload_video_from_gallery():
             }), 400
         
         # Get video from gallery
-        from core.database.youtube_channels_db import YouTubeChannelsDB
-        db = YouTubeChannelsDB()
+        db = get_channels_db()
         video = db.get_video_from_gallery(video_id)
         
         if not video:
@@ -7268,7 +7581,7 @@ def api_upload_video_from_gallery():
         task_id = f"youtube_upload_gallery_{int(time.time())}"
         
         # Store task info
-        system_state.generation_tasks[task_id] = {
+        system_state.add_generation_task(task_id, {
             'id': task_id,
             'status': 'running', 
             'progress': 0,
@@ -7285,7 +7598,7 @@ def api_upload_video_from_gallery():
             'created_at': datetime.now().isoformat(),
             'result': None,
             'type': 'youtube_upload_gallery'
-        }
+        })
         
         # Update video status to uploading
         db.update_video_upload_status(video_id, {
@@ -7296,12 +7609,13 @@ def api_upload_video_from_gallery():
         # Start YouTube upload in background
         def upload_youtube_from_gallery_background():
             try:
-                system_state.generation_tasks[task_id]['progress'] = 20
-                system_state.generation_tasks[task_id]['current_step'] = 'Loading channel credentials...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 20,
+                    'current_step': 'Loading channel credentials...'
+                })
                 
                 # Get channel credentials from database
-                from core.database.youtube_channels_db import YouTubeChannelsDB
-                db = YouTubeChannelsDB()
+                db = get_channels_db()
                 channel = db.get_channel(channel_id)
                 
                 if not channel:
@@ -7311,8 +7625,10 @@ def api_upload_video_from_gallery():
                 if not channel.get('api_key') or not channel.get('client_id') or not channel.get('client_secret'):
                     raise Exception(f"Channel {channel['channel_name']} is missing YouTube API credentials. Please configure them in Channel Settings.")
                 
-                system_state.generation_tasks[task_id]['progress'] = 40
-                system_state.generation_tasks[task_id]['current_step'] = 'Preparing YouTube API...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 40,
+                    'current_step': 'Preparing YouTube API...'
+                })
                 
                 # Check OAuth credentials
                 oauth_credentials_json = channel.get('oauth_credentials')
@@ -7367,8 +7683,10 @@ def api_upload_video_from_gallery():
                 # Create YouTube service
                 youtube_service = build('youtube', 'v3', credentials=credentials)
                 
-                system_state.generation_tasks[task_id]['progress'] = 60
-                system_state.generation_tasks[task_id]['current_step'] = f'Uploading "{title}" to {channel["channel_name"]}...'
+                system_state.update_generation_task(task_id, {
+                    'progress': 60,
+                    'current_step': f'Uploading "{title}" to {channel["channel_name"]}...'
+                })
                 
                 # Prepare video metadata
                 from pathlib import Path
@@ -7417,7 +7735,7 @@ def api_upload_video_from_gallery():
                         if status:
                             uploaded_bytes = status.resumable_progress
                             progress = 60 + (uploaded_bytes / file_size) * 30  # 60-90% range
-                            system_state.generation_tasks[task_id]['progress'] = min(int(progress), 90)
+                            system_state.update_generation_task(task_id, {'progress': min(int(progress), 90)})
                     except Exception as e:
                         print(f"⚠️  Upload chunk failed, retrying: {e}")
                         continue
@@ -7441,17 +7759,19 @@ def api_upload_video_from_gallery():
                         }
                     })
                     
-                    system_state.generation_tasks[task_id]['progress'] = 100
-                    system_state.generation_tasks[task_id]['current_step'] = f'Successfully uploaded! Video ID: {youtube_video_id}'
-                    system_state.generation_tasks[task_id]['status'] = 'completed'
-                    system_state.generation_tasks[task_id]['result'] = {
-                        'success': True,
-                        'video_id': youtube_video_id,
-                        'video_url': video_url,
-                        'title': title,
-                        'channel_name': channel['channel_name'],
-                        'gallery_video_id': video_id
-                    }
+                    system_state.update_generation_task(task_id, {
+                        'progress': 100,
+                        'current_step': f'Successfully uploaded! Video ID: {youtube_video_id}',
+                        'status': 'completed',
+                        'result': {
+                            'success': True,
+                            'video_id': youtube_video_id,
+                            'video_url': video_url,
+                            'title': title,
+                            'channel_name': channel['channel_name'],
+                            'gallery_video_id': video_id
+                        }
+                    })
                 else:
                     raise Exception("Upload failed - no video ID returned")
                     
@@ -7461,10 +7781,12 @@ def api_upload_video_from_gallery():
                     'upload_status': 'failed'
                 })
                 
-                system_state.generation_tasks[task_id]['status'] = 'failed'
-                system_state.generation_tasks[task_id]['result'] = {'success': False, 'error': str(e)}
-                system_state.generation_tasks[task_id]['progress'] = -1
-                system_state.generation_tasks[task_id]['current_step'] = f'Failed: {str(e)}'
+                system_state.update_generation_task(task_id, {
+                    'status': 'failed',
+                    'result': {'success': False, 'error': str(e)},
+                    'progress': -1,
+                    'current_step': f'Failed: {str(e)}'
+                })
         
         # Start background thread
         import threading
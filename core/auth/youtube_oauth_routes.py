@@ -6,7 +6,7 @@ Dedicated routes for YouTube OAuth 2.0 authentication flows
 
 from flask import Blueprint, request, jsonify, redirect, render_template, session
 from core.auth.youtube_oauth_manager import YouTubeOAuthManager
-from core.database.youtube_channels_db import YouTubeChannelsDB
+from core.database.youtube_channels_db import get_channels_db
 import logging
 import os
 
@@ -16,17 +16,18 @@ youtube_oauth_bp = Blueprint('youtube_oauth', __name__, url_prefix='/oauth/youtu
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def create_oauth_routes(app, require_auth=None):
+def create_oauth_routes(app, require_auth=None, on_credentials_changed=None):
     """
     Create and register YouTube OAuth routes
     
     Args:
         app: Flask application instance
         require_auth: Authentication decorator function
+        on_credentials_changed: Called after a channel's OAuth credentials are stored or revoked
     """
     
     # Initialize managers
-    db_manager = YouTubeChannelsDB()
+    db_manager = get_channels_db()
     oauth_manager = YouTubeOAuthManager(db_manager)
     
     # Create auth decorator helper
@@ -35,6 +36,10 @@ def create_oauth_routes(app, require_auth=None):
             return require_auth(f)
         return f
     
+    def credentials_changed(result):
+        if result.get('success') and on_credentials_changed:
+            on_credentials_changed()
+    
     @youtube_oauth_bp.route('/start/<int:channel_id>')
     def start_oauth_flow(channel_id):
         """Start OAuth authorization flow for a channel"""
@@ -134,6 +139,7 @@ def create_oauth_routes(app, require_auth=None):
                 state_token=state_token,
                 client_secret=client_secret
             )
+            credentials_changed(result)
             
             # Clean up session
             session.pop('oauth_state', None)
@@ -205,6 +211,7 @@ def create_oauth_routes(app, require_auth=None):
                 state_token=state_token,
                 client_secret=client_secret
             )
+            credentials_changed(result)
             
             return jsonify(result)
             
@@ -312,6 +319,7 @@ def create_oauth_routes(app, require_auth=None):
         
         try:
             result = oauth_manager.revoke_authorization(channel_id)
+            credentials_changed(result)
             
             return jsonify(result)
             
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Music Queue Replenisher
+Pre-generates Suno tracks per channel/genre/vocal type so scheduled uploads find them in the music_queue
+"""
+
+import math
+import os
+from concurrent.futures import wait
+from typing import Dict, List, Any, Optional
+
+from core.services.suno_client import SunoClient
+from core.services.suno_credits import get_credit_ledger, InsufficientCreditsError
+from core.services.suno_task_poller import get_suno_poller
+
+# Suno returns two clips per generation request
+CLIPS_PER_GENERATION = 2
+
+
+class QueueReplenisher:
+    """Keeps the music queue stocked ahead of demand, within a credit budget.
+
+    Demand for each active channel is predicted from its ``daily_upload_count``
+    over ``horizon_hours``. It is split evenly across the channel's genres (the
+    pipeline picks one at random), and between vocal and instrumental by the
+    ``vocal_probability`` of its ``upload_hours`` slots. One pass generates at
+    most ``max_generations`` tracks, largest shortfall first. It never takes
+    the projected credit balance below ``min_credits``.
+    """
+
+    def __init__(self, db, horizon_hours: Optional[float] = None, max_generations: Optional[int] = None,
+                 min_credits: Optional[int] = None):
+        self.db = db
+        self.horizon_hours = horizon_hours or float(os.getenv('QUEUE_REPLENISH_HORIZON_HOURS', '24'))
+        self.max_generations = max_generations or int(os.getenv('QUEUE_REPLENISH_MAX_GENERATIONS', '4'))
+        self.min_credits = min_credits if min_credits is not None else int(os.getenv('QUEUE_REPLENISH_MIN_CREDITS', '100'))
+
+    def predict_demand(self, channel: Dict[str, Any]) -> Dict[tuple, float]:
+        """Expected tracks needed per (genre, vocal_type) for one channel over the horizon"""
+        genres = channel.get('selected_genres') or ['lo-fi-hip-hop']
+        uploads = (channel.get('daily_upload_count') or 1) * self.horizon_hours / 24
+
+        slots = [slot for slot in channel.get('upload_hours') or [] if isinstance(slot, dict)]
+        if slots:
+            vocal_share = sum(slot.get('vocal_probability', 0.8) for slot in slots) / len(slots)
+        else:
+            vocal_share = channel.get('vocal_probability', 0.8)
+
+        demand = {}
+        for genre in genres:
+            demand[(genre, 'vocal')] = uploads / len(genres) * vocal_share
+            demand[(genre, 'instrumental')] = uploads / len(genres) * (1 - vocal_share)
+        return demand
+
+    def plan(self) -> List[Dict[str, Any]]:
+        """Shortfalls (in generation requests) per channel/genre/vocal type, largest first"""
+        available = self.db.count_available_tracks()
+        channels = self.db.list_channels(
+            status='active',
+            columns=['id', 'selected_genres', 'upload_hours', 'daily_upload_count', 'vocal_probability']
+        )
+
+        shortfalls = []
+        for channel in channels:
+            for (genre, vocal_type), expected in self.predict_demand(channel).items():
+                missing = math.ceil(expected) - available.get((channel['id'], genre, vocal_type), 0)
+                if expected > 0 and missing > 0:
+                    shortfalls.append({
+                        'channel_id': channel['id'],
+                        'genre': genre,
+                        'vocal_type': vocal_type,
+                        'missing_tracks': missing,
+                        'generations': math.ceil(missing / CLIPS_PER_GENERATION),
+                    })
+
+        shortfalls.sort(key=lambda item: item['missing_tracks'], reverse=True)
+        return shortfalls
+
+    def _submit(self, suno: SunoClient, genre: str, vocal_type: str) -> Optional[str]:
+        """Start one Suno generation the same way the full-video pipeline does; returns its task id"""
+        is_vocal = vocal_type == 'vocal'
+        prompt = f"Create a professional {genre} track {'with beautiful vocals and lyrics' if is_vocal else 'instrumental'}, perfect for YouTube background music, relaxing and atmospheric, high quality production"
+        model = os.getenv('SUNO_MODEL', 'V4')
+
+        if is_vocal:
+            return suno.generate_music_advanced(prompt=prompt, style=genre, title="", instrumental=False, model=model)
+
+        result = suno.generate_music_simple(prompt=prompt, model=model, instrumental=True)
+        return result.get('taskId') if isinstance(result, dict) else result
+
+    def run_once(self) -> int:
+        """Top up the queue once; returns the number of tracks added"""
+        shortfalls = self.plan()
+        if not shortfalls:
+            return 0
+
+        ledger = get_credit_ledger()
+        suno = SunoClient()
+        poller = get_suno_poller()
+        pending = {}
+
+        budget = self.max_generations
+        for shortfall in shortfalls:
+            for _ in range(shortfall['generations']):
+                if budget <= 0:
+                    break
+                # Leave min_credits for interactive generations
+                if ledger.available_credits() - ledger.credits_per_generation < self.min_credits:
+                    print(f"🎵 💳 Queue replenish paused: credits at reserve floor ({self.min_credits})")
+                    budget = 0
+                    break
+                try:
+                    ledger.reserve(1)
+                except InsufficientCreditsError as e:
+                    print(f"🎵 💳 Queue replenish paused: {e}")
+                    budget = 0
+                    break
+
+                suno_task_id = self._submit(suno, shortfall['genre'], shortfall['vocal_type'])
+                if not suno_task_id:
+                    ledger.release(1)
+                    continue
+
+                budget -= 1
+                future = poller.track(suno_task_id, suno, max_wait_time=600)
+                pending[future] = (suno_task_id, shortfall)
+
+        if not pending:
+            return 0
+        print(f"🎵 🔄 Queue replenish: started {len(pending)} generations ahead of demand")
+
+        added = 0
+        done, _ = wait(pending, timeout=660)
+        for future in done:
+            suno_task_id, shortfall = pending[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"🎵 ⚠️ Queue replenish generation {suno_task_id[:8]} failed: {e}")
+                continue
+
+            clips = result.get('response', {}).get('sunoData') or result.get('data') or []
+            clips = [clip for clip in clips if clip.get('streamAudioUrl') or clip.get('audioUrl') or clip.get('sourceStreamAudioUrl')]
+            added += self.db.add_to_music_queue([{
+                'suno_task_id': suno_task_id,
+                'suno_clip_id': clip.get('id'),
+                'channel_id': shortfall['channel_id'],
+                'genre': shortfall['genre'],
+                'title': clip.get('title', f"{shortfall['genre'].title()} Track {i + 1}"),
+                'audio_url': clip.get('streamAudioUrl') or clip.get('audioUrl') or clip.get('sourceStreamAudioUrl'),
+                'video_url': clip.get('imageUrl') or clip.get('sourceImageUrl'),
+                'duration': clip.get('duration', 'Unknown'),
+                'vocal_type': shortfall['vocal_type'],
+                'tags': clip.get('tags', '').split(',') if clip.get('tags') else [],
+                'prompt': clip.get('prompt'),
+                'model_name': clip.get('modelName'),
+            } for i, clip in enumerate(clips)])
+
+        print(f"🎵 ✅ Queue replenish: added {added} tracks")
+        return added
@@ -26,7 +26,7 @@ load_dotenv()
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import our services
-from core.database.youtube_channels_db import YouTubeChannelsDB
+from core.database.youtube_channels_db import get_channels_db
 from core.services.suno_client import SunoClient
 from core.services.gemini_client import GeminiClient
 
@@ -34,7 +34,7 @@ class YouTubeAutomationEngine:
     """Advanced 24/7 YouTube automation engine with AI-driven decisions"""
     
     def __init__(self):
-        self.db = YouTubeChannelsDB()
+        self.db = get_channels_db()
         self.suno = SunoClient()
         self.gemini = GeminiClient()
         
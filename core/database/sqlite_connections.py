@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Thread-local SQLite connections
+Reuses one tuned connection per (thread, database) instead of reconnecting on every query
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Union
+
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+
+_local = threading.local()
+
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=CACHED_STATEMENTS)
+    # WAL lets readers run alongside the single writer; NORMAL is durable across
+    # application crashes and only risks the last commits on power loss
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    return conn
+
+
+class _Checkout:
+    """``with`` block over a thread's shared connection that may nest.
+
+    Only the outermost block of a thread commits or rolls back, so a helper
+    that opens its own ``with get_connection(...)`` inside a caller's block
+    joins that caller's transaction instead of committing it early. The
+    outermost block starts with ``row_factory`` reset; a nested block
+    restores whatever the enclosing block had set when it exits.
+    """
+
+    def __init__(self, key: str, conn: sqlite3.Connection):
+        self.key = key
+        self.conn = conn
+        self.outer_row_factory = None
+
+    def __enter__(self) -> sqlite3.Connection:
+        depths = _local.depths
+        self.outer_row_factory = self.conn.row_factory
+        if not depths.get(self.key):
+            self.conn.row_factory = None
+        depths[self.key] = depths.get(self.key, 0) + 1
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        depths = _local.depths
+        depths[self.key] -= 1
+        if depths[self.key]:
+            self.conn.row_factory = self.outer_row_factory
+            return False
+        return self.conn.__exit__(exc_type, exc_value, traceback)
+
+
+def get_connection(db_path: Union[str, Path]) -> _Checkout:
+    """Connection for the calling thread, opened on first use.
+
+    Use it as ``with get_connection(path) as conn:`` - the outermost block
+    commits or rolls back the transaction but leaves the connection open, so
+    its statement cache survives between calls (see _Checkout for nesting).
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+        _local.depths = {}
+
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = _open_connection(key)
+    return _Checkout(key, conn)
+
+
+def close_connections() -> None:
+    """Close every connection opened by the calling thread"""
+    connections = getattr(_local, 'connections', None) or {}
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
@@ -6,11 +6,87 @@ Comprehensive database management for YouTube automation system
 
 import sqlite3
 import json
+import os
+import re
+import base64
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 import logging
+import threading
+
+from .sqlite_connections import get_connection
+
+logging.basicConfig(level=logging.INFO)
+
+# Ordered schema migrations: (version, description, YouTubeChannelsDB method name).
+# Append new entries with the next version number; never edit an applied one.
+SCHEMA_MIGRATIONS = [
+    (1, 'initial schema', '_migration_initial_schema'),
+    (2, 'oauth columns on youtube_channels', '_migration_oauth_columns'),
+    (3, 'covering index for claiming queued tracks', '_migration_music_queue_claim_index'),
+    (4, 'unique suno_clip_id and video file_path for upserts', '_migration_unique_clip_and_video_path'),
+    (5, 'trigger-maintained statistics counters', '_migration_statistics_counters'),
+    (6, 'gallery keyset index and cached file_exists flag', '_migration_gallery_keyset_and_file_flag'),
+]
+
+# JSON-encoded youtube_channels columns and the value used when they are empty
+CHANNEL_JSON_FIELDS = {'selected_genres': list, 'upload_hours': list, 'advanced_settings': dict}
+
+# Columns _validate_channel_credentials() reads
+CREDENTIAL_COLUMNS = ('api_key', 'client_id', 'client_secret', 'oauth_authorized')
+
+# Counters kept in stats_counters by triggers: table -> [(counter, key, value, condition)].
+# Expressions use {row}, which becomes NEW/OLD in triggers and the table itself on rebuild.
+STATISTICS_COUNTERS = {
+    'youtube_channels': [
+        ('channels', "''", '1', None),
+        ('channels_by_status', '{row}.status', '1', None),
+        ('channels_by_genre', '{row}.primary_genre', '1', '{row}.primary_genre IS NOT NULL'),
+        ('channels_automated', "''", '1', '{row}.automation_enabled = 1'),
+        ('channel_subscribers', "''", '{row}.total_subscribers', None),
+        ('channel_revenue', "''", '{row}.monthly_revenue', None),
+        ('channel_videos', "''", '{row}.total_videos', None),
+        ('channel_views', "''", '{row}.total_views', None),
+    ],
+    'video_generation_queue': [
+        ('generation_queue_by_status', '{row}.status', '1', None),
+    ],
+    'music_queue': [
+        ('music_queue_by_status', '{row}.status', '1', None),
+        ('music_queue_available_by_genre', '{row}.genre', '1', "{row}.status = 'available'"),
+        ('music_queue_available_by_vocal', '{row}.vocal_type', '1', "{row}.status = 'available'"),
+    ],
+    'video_gallery': [
+        ('gallery_by_status', '{row}.status', '1', None),
+        ('gallery_by_upload_status', '{row}.upload_status', '1', None),
+        ('gallery_by_genre', '{row}.genre', '1', '{row}.genre IS NOT NULL'),
+        ('gallery_size_by_status', '{row}.status', '{row}.file_size', None),
+    ],
+}
+
+# video_gallery columns returned for gallery list views (detail views get every column)
+GALLERY_LIST_COLUMNS = (
+    'id', 'video_uuid', 'title', 'description', 'file_path', 'thumbnail_path', 'duration', 'file_size',
+    'genre', 'vocal_type', 'video_title', 'video_description', 'upload_status', 'youtube_video_id',
+    'upload_channel_id', 'uploaded_at', 'status', 'created_at', 'file_exists'
+)
+
+_shared_instances: Dict[str, 'YouTubeChannelsDB'] = {}
+_shared_lock = threading.Lock()
+
+
+def get_channels_db(db_path: str = "data/youtube_channels.db") -> 'YouTubeChannelsDB':
+    """Process-wide YouTubeChannelsDB for a database file (migrated on first access)"""
+    db = _shared_instances.get(db_path)
+    if db is None:
+        with _shared_lock:
+            db = _shared_instances.get(db_path)
+            if db is None:
+                db = _shared_instances[db_path] = YouTubeChannelsDB(db_path)
+    return db
+
 
 class YouTubeChannelsDB:
     """Advanced database manager for YouTube channels with automation features"""
@@ -19,373 +95,507 @@ class YouTubeChannelsDB:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Setup logging
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
+        self._channel_column_names = None
         
         self._init_database()
         
     def _init_database(self):
-        """Initialize database with comprehensive schema"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Main channels table with all automation features
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS youtube_channels (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    channel_uuid TEXT UNIQUE NOT NULL,
-                    channel_name TEXT NOT NULL,
-                    channel_url TEXT,
-                    youtube_channel_id TEXT,
-                    description TEXT,
-                    
-                    -- API Credentials (encrypted in production)
-                    api_key TEXT,
-                    client_id TEXT,
-                    client_secret TEXT,
-                    oauth_token TEXT,
-                    oauth_credentials TEXT,  -- JSON storage for OAuth credentials
-                    oauth_authorized BOOLEAN DEFAULT 0,  -- OAuth authorization status
-                    
-                    -- Music Genre Selection (JSON array)
-                    selected_genres TEXT NOT NULL DEFAULT '[]',
-                    primary_genre TEXT,
-                    target_audience TEXT,
-                    
-                    -- Automation Configuration
-                    auto_upload BOOLEAN DEFAULT 1,
-                    auto_thumbnails BOOLEAN DEFAULT 1,
-                    auto_seo BOOLEAN DEFAULT 1,
-                    enable_analytics BOOLEAN DEFAULT 1,
-                    enable_monetization BOOLEAN DEFAULT 0,
-                    
-                    -- Daily Upload Configuration
-                    daily_upload_count INTEGER DEFAULT 1,
-                    upload_schedule TEXT DEFAULT 'daily',
-                    
-                    -- Hour-specific scheduling (JSON array of time slots)
-                    upload_hours TEXT DEFAULT '[{"hour": 14, "vocal_probability": 0.8}]',
-                    
-                    -- AI Vocal Configuration
-                    vocal_probability REAL DEFAULT 0.8,  -- 80% vocal, 20% instrumental
-                    ai_decision_enabled BOOLEAN DEFAULT 1,
-                    
-                    -- Privacy and Settings
-                    privacy_settings TEXT DEFAULT 'private',
-                    default_video_title_template TEXT DEFAULT '[GENRE] - Relaxing Music #[NUMBER]',
-                    default_description_template TEXT,
-                    
-                    -- Performance Tracking
-                    total_subscribers INTEGER DEFAULT 0,
-                    monthly_revenue REAL DEFAULT 0.0,
-                    total_videos INTEGER DEFAULT 0,
-                    total_views INTEGER DEFAULT 0,
-                    last_upload_date TEXT,
-                    
-                    -- Status and Metadata
-                    status TEXT DEFAULT 'active',  -- active, inactive, needs_setup, error
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    
-                    -- 24/7 Automation Status
-                    automation_enabled BOOLEAN DEFAULT 0,
-                    automation_start_date TEXT,
-                    automation_last_run TEXT,
-                    automation_next_run TEXT,
-                    
-                    -- Advanced Settings (JSON)
-                    advanced_settings TEXT DEFAULT '{}',
-                    error_log TEXT DEFAULT '[]'
-                )
-            ''')
-            
-            # Video generation queue for scheduling
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS video_generation_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    queue_uuid TEXT UNIQUE NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    
-                    -- Generation Parameters
-                    genre TEXT NOT NULL,
-                    vocal_type TEXT NOT NULL,  -- vocal, instrumental
-                    scheduled_time TEXT NOT NULL,
-                    
-                    -- Generation Status
-                    status TEXT DEFAULT 'queued',  -- queued, generating, completed, failed, uploaded
-                    progress INTEGER DEFAULT 0,
-                    
-                    -- Generated Content
-                    music_url TEXT,
-                    thumbnail_url TEXT,
-                    video_title TEXT,
-                    video_description TEXT,
-                    video_tags TEXT,  -- JSON array
-                    
-                    -- Upload Information
-                    youtube_video_id TEXT,
-                    upload_status TEXT,
-                    upload_response TEXT,  -- JSON response from YouTube API
-                    
-                    -- Metadata
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    generated_at TEXT,
-                    uploaded_at TEXT,
-                    
-                    -- Error Handling
-                    error_message TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    max_retries INTEGER DEFAULT 3,
-                    
-                    FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Automation logs for monitoring
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS automation_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    channel_id INTEGER NOT NULL,
-                    log_type TEXT NOT NULL,  -- generation, upload, error, status
-                    message TEXT NOT NULL,
-                    details TEXT,  -- JSON details
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    
-                    FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Performance analytics
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS channel_analytics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    channel_id INTEGER NOT NULL,
-                    date TEXT NOT NULL,
-                    
-                    -- Daily Metrics
-                    videos_generated INTEGER DEFAULT 0,
-                    videos_uploaded INTEGER DEFAULT 0,
-                    new_subscribers INTEGER DEFAULT 0,
-                    total_views INTEGER DEFAULT 0,
-                    estimated_revenue REAL DEFAULT 0.0,
-                    
-                    -- Vocal vs Instrumental Performance
-                    vocal_videos INTEGER DEFAULT 0,
-                    instrumental_videos INTEGER DEFAULT 0,
-                    vocal_avg_views INTEGER DEFAULT 0,
-                    instrumental_avg_views INTEGER DEFAULT 0,
-                    
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    
-                    FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE,
-                    UNIQUE(channel_id, date)
-                )
-            ''')
-            
-            # Background task tracking for batch operations monitoring
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS background_tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id TEXT UNIQUE NOT NULL,
-                    task_type TEXT NOT NULL,  -- full_video, music_only, thumbnail_only, batch_generation
-                    channel_id INTEGER,
-                    
-                    -- Task Configuration
-                    title TEXT,
+        """Apply any schema migrations newer than the database's schema_version"""
+        with get_connection(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
                     description TEXT,
-                    genre TEXT,
-                    vocal_type TEXT,  -- vocal, instrumental
-                    
-                    -- Progress Tracking
-                    status TEXT DEFAULT 'queued',  -- queued, running, completed, failed, cancelled
-                    progress INTEGER DEFAULT 0,  -- 0-100
-                    current_step TEXT,
-                    current_step_detail TEXT,
-                    
-                    -- Results
-                    music_url TEXT,
-                    thumbnail_path TEXT,
-                    video_path TEXT,
-                    seo_metadata TEXT,  -- JSON
-                    
-                    -- Timing
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    started_at TEXT,
-                    completed_at TEXT,
-                    estimated_duration INTEGER,  -- seconds
-                    
-                    -- Error Handling
-                    error_message TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    max_retries INTEGER DEFAULT 3,
-                    
-                    -- Upload Scheduling
-                    scheduled_upload_time TEXT,
-                    upload_status TEXT DEFAULT 'pending',  -- pending, scheduled, uploaded, failed
-                    
-                    FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
+                    applied_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            current_version = conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+        
+        pending = [m for m in SCHEMA_MIGRATIONS if m[0] > current_version]
+        for version, description, method_name in pending:
+            with get_connection(self.db_path) as conn:
+                # DDL is transactional in SQLite: each migration commits atomically with
+                # its schema_version row, and the write lock stops a concurrent migrator
+                conn.execute('BEGIN IMMEDIATE')
+                if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                    continue
+                getattr(self, method_name)(conn.cursor())
+                conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                             (version, description))
+            self.logger.info(f"Applied schema migration {version}: {description}")
+        
+        if pending:
+            self.logger.info("YouTube Channels database initialized successfully")
+    
+    def _migration_initial_schema(self, cursor: sqlite3.Cursor):
+        """Tables and indexes of the original schema (IF NOT EXISTS, so safe on pre-versioned databases)"""
+        # Main channels table with all automation features
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS youtube_channels (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_uuid TEXT UNIQUE NOT NULL,
+                channel_name TEXT NOT NULL,
+                channel_url TEXT,
+                youtube_channel_id TEXT,
+                description TEXT,
+                
+                -- API Credentials (encrypted in production)
+                api_key TEXT,
+                client_id TEXT,
+                client_secret TEXT,
+                oauth_token TEXT,
+                oauth_credentials TEXT,  -- JSON storage for OAuth credentials
+                oauth_authorized BOOLEAN DEFAULT 0,  -- OAuth authorization status
+                
+                -- Music Genre Selection (JSON array)
+                selected_genres TEXT NOT NULL DEFAULT '[]',
+                primary_genre TEXT,
+                target_audience TEXT,
+                
+                -- Automation Configuration
+                auto_upload BOOLEAN DEFAULT 1,
+                auto_thumbnails BOOLEAN DEFAULT 1,
+                auto_seo BOOLEAN DEFAULT 1,
+                enable_analytics BOOLEAN DEFAULT 1,
+                enable_monetization BOOLEAN DEFAULT 0,
+                
+                -- Daily Upload Configuration
+                daily_upload_count INTEGER DEFAULT 1,
+                upload_schedule TEXT DEFAULT 'daily',
+                
+                -- Hour-specific scheduling (JSON array of time slots)
+                upload_hours TEXT DEFAULT '[{"hour": 14, "vocal_probability": 0.8}]',
+                
+                -- AI Vocal Configuration
+                vocal_probability REAL DEFAULT 0.8,  -- 80% vocal, 20% instrumental
+                ai_decision_enabled BOOLEAN DEFAULT 1,
+                
+                -- Privacy and Settings
+                privacy_settings TEXT DEFAULT 'private',
+                default_video_title_template TEXT DEFAULT '[GENRE] - Relaxing Music #[NUMBER]',
+                default_description_template TEXT,
+                
+                -- Performance Tracking
+                total_subscribers INTEGER DEFAULT 0,
+                monthly_revenue REAL DEFAULT 0.0,
+                total_videos INTEGER DEFAULT 0,
+                total_views INTEGER DEFAULT 0,
+                last_upload_date TEXT,
+                
+                -- Status and Metadata
+                status TEXT DEFAULT 'active',  -- active, inactive, needs_setup, error
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                
+                -- 24/7 Automation Status
+                automation_enabled BOOLEAN DEFAULT 0,
+                automation_start_date TEXT,
+                automation_last_run TEXT,
+                automation_next_run TEXT,
+                
+                -- Advanced Settings (JSON)
+                advanced_settings TEXT DEFAULT '{}',
+                error_log TEXT DEFAULT '[]'
+            )
+        ''')
+        
+        # Video generation queue for scheduling
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS video_generation_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                queue_uuid TEXT UNIQUE NOT NULL,
+                channel_id INTEGER NOT NULL,
+                
+                -- Generation Parameters
+                genre TEXT NOT NULL,
+                vocal_type TEXT NOT NULL,  -- vocal, instrumental
+                scheduled_time TEXT NOT NULL,
+                
+                -- Generation Status
+                status TEXT DEFAULT 'queued',  -- queued, generating, completed, failed, uploaded
+                progress INTEGER DEFAULT 0,
+                
+                -- Generated Content
+                music_url TEXT,
+                thumbnail_url TEXT,
+                video_title TEXT,
+                video_description TEXT,
+                video_tags TEXT,  -- JSON array
+                
+                -- Upload Information
+                youtube_video_id TEXT,
+                upload_status TEXT,
+                upload_response TEXT,  -- JSON response from YouTube API
+                
+                -- Metadata
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                generated_at TEXT,
+                uploaded_at TEXT,
+                
+                -- Error Handling
+                error_message TEXT,
+                retry_count INTEGER DEFAULT 0,
+                max_retries INTEGER DEFAULT 3,
+                
+                FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Automation logs for monitoring
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS automation_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id INTEGER NOT NULL,
+                log_type TEXT NOT NULL,  -- generation, upload, error, status
+                message TEXT NOT NULL,
+                details TEXT,  -- JSON details
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                
+                FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Performance analytics
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS channel_analytics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                
+                -- Daily Metrics
+                videos_generated INTEGER DEFAULT 0,
+                videos_uploaded INTEGER DEFAULT 0,
+                new_subscribers INTEGER DEFAULT 0,
+                total_views INTEGER DEFAULT 0,
+                estimated_revenue REAL DEFAULT 0.0,
+                
+                -- Vocal vs Instrumental Performance
+                vocal_videos INTEGER DEFAULT 0,
+                instrumental_videos INTEGER DEFAULT 0,
+                vocal_avg_views INTEGER DEFAULT 0,
+                instrumental_avg_views INTEGER DEFAULT 0,
+                
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                
+                FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE,
+                UNIQUE(channel_id, date)
+            )
+        ''')
+        
+        # Background task tracking for batch operations monitoring
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS background_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT UNIQUE NOT NULL,
+                task_type TEXT NOT NULL,  -- full_video, music_only, thumbnail_only, batch_generation
+                channel_id INTEGER,
+                
+                -- Task Configuration
+                title TEXT,
+                description TEXT,
+                genre TEXT,
+                vocal_type TEXT,  -- vocal, instrumental
+                
+                -- Progress Tracking
+                status TEXT DEFAULT 'queued',  -- queued, running, completed, failed, cancelled
+                progress INTEGER DEFAULT 0,  -- 0-100
+                current_step TEXT,
+                current_step_detail TEXT,
+                
+                -- Results
+                music_url TEXT,
+                thumbnail_path TEXT,
+                video_path TEXT,
+                seo_metadata TEXT,  -- JSON
+                
+                -- Timing
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                started_at TEXT,
+                completed_at TEXT,
+                estimated_duration INTEGER,  -- seconds
+                
+                -- Error Handling
+                error_message TEXT,
+                retry_count INTEGER DEFAULT 0,
+                max_retries INTEGER DEFAULT 3,
+                
+                -- Upload Scheduling
+                scheduled_upload_time TEXT,
+                upload_status TEXT DEFAULT 'pending',  -- pending, scheduled, uploaded, failed
+                
+                FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Music Queue - Store unused tracks from Suno API (2 tracks per generation)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS music_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                queue_uuid TEXT UNIQUE NOT NULL,
+                
+                -- Source Information
+                suno_task_id TEXT NOT NULL,
+                suno_clip_id TEXT NOT NULL,
+                original_task_id TEXT,  -- Background task that generated this
+                
+                -- Channel Association
+                channel_id INTEGER NOT NULL,
+                genre TEXT NOT NULL,
+                
+                -- Track Details
+                title TEXT NOT NULL,
+                audio_url TEXT NOT NULL,
+                video_url TEXT,  -- Suno's image/video URL
+                duration TEXT,  -- duration format like 3:45
+                duration_seconds REAL,  -- For calculations
+                
+                -- Music Properties
+                vocal_type TEXT NOT NULL,  -- 'vocal' or 'instrumental'
+                tags TEXT,  -- Suno tags as JSON array
+                prompt TEXT,  -- Original generation prompt
+                model_name TEXT,  -- Suno model used (V4, etc.)
+                
+                -- Queue Status
+                status TEXT DEFAULT 'available',  -- available, reserved, used, expired
+                priority INTEGER DEFAULT 0,  -- Higher = more important
+                reserved_for_channel INTEGER,  -- Channel ID if reserved
+                reserved_at TEXT,  -- When reserved
+                
+                -- Usage Tracking
+                used_at TEXT,
+                used_for_task TEXT,  -- Task ID that used this track
+                expiry_date TEXT,  -- When this track expires (30 days from creation)
+                
+                -- Quality Metrics
+                quality_score REAL DEFAULT 0.0,  -- 0-1 based on tags, title quality
+                match_score REAL DEFAULT 0.0,  -- How well it matches requested genre
+                
+                -- Metadata
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                
+                FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE,
+                FOREIGN KEY (reserved_for_channel) REFERENCES youtube_channels (id) ON DELETE SET NULL
+            )
+        ''')
+        
+        # Create indexes for performance
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_status ON youtube_channels (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_automation ON youtube_channels (automation_enabled)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_queue_status ON video_generation_queue (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_queue_scheduled ON video_generation_queue (scheduled_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_type ON automation_logs (log_type)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON background_tasks (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_type ON background_tasks (task_type)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_channel ON background_tasks (channel_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_date ON channel_analytics (date)')
+        
+        # Music Queue indexes for fast searching
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_status ON music_queue (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_channel_genre ON music_queue (channel_id, genre, status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_vocal_type ON music_queue (vocal_type, status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_priority ON music_queue (priority DESC, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_expiry ON music_queue (expiry_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_suno_clip ON music_queue (suno_clip_id)')
+        
+        # Video Gallery - Store all generated videos for reuse and upload management
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS video_gallery (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_uuid TEXT UNIQUE NOT NULL,
+                
+                -- Video File Information
+                title TEXT NOT NULL,
+                description TEXT,
+                file_path TEXT NOT NULL,  -- Local path to video file
+                thumbnail_path TEXT,      -- Path to thumbnail image
+                duration REAL,            -- Duration in seconds
+                file_size INTEGER,        -- File size in bytes
+                file_format TEXT DEFAULT 'mp4',
+                
+                -- Generation Details
+                original_task_id TEXT,    -- Background task that created this
+                generation_source TEXT DEFAULT 'suno',  -- suno, manual, other
+                music_track_id TEXT,      -- Reference to music queue entry
+                
+                -- Music Information
+                genre TEXT,
+                vocal_type TEXT,          -- vocal, instrumental
+                music_url TEXT,           -- Original music URL from Suno
+                music_title TEXT,
+                music_tags TEXT,          -- JSON array of music tags
+                
+                -- Video Metadata
+                video_title TEXT,         -- Generated/custom video title
+                video_description TEXT,   -- Generated/custom description
+                video_tags TEXT,          -- JSON array of video tags
+                seo_metadata TEXT,        -- JSON with SEO data
+                
+                -- Upload Status
+                upload_status TEXT DEFAULT 'ready',  -- ready, uploading, uploaded, failed
+                youtube_video_id TEXT,    -- YouTube video ID if uploaded
+                upload_channel_id INTEGER, -- Which channel it was uploaded to
+                uploaded_at TEXT,
+                upload_response TEXT,     -- JSON response from YouTube
+                
+                -- Quality and Performance
+                video_quality TEXT DEFAULT 'HD',  -- SD, HD, FHD
+                processing_time INTEGER,  -- Generation time in seconds
+                
+                -- Status and Metadata
+                status TEXT DEFAULT 'available',  -- available, archived, deleted
+                visibility TEXT DEFAULT 'private', -- public, private, unlisted
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                
+                -- Statistics (filled after upload)
+                view_count INTEGER DEFAULT 0,
+                like_count INTEGER DEFAULT 0,
+                comment_count INTEGER DEFAULT 0,
+                last_stats_update TEXT,
+                
+                -- Notes and Custom Fields
+                notes TEXT,               -- User notes
+                custom_fields TEXT,       -- JSON for additional data
+                
+                FOREIGN KEY (upload_channel_id) REFERENCES youtube_channels (id) ON DELETE SET NULL
+            )
+        ''')
+        
+        # Video Gallery indexes
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_status ON video_gallery (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_upload_status ON video_gallery (upload_status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_genre ON video_gallery (genre)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_created ON video_gallery (created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_channel ON video_gallery (upload_channel_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_youtube_id ON video_gallery (youtube_video_id)')
+        
+    def _migration_oauth_columns(self, cursor: sqlite3.Cursor):
+        """OAuth columns added after the first release"""
+        try:
+            cursor.execute('ALTER TABLE youtube_channels ADD COLUMN oauth_credentials TEXT')
+            print("Added oauth_credentials column")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
+        try:
+            cursor.execute('ALTER TABLE youtube_channels ADD COLUMN oauth_authorized BOOLEAN DEFAULT 0')
+            print("Added oauth_authorized column")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    def _migration_music_queue_claim_index(self, cursor: sqlite3.Cursor):
+        """Index matching claim_tracks(): equality filters, then its ORDER BY"""
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_music_queue_claim ON music_queue
+            (channel_id, genre, vocal_type, status, priority DESC, quality_score DESC, expiry_date)
+        ''')
+    
+    def _migration_unique_clip_and_video_path(self, cursor: sqlite3.Cursor):
+        """Drop duplicate clips/videos (keeping the one already used/uploaded, else the oldest) and make the keys unique"""
+        cursor.execute('''
+            DELETE FROM music_queue WHERE id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY suno_clip_id ORDER BY status = 'available', id
+                    ) AS rank FROM music_queue
+                ) WHERE rank = 1
+            )
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_music_queue_suno_clip')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_music_queue_suno_clip ON music_queue (suno_clip_id)')
+        
+        cursor.execute('''
+            DELETE FROM video_gallery WHERE id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY file_path ORDER BY youtube_video_id IS NULL, id
+                    ) AS rank FROM video_gallery
+                ) WHERE rank = 1
+            )
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_video_gallery_file_path ON video_gallery (file_path)')
+    
+    def _migration_statistics_counters(self, cursor: sqlite3.Cursor):
+        """Trigger-maintained counters behind the dashboard statistics"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_counters (
+                name TEXT NOT NULL,
+                key TEXT NOT NULL DEFAULT '',
+                value REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (name, key)
+            )
+        ''')
+        
+        for table, counters in STATISTICS_COUNTERS.items():
+            def adjustments(row: str, sign: int) -> str:
+                statements = []
+                for name, key, value, condition in counters:
+                    statements.append(f'''
+                        INSERT INTO stats_counters (name, key, value)
+                        SELECT '{name}', COALESCE({key.format(row=row)}, ''), {sign} * COALESCE({value.format(row=row)}, 0)
+                        WHERE {(condition or '1').format(row=row)}
+                        ON CONFLICT (name, key) DO UPDATE SET value = value + excluded.value;''')
+                return ''.join(statements)
             
-            # Music Queue - Store unused tracks from Suno API (2 tracks per generation)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS music_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    queue_uuid TEXT UNIQUE NOT NULL,
-                    
-                    -- Source Information
-                    suno_task_id TEXT NOT NULL,
-                    suno_clip_id TEXT NOT NULL,
-                    original_task_id TEXT,  -- Background task that generated this
-                    
-                    -- Channel Association
-                    channel_id INTEGER NOT NULL,
-                    genre TEXT NOT NULL,
-                    
-                    -- Track Details
-                    title TEXT NOT NULL,
-                    audio_url TEXT NOT NULL,
-                    video_url TEXT,  -- Suno's image/video URL
-                    duration TEXT,  -- duration format like 3:45
-                    duration_seconds REAL,  -- For calculations
-                    
-                    -- Music Properties
-                    vocal_type TEXT NOT NULL,  -- 'vocal' or 'instrumental'
-                    tags TEXT,  -- Suno tags as JSON array
-                    prompt TEXT,  -- Original generation prompt
-                    model_name TEXT,  -- Suno model used (V4, etc.)
-                    
-                    -- Queue Status
-                    status TEXT DEFAULT 'available',  -- available, reserved, used, expired
-                    priority INTEGER DEFAULT 0,  -- Higher = more important
-                    reserved_for_channel INTEGER,  -- Channel ID if reserved
-                    reserved_at TEXT,  -- When reserved
-                    
-                    -- Usage Tracking
-                    used_at TEXT,
-                    used_for_task TEXT,  -- Task ID that used this track
-                    expiry_date TEXT,  -- When this track expires (30 days from creation)
-                    
-                    -- Quality Metrics
-                    quality_score REAL DEFAULT 0.0,  -- 0-1 based on tags, title quality
-                    match_score REAL DEFAULT 0.0,  -- How well it matches requested genre
-                    
-                    -- Metadata
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    
-                    FOREIGN KEY (channel_id) REFERENCES youtube_channels (id) ON DELETE CASCADE,
-                    FOREIGN KEY (reserved_for_channel) REFERENCES youtube_channels (id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Create indexes for performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_status ON youtube_channels (status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_automation ON youtube_channels (automation_enabled)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_queue_status ON video_generation_queue (status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_queue_scheduled ON video_generation_queue (scheduled_time)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_type ON automation_logs (log_type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON background_tasks (status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_type ON background_tasks (task_type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_channel ON background_tasks (channel_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_date ON channel_analytics (date)')
-            
-            # Music Queue indexes for fast searching
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_status ON music_queue (status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_channel_genre ON music_queue (channel_id, genre, status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_vocal_type ON music_queue (vocal_type, status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_priority ON music_queue (priority DESC, created_at)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_expiry ON music_queue (expiry_date)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_queue_suno_clip ON music_queue (suno_clip_id)')
-            
-            # Video Gallery - Store all generated videos for reuse and upload management
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS video_gallery (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    video_uuid TEXT UNIQUE NOT NULL,
-                    
-                    -- Video File Information
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    file_path TEXT NOT NULL,  -- Local path to video file
-                    thumbnail_path TEXT,      -- Path to thumbnail image
-                    duration REAL,            -- Duration in seconds
-                    file_size INTEGER,        -- File size in bytes
-                    file_format TEXT DEFAULT 'mp4',
-                    
-                    -- Generation Details
-                    original_task_id TEXT,    -- Background task that created this
-                    generation_source TEXT DEFAULT 'suno',  -- suno, manual, other
-                    music_track_id TEXT,      -- Reference to music queue entry
-                    
-                    -- Music Information
-                    genre TEXT,
-                    vocal_type TEXT,          -- vocal, instrumental
-                    music_url TEXT,           -- Original music URL from Suno
-                    music_title TEXT,
-                    music_tags TEXT,          -- JSON array of music tags
-                    
-                    -- Video Metadata
-                    video_title TEXT,         -- Generated/custom video title
-                    video_description TEXT,   -- Generated/custom description
-                    video_tags TEXT,          -- JSON array of video tags
-                    seo_metadata TEXT,        -- JSON with SEO data
-                    
-                    -- Upload Status
-                    upload_status TEXT DEFAULT 'ready',  -- ready, uploading, uploaded, failed
-                    youtube_video_id TEXT,    -- YouTube video ID if uploaded
-                    upload_channel_id INTEGER, -- Which channel it was uploaded to
-                    uploaded_at TEXT,
-                    upload_response TEXT,     -- JSON response from YouTube
-                    
-                    -- Quality and Performance
-                    video_quality TEXT DEFAULT 'HD',  -- SD, HD, FHD
-                    processing_time INTEGER,  -- Generation time in seconds
-                    
-                    -- Status and Metadata
-                    status TEXT DEFAULT 'available',  -- available, archived, deleted
-                    visibility TEXT DEFAULT 'private', -- public, private, unlisted
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    
-                    -- Statistics (filled after upload)
-                    view_count INTEGER DEFAULT 0,
-                    like_count INTEGER DEFAULT 0,
-                    comment_count INTEGER DEFAULT 0,
-                    last_stats_update TEXT,
-                    
-                    -- Notes and Custom Fields
-                    notes TEXT,               -- User notes
-                    custom_fields TEXT,       -- JSON for additional data
-                    
-                    FOREIGN KEY (upload_channel_id) REFERENCES youtube_channels (id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Video Gallery indexes
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_status ON video_gallery (status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_upload_status ON video_gallery (upload_status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_genre ON video_gallery (genre)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_created ON video_gallery (created_at DESC)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_channel ON video_gallery (upload_channel_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_youtube_id ON video_gallery (youtube_video_id)')
-            
-            # Add missing columns if they don't exist (migrations)
-            try:
-                cursor.execute('ALTER TABLE youtube_channels ADD COLUMN oauth_credentials TEXT')
-                print("Added oauth_credentials column")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-            
-            try:
-                cursor.execute('ALTER TABLE youtube_channels ADD COLUMN oauth_authorized BOOLEAN DEFAULT 0')
-                print("Added oauth_authorized column")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
+            # Only fire on updates of the columns the counters read
+            columns = sorted({
+                column for counter in counters for expression in counter[1:] if expression
+                for column in re.findall(r'\{row\}\.(\w+)', expression)
+            })
             
-            conn.commit()
-            self.logger.info("YouTube Channels database initialized successfully")
+            cursor.execute(f'DROP TRIGGER IF EXISTS stats_{table}_insert')
+            cursor.execute(f'DROP TRIGGER IF EXISTS stats_{table}_delete')
+            cursor.execute(f'DROP TRIGGER IF EXISTS stats_{table}_update')
+            cursor.execute(f'CREATE TRIGGER stats_{table}_insert AFTER INSERT ON {table} BEGIN {adjustments("NEW", 1)} END')
+            cursor.execute(f'CREATE TRIGGER stats_{table}_delete AFTER DELETE ON {table} BEGIN {adjustments("OLD", -1)} END')
+            cursor.execute(
+                f'CREATE TRIGGER stats_{table}_update AFTER UPDATE OF {", ".join(columns)} ON {table} '
+                f'BEGIN {adjustments("OLD", -1)} {adjustments("NEW", 1)} END'
+            )
+        
+        self._rebuild_statistics(cursor)
+    
+    def _migration_gallery_keyset_and_file_flag(self, cursor: sqlite3.Cursor):
+        """Keyset pagination index and the cached file-existence flag for the gallery"""
+        cursor.execute('ALTER TABLE video_gallery ADD COLUMN file_exists BOOLEAN DEFAULT 1')
+        cursor.execute('ALTER TABLE video_gallery ADD COLUMN file_checked_at TEXT')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_gallery_keyset ON video_gallery (created_at DESC, id DESC)')
+    
+    def _rebuild_statistics(self, cursor: sqlite3.Cursor):
+        cursor.execute('DELETE FROM stats_counters')
+        for table, counters in STATISTICS_COUNTERS.items():
+            for name, key, value, condition in counters:
+                cursor.execute(f'''
+                    INSERT INTO stats_counters (name, key, value)
+                    SELECT '{name}', COALESCE({key.format(row=table)}, ''), SUM(COALESCE({value.format(row=table)}, 0))
+                    FROM {table}
+                    WHERE {(condition or '1').format(row=table)}
+                    GROUP BY 2
+                ''')
+    
+    def rebuild_statistics(self) -> bool:
+        """Recompute every statistics counter from the source tables (repair tool)"""
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                self._rebuild_statistics(conn.cursor())
+            self.logger.info("Statistics counters rebuilt")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error rebuilding statistics: {e}")
+            return False
+    
+    def _read_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """All counters in one read: {counter: {key: value}} (zero entries omitted)"""
+        with get_connection(self.db_path) as conn:
+            rows = conn.execute('SELECT name, key, value FROM stats_counters WHERE value != 0').fetchall()
+        
+        counters: Dict[str, Dict[str, Any]] = {}
+        for name, key, value in rows:
+            counters.setdefault(name, {})[key] = int(value) if float(value).is_integer() else value
+        return counters
     
     def add_channel(self, channel_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a new YouTube channel with comprehensive configuration"""
@@ -423,7 +633,7 @@ class YouTubeChannelsDB:
                 'automated_descriptions': channel_data.get('auto_descriptions', True)
             }
             
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -468,11 +678,13 @@ class YouTubeChannelsDB:
                 ))
                 
                 channel_id = cursor.lastrowid
-                conn.commit()
                 
                 # Log channel creation
                 self._log_event(channel_id, 'channel_created', f'Channel {channel_data.get("channel_name")} created successfully')
                 
+                # Status follows the credentials just written; don't wait for the periodic reconcile
+                self.reconcile_channel_statuses(channel_id)
+                
                 # Get the created channel
                 created_channel = self.get_channel(channel_id)
                 
@@ -517,7 +729,7 @@ class YouTubeChannelsDB:
                 upload_hours = [{"hour": 14, "vocal_probability": 0.8}]
             upload_hours_json = json.dumps(upload_hours)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Update channel
@@ -567,11 +779,12 @@ class YouTubeChannelsDB:
                         'message': 'Channel not found'
                     }
                 
-                conn.commit()
-                
                 # Log update
                 self._log_event(channel_id, 'channel_updated', f'Channel configuration updated')
                 
+                # Status follows the credentials just written; don't wait for the periodic reconcile
+                self.reconcile_channel_statuses(channel_id)
+                
                 # Get updated channel
                 updated_channel = self.get_channel(channel_id)
                 
@@ -592,7 +805,7 @@ class YouTubeChannelsDB:
     def get_channel(self, channel_id: int) -> Optional[Dict[str, Any]]:
         """Get channel by ID with parsed JSON fields"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -623,57 +836,110 @@ class YouTubeChannelsDB:
             self.logger.error(f"Error getting channel {channel_id}: {e}")
             return None
     
-    def list_channels(self, status: Optional[str] = None, validate_credentials: bool = True) -> List[Dict[str, Any]]:
-        """List all channels with optional status filter and credential validation"""
+    def list_channels(self, status: Optional[str] = None, validate_credentials: bool = False,
+                      columns: Optional[List[str]] = None, limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """List channels (read-only) with optional status filter, column projection and pagination.
+
+        ``validate_credentials`` only annotates each channel with ``credential_status``;
+        persisting status changes is done by reconcile_channel_statuses().
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            if columns:
+                unknown = set(columns) - self._channel_columns()
+                if unknown:
+                    raise ValueError(f"Unknown youtube_channels columns: {', '.join(sorted(unknown))}")
+                selected = list(dict.fromkeys(columns))
+                if validate_credentials:
+                    selected += [c for c in CREDENTIAL_COLUMNS if c not in selected]
+                column_sql = ', '.join(selected)
+            else:
+                column_sql = '*'
+            
+            query = f'SELECT {column_sql} FROM youtube_channels'
+            params: List[Any] = []
+            if status:
+                query += ' WHERE status = ?'
+                params.append(status)
+            query += ' ORDER BY created_at DESC'
+            if limit is not None:
+                query += ' LIMIT ? OFFSET ?'
+                params.extend([limit, offset])
+            
+            with get_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                if status:
-                    cursor.execute('SELECT * FROM youtube_channels WHERE status = ? ORDER BY created_at DESC', (status,))
-                else:
-                    cursor.execute('SELECT * FROM youtube_channels ORDER BY created_at DESC')
+                rows = conn.execute(query, params).fetchall()
+            
+            channels = []
+            for row in rows:
+                channel = dict(row)
                 
-                rows = cursor.fetchall()
+                # Parse JSON fields that were selected
+                for field, empty in CHANNEL_JSON_FIELDS.items():
+                    if field in channel:
+                        channel[field] = json.loads(channel[field]) if channel[field] else empty()
                 
-                channels = []
-                for row in rows:
-                    channel = dict(row)
-                    
-                    # Debug: Log API credentials being retrieved for each channel
-                    print(f"🗄️ DB list_channels - Channel {channel.get('id')}: API credentials = {
-                        'api_key: ***set***' if channel.get('api_key') else 'api_key: empty'
-                    }, {
-                        'client_id: ***set***' if channel.get('client_id') else 'client_id: empty'  
-                    }, {
-                        'client_secret: ***set***' if channel.get('client_secret') else 'client_secret: empty'
-                    }")
-                    
-                    # Parse JSON fields
-                    channel['selected_genres'] = json.loads(channel['selected_genres']) if channel['selected_genres'] else []
-                    channel['upload_hours'] = json.loads(channel['upload_hours']) if channel['upload_hours'] else []
-                    channel['advanced_settings'] = json.loads(channel['advanced_settings']) if channel['advanced_settings'] else {}
-                    
-                    # Validate credentials and update status if needed
-                    if validate_credentials:
-                        validation_status = self._validate_channel_credentials(channel)
-                        channel['credential_status'] = validation_status
-                        
-                        # Update database status if it doesn't match validation
-                        if validation_status['status'] != channel['status']:
-                            print(f"🔄 Updating channel {channel.get('id')} status from {channel['status']} to {validation_status['status']}")
-                            self._update_channel_status(channel['id'], validation_status['status'], validation_status.get('error_message'))
-                            channel['status'] = validation_status['status']
-                    
-                    channels.append(channel)
-                
-                return channels
+                if validate_credentials:
+                    channel['credential_status'] = self._validate_channel_credentials(channel)
                 
+                channels.append(channel)
+            
+            return channels
+            
         except Exception as e:
             self.logger.error(f"Error listing channels: {e}")
             return []
     
+    def _channel_columns(self) -> set:
+        """Column names of youtube_channels (cached per instance)"""
+        if self._channel_column_names is None:
+            with get_connection(self.db_path) as conn:
+                self._channel_column_names = {row[1] for row in conn.execute('PRAGMA table_info(youtube_channels)')}
+        return self._channel_column_names
+    
+    def reconcile_channel_statuses(self, channel_id: Optional[int] = None) -> int:
+        """Store the credential-derived status of every channel whose status is out of date
+        
+        Runs as a batch job over all channels; add_channel/update_channel pass
+        ``channel_id`` to reconcile just the channel they wrote.
+        """
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                query = f"SELECT id, status, {', '.join(CREDENTIAL_COLUMNS)} FROM youtube_channels"
+                if channel_id is None:
+                    rows = conn.execute(query).fetchall()
+                else:
+                    rows = conn.execute(f"{query} WHERE id = ?", (channel_id,)).fetchall()
+                
+                changes = []
+                for row in rows:
+                    validation = self._validate_channel_credentials(dict(row))
+                    if validation['status'] != row['status']:
+                        changes.append((row['id'], validation['status'], validation.get('error_message')))
+                
+                if changes:
+                    conn.executemany('''
+                        UPDATE youtube_channels 
+                        SET status = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    ''', [(new_status, channel_id) for channel_id, new_status, _ in changes])
+                    conn.executemany('''
+                        INSERT INTO automation_logs (channel_id, log_type, message)
+                        VALUES (?, 'status_change', ?)
+                    ''', [
+                        (channel_id, f'Status changed to {new_status}: {error}' if error else f'Status changed to {new_status}')
+                        for channel_id, new_status, error in changes
+                    ])
+            
+            if changes:
+                self.logger.info(f"Reconciled status of {len(changes)} channels")
+            return len(changes)
+            
+        except Exception as e:
+            self.logger.error(f"Error reconciling channel statuses: {e}")
+            return 0
+    
     def _validate_channel_credentials(self, channel: Dict[str, Any]) -> Dict[str, str]:
         """Validate YouTube API credentials for a channel"""
         api_key = channel.get('api_key')
@@ -727,7 +993,7 @@ class YouTubeChannelsDB:
     def _update_channel_status(self, channel_id: int, status: str, error_message: str = None) -> bool:
         """Update channel status in database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -742,7 +1008,6 @@ class YouTubeChannelsDB:
                 else:
                     self._log_event(channel_id, 'status_change', f'Status changed to {status}')
                 
-                conn.commit()
                 return True
                 
         except Exception as e:
@@ -752,7 +1017,7 @@ class YouTubeChannelsDB:
     def add_background_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a new background task"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -781,7 +1046,7 @@ class YouTubeChannelsDB:
     def update_task_progress(self, task_id: str, progress: int, step: str = None, detail: str = None, status: str = None) -> bool:
         """Update task progress"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 updates = ['progress = ?']
@@ -820,7 +1085,7 @@ class YouTubeChannelsDB:
     def get_background_tasks(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Get background tasks with optional status filter"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -844,29 +1109,70 @@ class YouTubeChannelsDB:
                 
                 rows = cursor.fetchall()
                 
-                tasks = []
-                for row in rows:
-                    task = dict(row)
-                    
-                    # Parse JSON fields
-                    if task.get('seo_metadata'):
-                        try:
-                            task['seo_metadata'] = json.loads(task['seo_metadata'])
-                        except:
-                            task['seo_metadata'] = {}
-                    
-                    tasks.append(task)
-                
-                return tasks
+                return [self._background_task_from_row(row) for row in rows]
                 
         except Exception as e:
             self.logger.error(f"Error getting background tasks: {e}")
             return []
     
+    def _background_task_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a background_tasks row to a dict, parsing JSON fields"""
+        task = dict(row)
+        
+        if task.get('seo_metadata'):
+            try:
+                task['seo_metadata'] = json.loads(task['seo_metadata'])
+            except:
+                task['seo_metadata'] = {}
+        
+        return task
+    
+    def get_background_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single background task by task_id (served by the UNIQUE task_id index)"""
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT t.*, c.channel_name 
+                    FROM background_tasks t 
+                    LEFT JOIN youtube_channels c ON t.channel_id = c.id 
+                    WHERE t.task_id = ?
+                ''', (task_id,))
+                
+                row = cursor.fetchone()
+                return self._background_task_from_row(row) if row else None
+                
+        except Exception as e:
+            self.logger.error(f"Error getting background task {task_id}: {e}")
+            return None
+    
+    def get_background_task_progress(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the progress fields of a background task, for status pollers"""
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT task_id, status, progress, current_step, current_step_detail,
+                           error_message, started_at, completed_at
+                    FROM background_tasks 
+                    WHERE task_id = ?
+                ''', (task_id,))
+                
+                row = cursor.fetchone()
+                return dict(row) if row else None
+                
+        except Exception as e:
+            self.logger.error(f"Error getting background task progress {task_id}: {e}")
+            return None
+    
     def get_task_statistics(self) -> Dict[str, int]:
         """Get task statistics for dashboard"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Get counts by status
@@ -893,7 +1199,7 @@ class YouTubeChannelsDB:
     def delete_channel(self, channel_id: int) -> Dict[str, Any]:
         """Delete channel and all related data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Check if channel exists
@@ -911,8 +1217,6 @@ class YouTubeChannelsDB:
                 # Delete channel (CASCADE will handle related records)
                 cursor.execute('DELETE FROM youtube_channels WHERE id = ?', (channel_id,))
                 
-                conn.commit()
-                
                 self.logger.info(f"Channel deleted: {channel_name} (ID: {channel_id})")
                 
                 return {
@@ -929,57 +1233,23 @@ class YouTubeChannelsDB:
             }
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get comprehensive channel statistics"""
+        """Get comprehensive channel statistics (from the trigger-maintained counters)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Basic counts
-                cursor.execute('SELECT COUNT(*) FROM youtube_channels')
-                total_channels = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM youtube_channels WHERE status = "active"')
-                active_channels = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT SUM(total_subscribers) FROM youtube_channels')
-                total_subscribers = cursor.fetchone()[0] or 0
-                
-                cursor.execute('SELECT SUM(monthly_revenue) FROM youtube_channels')
-                total_revenue = cursor.fetchone()[0] or 0.0
-                
-                cursor.execute('SELECT SUM(total_videos) FROM youtube_channels')
-                total_videos = cursor.fetchone()[0] or 0
-                
-                cursor.execute('SELECT SUM(total_views) FROM youtube_channels')
-                total_views = cursor.fetchone()[0] or 0
-                
-                # Status breakdown
-                cursor.execute('SELECT status, COUNT(*) FROM youtube_channels GROUP BY status')
-                status_breakdown = {row[0]: row[1] for row in cursor.fetchall()}
-                
-                # Genre breakdown
-                cursor.execute('SELECT primary_genre, COUNT(*) FROM youtube_channels WHERE primary_genre IS NOT NULL GROUP BY primary_genre')
-                genre_breakdown = {row[0]: row[1] for row in cursor.fetchall()}
-                
-                # Automation stats
-                cursor.execute('SELECT COUNT(*) FROM youtube_channels WHERE automation_enabled = 1')
-                automated_channels = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM video_generation_queue WHERE status = "queued"')
-                queued_videos = cursor.fetchone()[0]
-                
-                return {
-                    'total_channels': total_channels,
-                    'active_channels': active_channels,
-                    'automated_channels': automated_channels,
-                    'total_subscribers': total_subscribers,
-                    'total_revenue': total_revenue,
-                    'total_videos': total_videos,
-                    'total_views': total_views,
-                    'queued_videos': queued_videos,
-                    'status_breakdown': status_breakdown,
-                    'genre_breakdown': genre_breakdown
-                }
+            counters = self._read_statistics()
+            total = lambda name: counters.get(name, {}).get('', 0)
+            
+            return {
+                'total_channels': total('channels'),
+                'active_channels': counters.get('channels_by_status', {}).get('active', 0),
+                'automated_channels': total('channels_automated'),
+                'total_subscribers': total('channel_subscribers'),
+                'total_revenue': float(total('channel_revenue')),
+                'total_videos': total('channel_videos'),
+                'total_views': total('channel_views'),
+                'queued_videos': counters.get('generation_queue_by_status', {}).get('queued', 0),
+                'status_breakdown': counters.get('channels_by_status', {}),
+                'genre_breakdown': counters.get('channels_by_genre', {})
+            }
                 
         except Exception as e:
             self.logger.error(f"Error getting statistics: {e}")
@@ -999,7 +1269,7 @@ class YouTubeChannelsDB:
     def enable_automation(self, channel_id: int) -> Dict[str, Any]:
         """Enable 24/7 automation for a channel"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Calculate next run time based on upload schedule
@@ -1017,8 +1287,6 @@ class YouTubeChannelsDB:
                 if cursor.rowcount == 0:
                     return {'success': False, 'message': 'Channel not found'}
                 
-                conn.commit()
-                
                 self._log_event(channel_id, 'automation_enabled', f'24/7 automation enabled, next run: {next_run}')
                 
                 return {
@@ -1069,13 +1337,12 @@ class YouTubeChannelsDB:
     def _log_event(self, channel_id: int, log_type: str, message: str, details: Dict[str, Any] = None):
         """Log automation event"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO automation_logs (channel_id, log_type, message, details)
                     VALUES (?, ?, ?, ?)
                 ''', (channel_id, log_type, message, json.dumps(details) if details else None))
-                conn.commit()
         except Exception as e:
             self.logger.error(f"Error logging event: {e}")
     
@@ -1084,6 +1351,9 @@ class YouTubeChannelsDB:
     def add_to_music_queue(self, tracks_data: list, original_task_id: str = None) -> int:
         """Add multiple tracks to music queue (from Suno API response)
         
+        All rows are written with one executemany in a single transaction. A clip
+        that is already queued (same suno_clip_id) is skipped, never enqueued twice.
+        
         Args:
             tracks_data: List of track dictionaries with Suno API data
             original_task_id: Background task ID that generated these tracks
@@ -1092,151 +1362,165 @@ class YouTubeChannelsDB:
             Number of tracks added to queue
         """
         try:
-            added_count = 0
+            # Every track in the batch expires 30 days from now
+            expiry_date = (datetime.now() + timedelta(days=30)).isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for track in tracks_data:
-                    # Generate unique queue UUID
-                    import uuid
-                    from datetime import datetime, timedelta
-                    
-                    queue_uuid = str(uuid.uuid4())
-                    
-                    # Calculate expiry date (30 days from now)
-                    expiry_date = (datetime.now() + timedelta(days=30)).isoformat()
-                    
-                    # Parse duration to seconds for calculations
-                    duration_seconds = self._parse_duration_to_seconds(track.get('duration', '0:00'))
-                    
-                    # Calculate quality score based on title and tags
-                    quality_score = self._calculate_quality_score(track)
-                    
-                    cursor.execute('''
-                        INSERT INTO music_queue (
-                            queue_uuid, suno_task_id, suno_clip_id, original_task_id,
-                            channel_id, genre, title, audio_url, video_url, 
-                            duration, duration_seconds, vocal_type, tags, prompt, model_name,
-                            quality_score, expiry_date
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        queue_uuid,
-                        track.get('suno_task_id'),
-                        track.get('suno_clip_id'),
-                        original_task_id,
-                        track.get('channel_id'),
-                        track.get('genre'),
-                        track.get('title'),
-                        track.get('audio_url'),
-                        track.get('video_url'),
-                        track.get('duration'),
-                        duration_seconds,
-                        track.get('vocal_type'),
-                        json.dumps(track.get('tags', [])),
-                        track.get('prompt'),
-                        track.get('model_name'),
-                        quality_score,
-                        expiry_date
-                    ))
-                    
-                    added_count += 1
-                    print(f"🎵 ➕ Added to queue: {track.get('title')} ({track.get('genre')})")
-                
-                conn.commit()
-                self.logger.info(f"Added {added_count} tracks to music queue")
-                return added_count
+            rows = [(
+                str(uuid.uuid4()),
+                track.get('suno_task_id'),
+                track.get('suno_clip_id'),
+                original_task_id,
+                track.get('channel_id'),
+                track.get('genre'),
+                track.get('title'),
+                track.get('audio_url'),
+                track.get('video_url'),
+                track.get('duration'),
+                self._parse_duration_to_seconds(track.get('duration', '0:00')),
+                track.get('vocal_type'),
+                json.dumps(track.get('tags', [])),
+                track.get('prompt'),
+                track.get('model_name'),
+                self._calculate_quality_score(track),
+                expiry_date
+            ) for track in tracks_data]
+            
+            if not rows:
+                return 0
+            
+            with get_connection(self.db_path) as conn:
+                # rowcount sums the inserted rows only; total_changes would also count
+                # the stats_counters trigger writes
+                cursor = conn.executemany('''
+                    INSERT INTO music_queue (
+                        queue_uuid, suno_task_id, suno_clip_id, original_task_id,
+                        channel_id, genre, title, audio_url, video_url, 
+                        duration, duration_seconds, vocal_type, tags, prompt, model_name,
+                        quality_score, expiry_date
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (suno_clip_id) DO NOTHING
+                ''', rows)
+                added_count = max(cursor.rowcount, 0)
+            
+            skipped = len(rows) - added_count
+            self.logger.info(f"Added {added_count} tracks to music queue"
+                             + (f" ({skipped} already queued)" if skipped else ""))
+            return added_count
                 
         except Exception as e:
             self.logger.error(f"Error adding tracks to music queue: {e}")
             return 0
     
-    def get_queued_track(self, channel_id: int, genre: str = None, vocal_type: str = None) -> Dict[str, Any]:
-        """Get best matching track from queue for immediate use
+    def claim_tracks(self, channel_id: int, genre: str = None, vocal_type: str = None,
+                     count: int = 1, task_id: str = None) -> List[Dict[str, Any]]:
+        """Atomically claim up to ``count`` of the best matching available tracks
+        
+        Selection and the status change happen in one BEGIN IMMEDIATE transaction,
+        so concurrent pipelines can never claim the same clip.
         
         Args:
-            channel_id: Channel ID requesting track
+            channel_id: Channel ID requesting tracks
             genre: Preferred genre (optional)
             vocal_type: 'vocal' or 'instrumental' (optional)
+            count: Maximum number of tracks to claim
+            task_id: Task the tracks are claimed for (stored in used_for_task)
             
         Returns:
-            Track data dict or None if no suitable track found
+            List of claimed track dicts, best first (may be shorter than count)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Build query with flexible matching
-                base_query = '''
-                    SELECT * FROM music_queue 
-                    WHERE status = 'available' 
-                    AND expiry_date > datetime('now')
-                '''
-                params = []
-                
-                # Add filters if specified
-                if channel_id:
-                    base_query += ' AND channel_id = ?'
-                    params.append(channel_id)
-                    
-                if genre:
-                    base_query += ' AND genre = ?'
-                    params.append(genre)
-                    
-                if vocal_type:
-                    base_query += ' AND vocal_type = ?'
-                    params.append(vocal_type)
-                
-                # Order by priority and quality
-                base_query += ' ORDER BY priority DESC, quality_score DESC, created_at ASC LIMIT 1'
-                
-                cursor.execute(base_query, params)
-                row = cursor.fetchone()
-                
-                if row:
-                    # Convert row to dict
-                    columns = [desc[0] for desc in cursor.description]
-                    track = dict(zip(columns, row))
-                    
-                    # Mark as used
-                    self._mark_track_as_used(track['queue_uuid'])
-                    
-                    print(f"🎵 🎯 Using queued track: {track['title']} ({track['genre']})")
-                    return track
-                else:
-                    print(f"🎵 ⚠️ No suitable queued track found for channel {channel_id}, genre: {genre}, vocal: {vocal_type}")
-                    return None
-                    
+            query = '''
+                SELECT * FROM music_queue 
+                WHERE status = 'available' 
+                AND expiry_date > datetime('now')
+            '''
+            params: List[Any] = []
+            
+            if channel_id:
+                query += ' AND channel_id = ?'
+                params.append(channel_id)
+            if genre:
+                query += ' AND genre = ?'
+                params.append(genre)
+            if vocal_type:
+                query += ' AND vocal_type = ?'
+                params.append(vocal_type)
+            
+            # Order by priority and quality
+            query += ' ORDER BY priority DESC, quality_score DESC, created_at ASC LIMIT ?'
+            params.append(count)
+            
+            with get_connection(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                # Take the write lock before reading so nobody can claim between SELECT and UPDATE
+                conn.execute('BEGIN IMMEDIATE')
+                tracks = [dict(row) for row in conn.execute(query, params).fetchall()]
+                if tracks:
+                    conn.executemany('''
+                        UPDATE music_queue 
+                        SET status = 'used', used_at = datetime('now'), used_for_task = ?,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ? AND status = 'available'
+                    ''', [(task_id, track['id']) for track in tracks])
+            
+            for track in tracks:
+                track['status'] = 'used'
+                track['used_for_task'] = task_id
+            return tracks
+            
         except Exception as e:
-            self.logger.error(f"Error getting queued track: {e}")
-            return None
+            self.logger.error(f"Error claiming queued tracks: {e}")
+            return []
     
-    def _mark_track_as_used(self, queue_uuid: str, task_id: str = None):
-        """Mark track as used in database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE music_queue 
-                    SET status = 'used', used_at = datetime('now'), used_for_task = ?
-                    WHERE queue_uuid = ?
-                ''', (task_id, queue_uuid))
-                conn.commit()
-        except Exception as e:
-            self.logger.error(f"Error marking track as used: {e}")
+    def claim_track(self, channel_id: int, genre: str = None, vocal_type: str = None,
+                    task_id: str = None) -> Optional[Dict[str, Any]]:
+        """Atomically claim the single best matching track, or None"""
+        tracks = self.claim_tracks(channel_id, genre, vocal_type, count=1, task_id=task_id)
+        return tracks[0] if tracks else None
+    
+    def get_queued_track(self, channel_id: int, genre: str = None, vocal_type: str = None,
+                         task_id: str = None) -> Dict[str, Any]:
+        """Get best matching track from queue for immediate use (claimed atomically)
+        
+        Args:
+            channel_id: Channel ID requesting track
+            genre: Preferred genre (optional)
+            vocal_type: 'vocal' or 'instrumental' (optional)
+            task_id: Task that will use the track (optional)
+            
+        Returns:
+            Track data dict or None if no suitable track found
+        """
+        track = self.claim_track(channel_id, genre, vocal_type, task_id=task_id)
+        if track:
+            print(f"🎵 🎯 Using queued track: {track['title']} ({track['genre']})")
+        else:
+            print(f"🎵 ⚠️ No suitable queued track found for channel {channel_id}, genre: {genre}, vocal: {vocal_type}")
+        return track
     
     def get_music_queue_stats(self, channel_id: int = None) -> Dict[str, Any]:
-        """Get music queue statistics"""
+        """Get music queue statistics
+        
+        Without a channel the trigger-maintained counters are used; they count
+        rows by status, so expired tracks are included until cleanup_expired_tracks()
+        removes them.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            if not channel_id:
+                counters = self._read_statistics()
+                status_counts = counters.get('music_queue_by_status', {})
+                return {
+                    'status_counts': status_counts,
+                    'genre_counts': counters.get('music_queue_available_by_genre', {}),
+                    'vocal_counts': counters.get('music_queue_available_by_vocal', {}),
+                    'total_available': status_counts.get('available', 0)
+                }
+            
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
-                base_where = "WHERE expiry_date > datetime('now')"
-                params = []
-                
-                if channel_id:
-                    base_where += " AND channel_id = ?"
-                    params.append(channel_id)
+                base_where = "WHERE expiry_date > datetime('now') AND channel_id = ?"
+                params = [channel_id]
                 
                 # Count by status
                 cursor.execute(f"SELECT status, COUNT(*) FROM music_queue {base_where} GROUP BY status", params)
@@ -1261,14 +1545,28 @@ class YouTubeChannelsDB:
             self.logger.error(f"Error getting queue stats: {e}")
             return {}
     
+    def count_available_tracks(self) -> Dict[tuple, int]:
+        """Unexpired available tracks per (channel_id, genre, vocal_type)"""
+        try:
+            with get_connection(self.db_path) as conn:
+                rows = conn.execute('''
+                    SELECT channel_id, genre, vocal_type, COUNT(*) FROM music_queue
+                    WHERE status = 'available' AND expiry_date > datetime('now')
+                    GROUP BY channel_id, genre, vocal_type
+                ''').fetchall()
+            return {(channel_id, genre, vocal_type): count for channel_id, genre, vocal_type, count in rows}
+            
+        except Exception as e:
+            self.logger.error(f"Error counting available tracks: {e}")
+            return {}
+    
     def cleanup_expired_tracks(self) -> int:
         """Remove expired tracks from queue"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM music_queue WHERE expiry_date <= datetime('now')")
                 deleted_count = cursor.rowcount
-                conn.commit()
                 
                 if deleted_count > 0:
                     print(f"🎵 🗑️ Cleaned up {deleted_count} expired tracks from queue")
@@ -1315,7 +1613,7 @@ class YouTubeChannelsDB:
     def update_channel_credentials(self, channel_id: int, credentials_data: Dict[str, str]) -> bool:
         """Update OAuth credentials for a channel"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Update credentials
@@ -1331,7 +1629,6 @@ class YouTubeChannelsDB:
                 
                 success = cursor.rowcount > 0
                 if success:
-                    conn.commit()
                     self.logger.info(f"Updated OAuth credentials for channel {channel_id}")
                 
                 return success
@@ -1364,35 +1661,44 @@ class YouTubeChannelsDB:
     
     def add_to_video_gallery(self, video_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add generated video to gallery"""
+        result = self.add_videos_to_gallery([video_data])
+        if not result['success']:
+            return {
+                'success': False,
+                'error': result['error'],
+                'message': 'Failed to add video to gallery'
+            }
+        
+        video = result['videos'][0]
+        self.logger.info(f"Video added to gallery: {video_data.get('title')} (ID: {video['video_id']})")
+        return {
+            'success': True,
+            'video_id': video['video_id'],
+            'video_uuid': video['video_uuid'],
+            'message': 'Video added to gallery successfully'
+        }
+    
+    def add_videos_to_gallery(self, videos_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add several generated videos to the gallery in one transaction
+        
+        Upserts on file_path: re-adding a file refreshes its metadata but keeps
+        its gallery id, upload status and statistics.
+        """
         try:
-            import uuid
-            from datetime import datetime
-            from pathlib import Path
-            
-            video_uuid = str(uuid.uuid4())
-            
-            # Get file information
-            file_path = video_data.get('file_path')
-            file_size = 0
-            if file_path and Path(file_path).exists():
-                file_size = Path(file_path).stat().st_size
-            
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO video_gallery (
-                        video_uuid, title, description, file_path, thumbnail_path,
-                        duration, file_size, file_format, original_task_id, generation_source,
-                        music_track_id, genre, vocal_type, music_url, music_title, music_tags,
-                        video_title, video_description, video_tags, seo_metadata,
-                        video_quality, processing_time, notes
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    video_uuid,
+            rows = []
+            for video_data in videos_data:
+                # Get file information
+                file_path = video_data.get('file_path')
+                file_size = 0
+                file_exists = bool(file_path and Path(file_path).exists())
+                if file_exists:
+                    file_size = Path(file_path).stat().st_size
+                
+                rows.append((
+                    str(uuid.uuid4()),
                     video_data.get('title'),
                     video_data.get('description'),
-                    video_data.get('file_path'),
+                    file_path,
                     video_data.get('thumbnail_path'),
                     video_data.get('duration'),
                     file_size,
@@ -1411,95 +1717,185 @@ class YouTubeChannelsDB:
                     json.dumps(video_data.get('seo_metadata', {})),
                     video_data.get('video_quality', 'HD'),
                     video_data.get('processing_time'),
-                    video_data.get('notes')
+                    video_data.get('notes'),
+                    file_exists
                 ))
-                
-                video_id = cursor.lastrowid
-                conn.commit()
-                
-                self.logger.info(f"Video added to gallery: {video_data.get('title')} (ID: {video_id})")
-                
-                return {
-                    'success': True,
-                    'video_id': video_id,
-                    'video_uuid': video_uuid,
-                    'message': 'Video added to gallery successfully'
+            
+            with get_connection(self.db_path) as conn:
+                conn.executemany('''
+                    INSERT INTO video_gallery (
+                        video_uuid, title, description, file_path, thumbnail_path,
+                        duration, file_size, file_format, original_task_id, generation_source,
+                        music_track_id, genre, vocal_type, music_url, music_title, music_tags,
+                        video_title, video_description, video_tags, seo_metadata,
+                        video_quality, processing_time, notes, file_exists
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (file_path) DO UPDATE SET
+                        title = excluded.title,
+                        description = excluded.description,
+                        thumbnail_path = excluded.thumbnail_path,
+                        duration = excluded.duration,
+                        file_size = excluded.file_size,
+                        file_format = excluded.file_format,
+                        original_task_id = excluded.original_task_id,
+                        music_track_id = excluded.music_track_id,
+                        genre = excluded.genre,
+                        vocal_type = excluded.vocal_type,
+                        music_url = excluded.music_url,
+                        music_title = excluded.music_title,
+                        music_tags = excluded.music_tags,
+                        video_title = excluded.video_title,
+                        video_description = excluded.video_description,
+                        video_tags = excluded.video_tags,
+                        seo_metadata = excluded.seo_metadata,
+                        video_quality = excluded.video_quality,
+                        processing_time = excluded.processing_time,
+                        file_exists = excluded.file_exists,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', rows)
+                
+                # Existing rows keep their original id/uuid, so read them back
+                file_paths = [row[3] for row in rows]
+                placeholders = ', '.join('?' for _ in file_paths)
+                ids = {
+                    file_path: (video_id, video_uuid)
+                    for video_id, video_uuid, file_path in conn.execute(
+                        f'SELECT id, video_uuid, file_path FROM video_gallery WHERE file_path IN ({placeholders})',
+                        file_paths
+                    )
                 }
-                
+            
+            return {
+                'success': True,
+                'count': len(rows),
+                'videos': [
+                    {'video_id': ids[path][0], 'video_uuid': ids[path][1], 'file_path': path}
+                    for path in file_paths
+                ]
+            }
+            
         except Exception as e:
-            self.logger.error(f"Error adding video to gallery: {e}")
+            self.logger.error(f"Error adding videos to gallery: {e}")
             return {
                 'success': False,
                 'error': str(e),
-                'message': 'Failed to add video to gallery'
+                'message': 'Failed to add videos to gallery'
             }
     
-    def get_video_gallery(self, status: str = None, upload_status: str = None, 
-                         genre: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get videos from gallery with optional filters"""
+    def get_video_gallery_page(self, status: str = None, upload_status: str = None, genre: str = None,
+                               vocal_type: str = None, limit: int = 50, cursor: str = None,
+                               view: str = 'list') -> Dict[str, Any]:
+        """One page of gallery videos, newest first, with keyset pagination on (created_at, id)
+        
+        ``cursor`` is the ``next_cursor`` of the previous page. ``view='list'``
+        returns only the columns the gallery cards need (JSON columns left
+        undecoded); ``view='detail'`` returns every column with JSON decoded.
+        ``file_exists`` is the cached flag kept current by refresh_video_file_flags().
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            column_sql = ', '.join(f'v.{column}' for column in GALLERY_LIST_COLUMNS) if view == 'list' else 'v.*'
+            query = f'''
+                SELECT {column_sql}, c.channel_name 
+                FROM video_gallery v 
+                LEFT JOIN youtube_channels c ON v.upload_channel_id = c.id 
+                WHERE 1=1
+            '''
+            params: List[Any] = []
+            
+            for column, value in (('status', status), ('upload_status', upload_status),
+                                  ('genre', genre), ('vocal_type', vocal_type)):
+                if value:
+                    query += f' AND v.{column} = ?'
+                    params.append(value)
+            
+            if cursor:
+                created_at, video_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+                query += ' AND (v.created_at, v.id) < (?, ?)'
+                params.extend([created_at, video_id])
+            
+            # Fetch one extra row to know whether another page exists
+            query += ' ORDER BY v.created_at DESC, v.id DESC LIMIT ?'
+            params.append(limit + 1)
+            
+            with get_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                # Build query
-                query = '''
-                    SELECT v.*, c.channel_name 
-                    FROM video_gallery v 
-                    LEFT JOIN youtube_channels c ON v.upload_channel_id = c.id 
-                    WHERE 1=1
-                '''
-                params = []
-                
-                if status:
-                    query += ' AND v.status = ?'
-                    params.append(status)
-                    
-                if upload_status:
-                    query += ' AND v.upload_status = ?'
-                    params.append(upload_status)
-                    
-                if genre:
-                    query += ' AND v.genre = ?'
-                    params.append(genre)
-                
-                query += ' ORDER BY v.created_at DESC LIMIT ?'
-                params.append(limit)
-                
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
+                rows = conn.execute(query, params).fetchall()
+            
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            videos = []
+            for row in rows:
+                video = dict(row)
                 
-                videos = []
-                for row in rows:
-                    video = dict(row)
-                    
+                if view != 'list':
                     # Parse JSON fields
                     video['music_tags'] = json.loads(video['music_tags']) if video['music_tags'] else []
                     video['video_tags'] = json.loads(video['video_tags']) if video['video_tags'] else []
                     video['seo_metadata'] = json.loads(video['seo_metadata']) if video['seo_metadata'] else {}
                     video['custom_fields'] = json.loads(video['custom_fields']) if video['custom_fields'] else {}
-                    
-                    # Check if file still exists
-                    file_path = video.get('file_path')
-                    video['file_exists'] = bool(file_path and Path(file_path).exists()) if file_path else False
-                    
-                    # Format file size
-                    if video.get('file_size'):
-                        size_mb = video['file_size'] / (1024 * 1024)
-                        video['file_size_mb'] = round(size_mb, 1)
-                    
-                    videos.append(video)
-                
-                return videos
                 
+                video['file_exists'] = bool(video.get('file_path') and video.get('file_exists'))
+                
+                # Format file size
+                if video.get('file_size'):
+                    size_mb = video['file_size'] / (1024 * 1024)
+                    video['file_size_mb'] = round(size_mb, 1)
+                
+                videos.append(video)
+            
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                next_cursor = base64.urlsafe_b64encode(json.dumps([last['created_at'], last['id']]).encode()).decode()
+            
+            return {'videos': videos, 'next_cursor': next_cursor, 'has_more': has_more}
+            
         except Exception as e:
             self.logger.error(f"Error getting video gallery: {e}")
-            return []
+            return {'videos': [], 'next_cursor': None, 'has_more': False}
+    
+    def get_video_gallery(self, status: str = None, upload_status: str = None, 
+                         genre: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get videos from gallery with optional filters (first page, all columns)"""
+        return self.get_video_gallery_page(status=status, upload_status=upload_status, genre=genre,
+                                           limit=limit, view='detail')['videos']
+    
+    def refresh_video_file_flags(self) -> int:
+        """Sweep: re-check every gallery file on disk and store changed file_exists/file_size values"""
+        try:
+            with get_connection(self.db_path) as conn:
+                rows = conn.execute('SELECT id, file_path, file_exists, file_size FROM video_gallery').fetchall()
+            
+            updates = []
+            for video_id, file_path, file_exists, file_size in rows:
+                try:
+                    stat = os.stat(file_path) if file_path else None
+                except OSError:
+                    stat = None
+                exists = 1 if stat else 0
+                size = stat.st_size if stat else file_size
+                if exists != file_exists or size != file_size:
+                    updates.append((exists, size, video_id))
+            
+            if updates:
+                with get_connection(self.db_path) as conn:
+                    conn.executemany('''
+                        UPDATE video_gallery 
+                        SET file_exists = ?, file_size = ?, file_checked_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    ''', updates)
+                self.logger.info(f"Updated file flags of {len(updates)} gallery videos")
+            return len(updates)
+            
+        except Exception as e:
+            self.logger.error(f"Error refreshing gallery file flags: {e}")
+            return 0
     
     def get_video_from_gallery(self, video_id: int) -> Optional[Dict[str, Any]]:
         """Get single video from gallery by ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -1530,7 +1926,7 @@ class YouTubeChannelsDB:
     def update_video_upload_status(self, video_id: int, upload_data: Dict[str, Any]) -> bool:
         """Update video upload status in gallery"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -1553,7 +1949,6 @@ class YouTubeChannelsDB:
                 
                 success = cursor.rowcount > 0
                 if success:
-                    conn.commit()
                     self.logger.info(f"Updated upload status for video {video_id}")
                 
                 return success
@@ -1565,7 +1960,7 @@ class YouTubeChannelsDB:
     def delete_video_from_gallery(self, video_id: int, delete_file: bool = False) -> Dict[str, Any]:
         """Delete video from gallery (optionally delete file too)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Get video info first
@@ -1588,8 +1983,6 @@ class YouTubeChannelsDB:
                     except Exception as e:
                         self.logger.warning(f"Could not delete video file: {e}")
                 
-                conn.commit()
-                
                 return {
                     'success': True,
                     'message': f'Video "{title}" deleted from gallery'
@@ -1606,7 +1999,7 @@ class YouTubeChannelsDB:
     def update_video_duration(self, video_id: int, duration: float) -> bool:
         """Update video duration in gallery"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -1618,7 +2011,6 @@ class YouTubeChannelsDB:
                 
                 success = cursor.rowcount > 0
                 if success:
-                    conn.commit()
                     self.logger.info(f"Updated duration for video {video_id} to {duration} seconds")
                 
                 return success
@@ -1628,40 +2020,20 @@ class YouTubeChannelsDB:
             return False
     
     def get_video_gallery_stats(self) -> Dict[str, Any]:
-        """Get video gallery statistics"""
+        """Get video gallery statistics (from the trigger-maintained counters)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Basic counts
-                cursor.execute('SELECT COUNT(*) FROM video_gallery WHERE status = "available"')
-                total_videos = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM video_gallery WHERE upload_status = "ready"')
-                ready_to_upload = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM video_gallery WHERE upload_status = "uploaded"')
-                uploaded_videos = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT SUM(file_size) FROM video_gallery WHERE status = "available"')
-                total_size = cursor.fetchone()[0] or 0
-                
-                # Upload status breakdown
-                cursor.execute('SELECT upload_status, COUNT(*) FROM video_gallery GROUP BY upload_status')
-                upload_status_breakdown = {row[0]: row[1] for row in cursor.fetchall()}
-                
-                # Genre breakdown
-                cursor.execute('SELECT genre, COUNT(*) FROM video_gallery WHERE genre IS NOT NULL GROUP BY genre')
-                genre_breakdown = {row[0]: row[1] for row in cursor.fetchall()}
-                
-                return {
-                    'total_videos': total_videos,
-                    'ready_to_upload': ready_to_upload,
-                    'uploaded_videos': uploaded_videos,
-                    'total_size_mb': round((total_size / (1024 * 1024)), 1) if total_size else 0,
-                    'upload_status_breakdown': upload_status_breakdown,
-                    'genre_breakdown': genre_breakdown
-                }
+            counters = self._read_statistics()
+            upload_status_breakdown = counters.get('gallery_by_upload_status', {})
+            total_size = counters.get('gallery_size_by_status', {}).get('available', 0)
+            
+            return {
+                'total_videos': counters.get('gallery_by_status', {}).get('available', 0),
+                'ready_to_upload': upload_status_breakdown.get('ready', 0),
+                'uploaded_videos': upload_status_breakdown.get('uploaded', 0),
+                'total_size_mb': round((total_size / (1024 * 1024)), 1) if total_size else 0,
+                'upload_status_breakdown': upload_status_breakdown,
+                'genre_breakdown': counters.get('gallery_by_genre', {})
+            }
                 
         except Exception as e:
             self.logger.error(f"Error getting video gallery stats: {e}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Media Probe Service
+Parallel ffprobe with a (path, size, mtime) keyed SQLite cache
+"""
+
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Optional
+
+from core.database.sqlite_connections import get_connection
+
+
+class MediaProbe:
+    """ffprobe with a persistent cache and a worker pool for library scans.
+
+    Results are cached in SQLite keyed by path and validated against the
+    file's (size, mtime), so an unchanged file is never probed twice and a
+    re-rendered one is picked up automatically.
+    """
+
+    def __init__(self, cache_path: str = 'data/media_probe_cache.db', max_workers: Optional[int] = None,
+                 timeout: float = 30):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or int(os.getenv('MEDIA_PROBE_WORKERS', str(min(8, (os.cpu_count() or 2) * 2))))
+        self.timeout = timeout
+
+        with get_connection(self.cache_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS probe_cache (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    duration REAL,
+                    data TEXT NOT NULL,
+                    probed_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+    def _cached(self, path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        with get_connection(self.cache_path) as conn:
+            row = conn.execute('SELECT size, mtime_ns, data FROM probe_cache WHERE path = ?', (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return json.loads(row[2])
+        return None
+
+    def _run_ffprobe(self, path: str) -> Optional[Dict[str, Any]]:
+        cmd = [
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            print(f"⚠️ ffprobe failed for {path}: {result.stderr.strip()[:200]}")
+            return None
+
+        probe_data = json.loads(result.stdout)
+        duration = probe_data.get('format', {}).get('duration')
+        return {
+            'duration': float(duration) if duration else None,
+            'format': probe_data.get('format', {}),
+            'streams': probe_data.get('streams', []),
+        }
+
+    def probe(self, path: str) -> Optional[Dict[str, Any]]:
+        """ffprobe format/stream info ({'duration', 'format', 'streams'}), or None
+
+        Local files are cached; http(s) URLs are probed directly every time.
+        """
+        path = str(path)
+        if path.startswith(('http://', 'https://')):
+            try:
+                return self._run_ffprobe(path)
+            except (subprocess.TimeoutExpired, ValueError, OSError) as e:
+                print(f"⚠️ ffprobe error for {path}: {e}")
+                return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self._cached(path, stat)
+        if cached is not None:
+            return cached
+
+        try:
+            info = self._run_ffprobe(path)
+        except (subprocess.TimeoutExpired, ValueError, OSError) as e:
+            print(f"⚠️ ffprobe error for {path}: {e}")
+            return None
+        if info is None:
+            return None
+
+        with get_connection(self.cache_path) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO probe_cache (path, size, mtime_ns, duration, data)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (path, stat.st_size, stat.st_mtime_ns, info['duration'], json.dumps(info)))
+        return info
+
+    def duration(self, path: str) -> Optional[float]:
+        """Duration in seconds of a media file or URL (cached for local files)"""
+        info = self.probe(path)
+        return info['duration'] if info else None
+
+    def probe_many(self, paths: Iterable[str],
+                   progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Probe many files in parallel; ``progress(done, total)`` is called as each finishes"""
+        paths = list(dict.fromkeys(str(path) for path in paths))
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        if not paths:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='media-probe') as pool:
+            futures = {pool.submit(self.probe, path): path for path in paths}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    print(f"❌ Error probing {path}: {e}")
+                    results[path] = None
+                if progress:
+                    progress(done, len(paths))
+        return results
+
+    def prune_missing(self) -> int:
+        """Drop cache entries for files that no longer exist; returns how many were removed"""
+        with get_connection(self.cache_path) as conn:
+            paths = [row[0] for row in conn.execute('SELECT path FROM probe_cache')]
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            conn.executemany('DELETE FROM probe_cache WHERE path = ?', missing)
+        return len(missing)
+
+
+_media_probe: Optional[MediaProbe] = None
+_media_probe_lock = threading.Lock()
+
+
+def get_media_probe() -> MediaProbe:
+    """Process-wide media probe"""
+    global _media_probe
+    if _media_probe is None:
+        with _media_probe_lock:
+            if _media_probe is None:
+                _media_probe = MediaProbe()
+    return _media_probe
@@ -0,0 +1,83 @@
+import asyncio
+import os
+from typing import Dict, Any, List, Optional
+
+from core.services.suno_client import SunoClient
+from core.services.suno_http import suno_timeout
+
+
+class AsyncSunoClient:
+    """asyncio Suno client for fanning out many generation requests on one event loop.
+
+    Requests go through a single pooled httpx.AsyncClient and a semaphore
+    caps how many are in flight at once. Every request has its own deadline
+    and every input gets exactly one structured result, so slow requests are
+    reported as failures instead of being dropped.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.api_key = os.getenv('SUNO_API_KEY')
+        self.base_url = "https://api.sunoapi.org/api/v1"
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.max_concurrency = max_concurrency or int(os.getenv('SUNO_MAX_CONCURRENCY', '25'))
+
+        if not self.api_key:
+            raise ValueError("SUNO_API_KEY environment variable is required")
+
+    async def _generate(self, client, prompt: str, **kwargs) -> str:
+        """Submit one non-custom generation and return its Suno task id"""
+        payload = SunoClient.build_simple_payload(prompt, **kwargs)
+        response = await client.post(f"{self.base_url}/generate", json=payload, headers=self.headers)
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get('code') == 200:
+            task_id = (data.get('data') or {}).get('taskId')
+            if not task_id:
+                raise Exception("Suno API response did not include a taskId")
+            return task_id
+        elif data.get('code') == 429:
+            raise Exception(f"Insufficient Suno credits: {data.get('msg')}")
+        else:
+            raise Exception(f"Suno API error (code {data.get('code')}): {data.get('msg', 'Unknown API error')}")
+
+    async def generate_many(self, batch_requests: List[Dict[str, Any]],
+                            request_deadline: float = 60) -> List[Dict[str, Any]]:
+        """Submit every batch request concurrently (bounded by max_concurrency).
+
+        Each item needs 'batch_num', 'prompt' and 'params'. Returns one
+        ``{'batch_num', 'result', 'success', 'error'}`` dict per item, in input
+        order, where 'result' is the Suno task id on success.
+        """
+        import httpx
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connect_timeout, read_timeout = suno_timeout('/generate')
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            async def submit(batch_info: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        task_id = await asyncio.wait_for(
+                            self._generate(client, batch_info['prompt'], **batch_info['params']),
+                            request_deadline
+                        )
+                        return {'batch_num': batch_info['batch_num'], 'result': task_id, 'success': True, 'error': None}
+                    except asyncio.TimeoutError:
+                        error = f"No response within {request_deadline}s"
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                    print(f"❌ Batch {batch_info['batch_num'] + 1} failed: {error}")
+                    return {'batch_num': batch_info['batch_num'], 'result': None, 'success': False, 'error': error}
+
+            return await asyncio.gather(*(submit(batch_info) for batch_info in batch_requests))
+
+    def generate_many_sync(self, batch_requests: List[Dict[str, Any]],
+                           request_deadline: float = 60) -> List[Dict[str, Any]]:
+        """Run generate_many from synchronous code (a worker thread without an event loop)"""
+        return asyncio.run(self.generate_many(batch_requests, request_deadline))
@@ -1,9 +1,10 @@
 import os
-import requests
 import json
 from typing import Dict, Optional, Any
 from datetime import datetime
 
+from core.services.suno_http import get_suno_session, suno_timeout
+
 class SunoClient:
     """Suno API client for music generation"""
 
@@ -22,7 +23,7 @@ class SunoClient:
         """Get remaining credits"""
         try:
             url = f"{self.base_url}/generate/credit"
-            response = requests.get(url, headers=self.headers)
+            response = get_suno_session().get(url, headers=self.headers, timeout=suno_timeout('/generate/credit'))
             response.raise_for_status()
 
             data = response.json()
@@ -46,7 +47,7 @@ class SunoClient:
         """Get remaining credits with detailed status information"""
         try:
             url = f"{self.base_url}/generate/credit"
-            response = requests.get(url, headers=self.headers)
+            response = get_suno_session().get(url, headers=self.headers, timeout=suno_timeout('/generate/credit'))
             response.raise_for_status()
 
             data = response.json()
@@ -82,30 +83,36 @@ class SunoClient:
                 'message': "Unable to connect to Suno API"
             }
 
+    @staticmethod
+    def build_simple_payload(prompt: str, **kwargs) -> Dict[str, Any]:
+        """Build the /generate request body for non-custom mode"""
+        # Non-custom mode: only prompt is required, max 400 characters
+        if len(prompt) > 400:
+            prompt = prompt[:400]  # Truncate to API limit
+
+        payload = {
+            "prompt": prompt,
+            "customMode": False,  # Non-custom mode for simplicity
+            "instrumental": kwargs.get('instrumental', False),
+            "model": kwargs.get('model', 'V4'),  # Use provided model or default to V4
+            "callBackUrl": os.getenv('CALLBACK_URL', 'https://webhook.site/unique-id')
+        }
+        
+        # Add optional parameters if provided
+        optional_params = ['negativeTags', 'vocalGender', 'styleWeight', 'weirdnessConstraint', 'audioWeight']
+        for param in optional_params:
+            if param in kwargs and kwargs[param] is not None:
+                payload[param] = kwargs[param]
+        
+        return payload
+
     def generate_music_simple(self, prompt: str, **kwargs) -> Optional[Dict[str, Any]]:
         """Generate music with simple parameters"""
         try:
             url = f"{self.base_url}/generate"
-
-            # Non-custom mode: only prompt is required, max 400 characters
-            if len(prompt) > 400:
-                prompt = prompt[:400]  # Truncate to API limit
-
-            payload = {
-                "prompt": prompt,
-                "customMode": False,  # Non-custom mode for simplicity
-                "instrumental": kwargs.get('instrumental', False),
-                "model": kwargs.get('model', 'V4'),  # Use provided model or default to V4
-                "callBackUrl": os.getenv('CALLBACK_URL', 'https://webhook.site/unique-id')
-            }
+            payload = self.build_simple_payload(prompt, **kwargs)
             
-            # Add optional parameters if provided
-            optional_params = ['negativeTags', 'vocalGender', 'styleWeight', 'weirdnessConstraint', 'audioWeight']
-            for param in optional_params:
-                if param in kwargs and kwargs[param] is not None:
-                    payload[param] = kwargs[param]
-            
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/generate'))
             response.raise_for_status()
 
             data = response.json()
@@ -177,7 +184,7 @@ class SunoClient:
                 if param in kwargs and kwargs[param] is not None:
                     payload[param] = kwargs[param]
 
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/generate'))
             response.raise_for_status()
 
             data = response.json()
@@ -200,7 +207,7 @@ class SunoClient:
             url = f"{self.base_url}/generate/record-info"
             params = {"taskId": task_id}
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = get_suno_session().get(url, headers=self.headers, params=params, timeout=suno_timeout('/generate/record-info'))
             response.raise_for_status()
 
             data = response.json()
@@ -225,7 +232,7 @@ class SunoClient:
                 **kwargs
             }
 
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/lyrics'))
             response.raise_for_status()
 
             data = response.json()
@@ -250,7 +257,7 @@ class SunoClient:
                 "fileName": file_name
             }
 
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/file-url-upload'))
             response.raise_for_status()
 
             data = response.json()
@@ -266,41 +273,16 @@ class SunoClient:
 
     def wait_for_generation_completion(self, task_id: str, max_wait_time: int = 600) -> Dict[str, Any]:
         """Wait for music generation to complete and return results"""
-        import time
+        from core.services.suno_task_poller import get_suno_poller
 
         print(f"🔄 Laukiama užduoties {task_id} užbaigimo...")
-        start_time = time.time()
-        check_interval = 15  # seconds
-
-        while time.time() - start_time < max_wait_time:
-            try:
-                task_data = self.get_task_status(task_id)
-
-                if not task_data:
-                    print("❌ Nepavyko gauti užduoties būsenos")
-                    raise Exception("Failed to get task status")
-
-                status = task_data.get('status', 'UNKNOWN')
-                print(f"📊 Užduoties būsena: {status}")
-
-                if status in ['SUCCESS', 'TEXT_SUCCESS', 'AUDIO_SUCCESS', 'COMPLETE']:
-                    print("✅ Užduotis sėkmingai užbaigta!")
-                    return task_data
-                elif status in ['FAILED', 'CREATE_TASK_FAILED', 'GENERATE_AUDIO_FAILED']:
-                    error_msg = task_data.get('msg', 'Nežinoma klaida')
-                    print(f"❌ Užduotis nepavyko: {error_msg}")
-                    raise Exception(f"Task failed: {error_msg}")
-                elif status == 'SENSITIVE_WORD_ERROR':
-                    print("❌ Užduotis atmesta dėl turinio politikos")
-                    raise Exception("Content policy violation")
-
-                # Wait before next check
-                time.sleep(check_interval)
-
-            except Exception as e:
-                print(f"❌ Klaida tikrinant užduoties būseną: {e}")
-                time.sleep(check_interval)
-
-        # Timeout
-        print(f"⏰ Laukimo laikas ({max_wait_time}s) baigėsi")
-        raise Exception(f"Task completion timeout after {max_wait_time} seconds")
+        future = get_suno_poller().track(task_id, client=self, max_wait_time=max_wait_time)
+
+        try:
+            task_data = future.result(timeout=max_wait_time + 60)
+        except Exception as e:
+            print(f"❌ Užduotis nepavyko: {e}")
+            raise Exception(f"Task failed: {e}")
+
+        print("✅ Užduotis sėkmingai užbaigta!")
+        return task_data
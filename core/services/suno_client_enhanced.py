@@ -5,6 +5,8 @@ import time
 from typing import Dict, Optional, Any, Union, List
 from datetime import datetime
 
+from core.services.suno_http import get_suno_session, suno_timeout
+
 class SunoClientEnhanced:
     """
     Enhanced Suno API client combining working legacy methods with new official API features
@@ -26,11 +28,13 @@ class SunoClientEnhanced:
         """Private method for sending API requests with error handling"""
         url = f"{self.base_url}{endpoint}"
         
+        kwargs.setdefault('timeout', suno_timeout(endpoint))
+        
         try:
             if method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, **kwargs)
+                response = get_suno_session().post(url, headers=self.headers, **kwargs)
             else:
-                response = requests.get(url, headers=self.headers, **kwargs)
+                response = get_suno_session().get(url, headers=self.headers, **kwargs)
             
             response.raise_for_status()
             result = response.json()
@@ -49,7 +53,7 @@ class SunoClientEnhanced:
         """Get remaining credits"""
         try:
             url = f"{self.base_url}/generate/credit"
-            response = requests.get(url, headers=self.headers)
+            response = get_suno_session().get(url, headers=self.headers, timeout=suno_timeout('/generate/credit'))
             response.raise_for_status()
 
             data = response.json()
@@ -97,7 +101,7 @@ class SunoClientEnhanced:
                 if param in kwargs and kwargs[param] is not None:
                     payload[param] = kwargs[param]
             
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/generate'))
             response.raise_for_status()
 
             data = response.json()
@@ -169,7 +173,7 @@ class SunoClientEnhanced:
                 if param in kwargs and kwargs[param] is not None:
                     payload[param] = kwargs[param]
 
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = get_suno_session().post(url, json=payload, headers=self.headers, timeout=suno_timeout('/generate'))
             response.raise_for_status()
 
             data = response.json()
@@ -192,7 +196,7 @@ class SunoClientEnhanced:
             url = f"{self.base_url}/generate/record-info"
             params = {"taskId": task_id}
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = get_suno_session().get(url, headers=self.headers, params=params, timeout=suno_timeout('/generate/record-info'))
             response.raise_for_status()
 
             data = response.json()
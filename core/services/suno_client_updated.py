@@ -5,6 +5,8 @@ import time
 from typing import Dict, Optional, Any, Union, List
 from datetime import datetime
 
+from core.services.suno_http import get_suno_session, suno_timeout
+
 class SunoClientUpdated:
     """
     Updated Suno API client matching official documentation
@@ -26,11 +28,13 @@ class SunoClientUpdated:
         """Private method for sending API requests with error handling"""
         url = f"{self.base_url}{endpoint}"
         
+        kwargs.setdefault('timeout', suno_timeout(endpoint))
+        
         try:
             if method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, **kwargs)
+                response = get_suno_session().post(url, headers=self.headers, **kwargs)
             else:
-                response = requests.get(url, headers=self.headers, **kwargs)
+                response = get_suno_session().get(url, headers=self.headers, **kwargs)
             
             response.raise_for_status()
             result = response.json()
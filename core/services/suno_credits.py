@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+
+class InsufficientCreditsError(Exception):
+    """Raised when a generation would take the projected Suno balance below zero"""
+
+
+class SunoCreditLedger:
+    """Cached Suno credit balance with local accounting and admission control.
+
+    The balance reported by the API is cached for ``ttl`` seconds. Each
+    admitted generation is deducted locally straight away, so concurrent
+    pipelines see the projected balance without another network round-trip.
+    Stale reads return the cached value and refresh it on a background
+    thread. Only the very first read blocks on the API.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], Any]] = None, ttl: float = 60,
+                 credits_per_generation: Optional[int] = None):
+        if client_factory is None:
+            from core.services.suno_client import SunoClient
+            client_factory = SunoClient
+        self.client_factory = client_factory
+        self.ttl = ttl
+        self.credits_per_generation = credits_per_generation or int(os.getenv('SUNO_CREDITS_PER_GENERATION', '10'))
+
+        self._lock = threading.Lock()
+        self._status: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._reserved_since_fetch = 0
+        self._refreshing = False
+
+    def _fetch(self) -> None:
+        """Query the API and reconcile the local ledger with it"""
+        fetch_started = time.time()
+        try:
+            status = self.client_factory().get_credits_with_status()
+        except Exception as e:
+            status = {'status': 'connection_error', 'credits': 0, 'error': f"Connection failed: {e}",
+                      'message': "Unable to connect to Suno API"}
+
+        with self._lock:
+            self._refreshing = False
+            # Ignore results older than what we already hold (a slower concurrent refresh)
+            if fetch_started < self._fetched_at:
+                return
+            self._status = status
+            self._fetched_at = fetch_started
+            # The API balance now reflects everything submitted so far
+            self._reserved_since_fetch = 0
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._fetch, name='suno-credit-refresh', daemon=True).start()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Credit status in the get_credits_with_status() shape, with the projected balance"""
+        with self._lock:
+            status = self._status
+            stale = time.time() - self._fetched_at > self.ttl
+
+        if status is None:
+            self._fetch()
+        elif stale:
+            self._refresh_in_background()
+
+        with self._lock:
+            status = dict(self._status)
+            if status.get('status') == 'connected':
+                status['credits'] = max(0, status.get('credits', 0) - self._reserved_since_fetch)
+                status['message'] = f"{status['credits']} credits available"
+            status['cached_at'] = self._fetched_at
+            return status
+
+    def available_credits(self) -> int:
+        """Projected balance: last API value minus local deductions since then"""
+        return self.get_status().get('credits', 0)
+
+    def reserve(self, generations: int = 1) -> int:
+        """Admit ``generations`` Suno requests, deducting their cost locally.
+
+        Returns the projected balance afterwards; raises InsufficientCreditsError
+        (without deducting anything) if it would go negative.
+        """
+        status = self.get_status()
+        if status.get('status') != 'connected':
+            raise InsufficientCreditsError(status.get('error') or status.get('message', 'Suno credits unavailable'))
+
+        cost = generations * self.credits_per_generation
+        with self._lock:
+            projected = self._status.get('credits', 0) - self._reserved_since_fetch - cost
+            if projected < 0:
+                raise InsufficientCreditsError(
+                    f"Insufficient Suno AI credits: {projected + cost} available, {cost} needed "
+                    f"for {generations} generation(s). Please add credits at https://api.sunoapi.org/"
+                )
+            self._reserved_since_fetch += cost
+            # Reconcile with the real balance a few seconds after spending
+            self._fetched_at = min(self._fetched_at, time.time() - self.ttl + 5)
+        return projected
+
+    def release(self, generations: int = 1) -> None:
+        """Give back a reservation whose request Suno rejected or failed to generate"""
+        with self._lock:
+            self._reserved_since_fetch = max(0, self._reserved_since_fetch - generations * self.credits_per_generation)
+
+    def invalidate(self) -> None:
+        """Forget the cached balance (e.g. after the API key changes)"""
+        with self._lock:
+            self._status = None
+            self._fetched_at = 0.0
+            self._reserved_since_fetch = 0
+
+
+_ledger: Optional[SunoCreditLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_credit_ledger() -> SunoCreditLedger:
+    """Process-wide Suno credit ledger"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = SunoCreditLedger(ttl=float(os.getenv('SUNO_CREDIT_CACHE_TTL', '60')))
+    return _ledger
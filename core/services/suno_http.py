@@ -0,0 +1,57 @@
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds per Suno endpoint
+SUNO_TIMEOUTS = {
+    '/generate/credit': (5, 10),
+    '/generate/record-info': (5, 15),
+    '/lyrics/record-info': (5, 15),
+    '/generate': (5, 30),
+    '/lyrics': (5, 30),
+    '/file-url-upload': (5, 60),
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    # Status and read-error retries only apply to idempotent methods (urllib3's
+    # default allowed_methods), so a POST /generate is never resubmitted after
+    # Suno may already have accepted it - only connection failures are retried.
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_suno_session() -> requests.Session:
+    """Process-wide keep-alive session shared by all Suno clients"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def suno_timeout(endpoint: str) -> Tuple[int, int]:
+    """Timeout for a Suno endpoint path such as '/generate/credit'"""
+    return SUNO_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional
+
+SUCCESS_STATUSES = ('SUCCESS', 'TEXT_SUCCESS', 'AUDIO_SUCCESS', 'COMPLETE')
+FAILURE_STATUSES = ('FAILED', 'CREATE_TASK_FAILED', 'GENERATE_AUDIO_FAILED', 'CALLBACK_EXCEPTION')
+
+
+class SunoGenerationError(Exception):
+    """Raised through a task future when Suno reports a failed generation"""
+
+
+class _TrackedTask:
+    def __init__(self, suno_task_id: str, client, on_update: Optional[Callable[[Dict[str, Any]], None]],
+                 interval: float, deadline: float):
+        self.suno_task_id = suno_task_id
+        self.client = client
+        self.on_update = on_update
+        self.future: Future = Future()
+        self.interval = interval
+        self.next_poll = time.time() + interval
+        self.deadline = deadline
+        self.started = time.time()
+
+
+class SunoTaskPoller:
+    """One background loop that polls every outstanding Suno task.
+
+    Callers hand over a Suno task id with ``track()`` and get a Future back
+    instead of running their own sleep/poll loop. Each task is polled on an
+    adaptive schedule: quickly at first, then backing off geometrically up to
+    ``max_interval``. ``resolve()`` lets an external source (e.g. a webhook)
+    complete a task early.
+    """
+
+    def __init__(self, initial_interval: float = 3, max_interval: float = 20, backoff: float = 1.5):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._tasks: Dict[str, _TrackedTask] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        # Results that arrived (via resolve) before anyone called track() for the task
+        self._unclaimed: Dict[str, Dict[str, Any]] = {}
+
+    def track(self, suno_task_id: str, client, on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+              max_wait_time: float = 600) -> Future:
+        """Start tracking a Suno task; the Future resolves to its final record-info data"""
+        suno_task_id = str(suno_task_id)
+        with self._lock:
+            tracked = self._tasks.get(suno_task_id)
+            if tracked is None:
+                tracked = _TrackedTask(suno_task_id, client, on_update, self.initial_interval,
+                                       time.time() + max_wait_time)
+                self._tasks[suno_task_id] = tracked
+                self._ensure_thread()
+                self._wakeup.notify()
+            early_data = self._unclaimed.pop(suno_task_id, None)
+        if early_data is not None:
+            self._handle(tracked, early_data)
+        return tracked.future
+
+    def resolve(self, suno_task_id: str, task_data: Dict[str, Any]) -> bool:
+        """Apply task data obtained elsewhere; returns True if the task was being tracked"""
+        with self._lock:
+            tracked = self._tasks.get(str(suno_task_id))
+            if tracked is None:
+                # Keep the latest result briefly in case track() is called just after
+                self._unclaimed[str(suno_task_id)] = task_data
+                while len(self._unclaimed) > 200:
+                    del self._unclaimed[next(iter(self._unclaimed))]
+        if tracked is None:
+            return False
+        self._handle(tracked, task_data)
+        return True
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='suno-task-poller', daemon=True)
+            self._thread.start()
+
+    def _finish(self, tracked: _TrackedTask) -> bool:
+        """Stop tracking a task; True only for the one caller allowed to complete its future.
+
+        A webhook resolve() and the poll loop can finish the same task at once,
+        so whoever removes it from ``_tasks`` owns the completion.
+        """
+        with self._lock:
+            if self._tasks.get(tracked.suno_task_id) is tracked:
+                del self._tasks[tracked.suno_task_id]
+                return True
+            return False
+
+    def _handle(self, tracked: _TrackedTask, task_data: Dict[str, Any]) -> None:
+        if tracked.future.done():
+            return
+
+        if tracked.on_update:
+            try:
+                tracked.on_update(task_data)
+            except Exception as e:
+                print(f"⚠️ Suno task {tracked.suno_task_id[:8]} update callback failed: {e}")
+
+        status = task_data.get('status', 'UNKNOWN')
+        if status in SUCCESS_STATUSES:
+            if self._finish(tracked):
+                tracked.future.set_result(task_data)
+        elif status in FAILURE_STATUSES:
+            if self._finish(tracked):
+                error_msg = task_data.get('errorMessage') or task_data.get('msg', 'Unknown error')
+                tracked.future.set_exception(SunoGenerationError(f"Generation failed: {error_msg}"))
+        elif status == 'SENSITIVE_WORD_ERROR':
+            if self._finish(tracked):
+                tracked.future.set_exception(SunoGenerationError("Content policy violation"))
+
+    def _poll(self, tracked: _TrackedTask) -> None:
+        now = time.time()
+        if now >= tracked.deadline:
+            if self._finish(tracked):
+                waited = int(now - tracked.started)
+                tracked.future.set_exception(TimeoutError(f"Generation timeout after {waited} seconds"))
+            return
+
+        try:
+            task_data = tracked.client.get_task_status(tracked.suno_task_id)
+        except Exception as e:
+            # Transient errors just wait for the next scheduled poll
+            print(f"⚠️ Suno status check failed for {tracked.suno_task_id[:8]}: {e}")
+            task_data = None
+
+        if task_data:
+            self._handle(tracked, task_data)
+
+        tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+        tracked.next_poll = time.time() + tracked.interval
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._tasks:
+                        # Idle: let the thread exit; track() starts a new one when needed
+                        self._thread = None
+                        return
+                    now = time.time()
+                    due = [t for t in self._tasks.values() if t.next_poll <= now or t.deadline <= now]
+                    if due:
+                        break
+                    next_wake = min(min(t.next_poll, t.deadline) for t in self._tasks.values())
+                    self._wakeup.wait(max(0.05, next_wake - now))
+
+            for tracked in due:
+                if not tracked.future.done():
+                    try:
+                        self._poll(tracked)
+                    except Exception as e:
+                        # Never let one task's failure stop polling for the others
+                        print(f"⚠️ Suno poll of {tracked.suno_task_id[:8]} failed: {e}")
+
+
+# Suno callBackUrl stage -> record-info status, so callbacks and polling share one code path
+CALLBACK_STATUSES = {
+    'text': 'PENDING',
+    'first': 'FIRST_SUCCESS',
+    'complete': 'SUCCESS',
+    'error': 'FAILED',
+}
+
+
+def task_data_from_callback(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a Suno callBackUrl payload to the record-info shape the rest of the code expects.
+
+    Returns None if the payload is not a recognisable generation callback.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('data'), dict):
+        return None
+    data = payload['data']
+    suno_task_id = data.get('task_id') or data.get('taskId')
+    callback_type = data.get('callbackType')
+    if not suno_task_id or callback_type not in CALLBACK_STATUSES:
+        return None
+    suno_task_id = str(suno_task_id)
+
+    status = CALLBACK_STATUSES[callback_type]
+    if payload.get('code') not in (None, 200):
+        status = 'FAILED'
+
+    tracks = []
+    for clip in data.get('data') or []:
+        tracks.append({
+            'id': clip.get('id'),
+            'audioUrl': clip.get('audio_url'),
+            'sourceAudioUrl': clip.get('source_audio_url'),
+            'streamAudioUrl': clip.get('stream_audio_url'),
+            'sourceStreamAudioUrl': clip.get('source_stream_audio_url'),
+            'imageUrl': clip.get('image_url'),
+            'sourceImageUrl': clip.get('source_image_url'),
+            'prompt': clip.get('prompt'),
+            'modelName': clip.get('model_name'),
+            'title': clip.get('title'),
+            'tags': clip.get('tags'),
+            'createTime': clip.get('createTime'),
+            'duration': clip.get('duration'),
+        })
+
+    return {
+        'taskId': suno_task_id,
+        'status': status,
+        'errorMessage': payload.get('msg') if status == 'FAILED' else None,
+        'response': {'taskId': suno_task_id, 'sunoData': tracks},
+        'source': 'callback',
+    }
+
+
+def callbacks_enabled() -> bool:
+    """True when CALLBACK_URL points at a real receiver and callbacks are authenticated
+
+    Without SUNO_CALLBACK_TOKEN the callback route rejects everything, so
+    polling stays the primary source of completion.
+    """
+    callback_url = os.getenv('CALLBACK_URL', '')
+    return bool(callback_url) and 'webhook.site' not in callback_url and bool(os.getenv('SUNO_CALLBACK_TOKEN'))
+
+
+_poller: Optional[SunoTaskPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_suno_poller() -> SunoTaskPoller:
+    """Process-wide Suno task poller"""
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                if callbacks_enabled():
+                    # Callbacks deliver completion; polling is only a slow safety net
+                    _poller = SunoTaskPoller(initial_interval=20, max_interval=60)
+                else:
+                    _poller = SunoTaskPoller()
+    return _poller
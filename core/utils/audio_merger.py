@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Audio Merger - FFmpeg engine for long-form mixes
+Concatenates downloaded clips with crossfades and loudness normalization in a single FFmpeg pass
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+from core.services.media_probe import get_media_probe
+from core.utils.render_queue import get_render_queue, RENDER_PRIORITY_LOW, RenderCancelledError
+from core.utils.video_creator import VideoCreator
+
+
+class AudioMerger:
+    """Merges many clips into one audio file without loading any of them into Python.
+
+    Clips are streamed to disk, then FFmpeg reads them all in one filter graph:
+    an ``acrossfade`` chain when fading, otherwise the concat demuxer, followed
+    by a single-pass ``loudnorm`` so the mix plays at a consistent level.
+    """
+
+    def __init__(self, crossfade_seconds: Optional[float] = None, target_lufs: Optional[float] = None,
+                 download_workers: int = 4):
+        self.crossfade_seconds = crossfade_seconds if crossfade_seconds is not None else float(os.getenv('AUDIO_MERGE_CROSSFADE_SECONDS', '4'))
+        self.target_lufs = target_lufs if target_lufs is not None else float(os.getenv('AUDIO_MERGE_TARGET_LUFS', '-14'))
+        self.download_workers = download_workers
+        self.work_root = Path(tempfile.gettempdir()) / "audio_merge"
+        self.work_root.mkdir(parents=True, exist_ok=True)
+
+    def download_tracks(self, tracks: List[Dict[str, Any]], job_dir: Path,
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        is_cancelled: Optional[Callable[[], bool]] = None) -> List[Path]:
+        """Stream every track's ``url`` to ``job_dir`` in parallel, keeping track order
+
+        Tracks whose download failed are left out; a partial file from a
+        download that broke off mid-stream is deleted rather than merged.
+        Raises RenderCancelledError as soon as ``is_cancelled()`` turns true.
+        """
+        downloader = VideoCreator()
+        paths = [job_dir / f"track_{i:03d}.mp3" for i in range(len(tracks))]
+        downloaded = []
+
+        def fetch(index: int) -> bool:
+            return downloader.download_file(tracks[index]['url'], str(paths[index]), "audio")
+
+        with ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix='merge-download') as pool:
+            for done, (path, ok) in enumerate(zip(paths, pool.map(fetch, range(len(tracks)))), start=1):
+                if ok and path.exists() and path.stat().st_size > 0:
+                    downloaded.append(path)
+                else:
+                    path.unlink(missing_ok=True)
+                if progress:
+                    progress(done, len(tracks))
+                if is_cancelled and is_cancelled():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise RenderCancelledError("Merge cancelled while downloading tracks")
+
+        return downloaded
+
+    def crossfade_for(self, durations: List[float]) -> float:
+        """Crossfade length, capped at half of the shortest clip"""
+        return min([self.crossfade_seconds] + [duration / 2 for duration in durations if duration])
+
+    def build_command(self, inputs: List[Path], durations: List[float], output_path: str,
+                      fade_transitions: bool, job_dir: Path) -> List[str]:
+        """FFmpeg command merging ``inputs`` into ``output_path``"""
+        loudnorm = f'loudnorm=I={self.target_lufs}:TP=-1.5:LRA=11'
+        crossfade = self.crossfade_for(durations)
+        cmd = ['ffmpeg', '-y', '-v', 'error']
+
+        if fade_transitions and crossfade > 0 and len(inputs) > 1:
+            for path in inputs:
+                cmd += ['-i', str(path)]
+            steps = []
+            previous = '[0:a]'
+            for i in range(1, len(inputs)):
+                label = f'[x{i}]'
+                steps.append(f'{previous}[{i}:a]acrossfade=d={crossfade:.2f}:c1=tri:c2=tri{label}')
+                previous = label
+            steps.append(f'{previous}{loudnorm}[out]')
+            cmd += ['-filter_complex', ';'.join(steps), '-map', '[out]']
+        else:
+            concat_list = job_dir / 'concat.txt'
+            concat_list.write_text(''.join(f"file '{path.resolve()}'\n" for path in inputs))
+            cmd += ['-f', 'concat', '-safe', '0', '-i', str(concat_list), '-af', loudnorm]
+
+        cmd += ['-ar', '44100', '-c:a', 'libmp3lame', '-b:a', '192k', output_path]
+        return cmd
+
+    def merge(self, tracks: List[Dict[str, Any]], output_path: str, fade_transitions: bool = True,
+              progress: Optional[Callable[[int, str], None]] = None, render_tag: Optional[str] = None,
+              is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Download ``tracks`` (dicts with ``url``) and merge them into ``output_path``
+
+        ``progress(percent, step)`` is called while downloading (0-40%) and encoding (40-100%).
+        ``is_cancelled()`` is checked after every download and before the merge is
+        queued; RenderCancelledError is raised once it returns True.
+        """
+        def report(percent: int, step: str):
+            if progress:
+                progress(percent, step)
+
+        job_dir = self.work_root / uuid.uuid4().hex
+        job_dir.mkdir(parents=True)
+        try:
+            inputs = self.download_tracks(
+                tracks, job_dir,
+                progress=lambda done, total: report(int(40 * done / total), f"Downloaded {done}/{total} tracks"),
+                is_cancelled=is_cancelled
+            )
+            if len(inputs) < 2:
+                return {'success': False, 'error': f'Only {len(inputs)} of {len(tracks)} tracks could be downloaded'}
+
+            probes = get_media_probe().probe_many(inputs)
+            durations = [(probes.get(str(path)) or {}).get('duration') or 0 for path in inputs]
+            crossfades = (len(inputs) - 1) * self.crossfade_for(durations) if fade_transitions else 0
+            expected_duration = max(sum(durations) - crossfades, 0)
+
+            if is_cancelled and is_cancelled():
+                raise RenderCancelledError("Merge cancelled before encoding")
+
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            cmd = self.build_command(inputs, durations, output_path, fade_transitions, job_dir)
+            report(40, f"Merging {len(inputs)} tracks ({expected_duration / 60:.0f} min)...")
+            print(f"🎚️ Merging {len(inputs)} tracks into {output_path}")
+
+            result = get_render_queue().run(
+                cmd, priority=RENDER_PRIORITY_LOW, timeout=max(1800, expected_duration), duration=expected_duration,
+                progress=lambda info: report(40 + int(60 * info['fraction']), f"Encoding mix: {info['fraction'] * 100:.0f}%"),
+                tag=render_tag
+            )
+            if result.returncode != 0 or not Path(output_path).exists():
+                print(f"❌ Audio merge failed: {result.stderr[-500:]}")
+                return {'success': False, 'error': f'FFmpeg merge failed: {result.stderr[-500:]}'}
+
+            total_duration = get_media_probe().duration(output_path) or expected_duration
+            print(f"✅ Merged mix: {total_duration / 60:.1f} min")
+            return {
+                'success': True,
+                'audio_path': output_path,
+                'total_duration': total_duration,
+                'track_count': len(inputs),
+                'skipped_tracks': len(tracks) - len(inputs),
+                'fade_transitions': fade_transitions
+            }
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
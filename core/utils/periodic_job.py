@@ -0,0 +1,36 @@
+import threading
+from typing import Callable
+
+
+class PeriodicJob(threading.Thread):
+    """Daemon thread that runs ``func`` every ``interval`` seconds.
+
+    ``trigger()`` runs the job early (e.g. right after a change that it
+    reconciles); errors are logged and the schedule carries on.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], object], run_immediately: bool = True):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self.func = func
+        self.run_immediately = run_immediately
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def trigger(self) -> None:
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    def run(self) -> None:
+        if not self.run_immediately:
+            self._wakeup.wait(self.interval)
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                self.func()
+            except Exception as e:
+                print(f"⚠️ Periodic job {self.name} failed: {e}")
+            self._wakeup.wait(self.interval)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Render Cache - content-addressed store of finished videos
+Identical audio + image + encoding profile is rendered once and reused
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Hardlink ``source`` to ``target`` (replacing it), copying when linking isn't possible"""
+    temp_target = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(source, temp_target)
+    except OSError:
+        shutil.copy2(source, temp_target)
+    os.replace(temp_target, target)
+
+
+class RenderCache:
+    """Finished MP4s keyed by sha256(audio bytes, image bytes, encoding profile).
+
+    Entries live in ``cache_dir`` as ``<key>.mp4`` and are handed out as
+    hardlinks, so a hit costs no encoding and no extra disk. A hit touches the
+    entry's mtime; when the cache grows past ``max_bytes`` the least recently
+    used entries are removed (videos already linked elsewhere keep their data).
+    Renders of streamed audio are also linked under a URL-derived alias key,
+    since their bytes are only known once the render has finished.
+    """
+
+    def __init__(self, cache_dir: str = 'output/videos/.render_cache', max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or int(float(os.getenv('RENDER_CACHE_MAX_GB', '20')) * 1024 ** 3)
+        self._evict_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(audio_digest: str, image_digest: str, profile: Dict[str, Any]) -> str:
+        profile_json = json.dumps(profile, sort_keys=True, default=str)
+        return hashlib.sha256(f"{audio_digest}:{image_digest}:{profile_json}".encode()).hexdigest()
+
+    def key_for(self, audio_path: str, image_path: str, profile: Dict[str, Any]) -> str:
+        return self.make_key(file_digest(audio_path), file_digest(image_path), profile)
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp4"
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Place the cached render for ``key`` at ``output_path``; False on a miss"""
+        entry = self._entry(key)
+        try:
+            os.utime(entry)
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(entry, Path(output_path))
+        except FileNotFoundError:
+            return False
+        print(f"♻️ Render cache hit {key[:12]} -> {output_path}")
+        return True
+
+    def store(self, key: str, video_path: str, *alias_keys: str):
+        """Add a finished render to the cache, also reachable under ``alias_keys``"""
+        try:
+            _link_or_copy(Path(video_path), self._entry(key))
+            for alias_key in alias_keys:
+                _link_or_copy(self._entry(key), self._entry(alias_key))
+        except OSError as e:
+            print(f"⚠️ Could not add render to cache: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in max_bytes; returns how many were removed"""
+        with self._evict_lock:
+            # Several keys may link to one file (see store()), so size and age are per inode
+            inodes: Dict[int, list] = {}
+            for entry in self.cache_dir.glob('*.mp4'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                inodes.setdefault(stat.st_ino, [stat.st_mtime, stat.st_size, []])[2].append(entry)
+
+            total = sum(size for _, size, _ in inodes.values())
+            removed = 0
+            for _, size, entries in sorted(inodes.values(), key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                for entry in entries:
+                    entry.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            if removed:
+                print(f"🧹 Render cache evicted {removed} entries ({total / 1024 ** 3:.1f} GB kept)")
+            return removed
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Process-wide render cache"""
+    global _render_cache
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                _render_cache = RenderCache()
+    return _render_cache
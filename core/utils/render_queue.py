@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+FFmpeg Render Queue
+Runs every FFmpeg render through a fixed number of slots with priorities, timeouts and cancellation
+"""
+
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Callable, BinaryIO
+
+RENDER_PRIORITY_HIGH = 0      # interactive requests from the dashboard
+RENDER_PRIORITY_NORMAL = 5    # pipelines and automation
+RENDER_PRIORITY_LOW = 9       # long batch jobs such as merged mixes
+
+STDERR_TAIL_LINES = 200
+PROGRESS_INTERVAL_SECONDS = float(os.getenv('FFMPEG_PROGRESS_INTERVAL_SECONDS', '5'))
+STALL_TIMEOUT_SECONDS = float(os.getenv('FFMPEG_STALL_TIMEOUT_SECONDS', '120'))
+
+
+class RenderCancelledError(Exception):
+    """Raised by a render job that was cancelled before or while running"""
+
+
+class RenderStalledError(Exception):
+    """Raised by a render job killed because FFmpeg stopped making progress"""
+
+
+def _parse_speed(value: str) -> Optional[float]:
+    """FFmpeg reports speed as e.g. '12.3x' (or 'N/A' before the first frame)"""
+    try:
+        return float(value.rstrip('x'))
+    except ValueError:
+        return None
+
+
+class RenderJob:
+    """One FFmpeg invocation waiting for, or holding, a render slot"""
+
+    def __init__(self, cmd: List[str], priority: int, timeout: Optional[float], duration: Optional[float],
+                 progress: Optional[Callable[[Dict[str, Any]], None]], tag: Optional[str],
+                 feed: Optional[Callable[[BinaryIO], None]] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.cmd = cmd
+        self.priority = priority
+        self.timeout = timeout
+        self.duration = duration
+        self.progress = progress
+        self.tag = tag
+        self.feed = feed
+        self.future: Future = Future()
+        self.process: Optional[subprocess.Popen] = None
+        self.status = 'queued'
+        self.fraction = 0.0
+        self.out_time = 0.0
+        self.speed: Optional[float] = None
+        self.fps: Optional[float] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.last_advance_at: Optional[float] = None
+
+    def eta_seconds(self) -> Optional[float]:
+        if not self.duration or not self.speed:
+            return None
+        return max(self.duration - self.out_time, 0) / self.speed
+
+    def progress_info(self) -> Dict[str, Any]:
+        """Snapshot passed to the progress callback"""
+        return {
+            'fraction': self.fraction,
+            'out_time': self.out_time,
+            'duration': self.duration,
+            'speed': self.speed,
+            'fps': self.fps,
+            'eta_seconds': self.eta_seconds()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'tag': self.tag,
+            'priority': self.priority,
+            'status': self.status,
+            'progress': round(self.fraction * 100, 1),
+            'speed': self.speed,
+            'eta_seconds': round(self.eta_seconds()) if self.eta_seconds() is not None else None,
+            'waiting_seconds': round((self.started_at or time.time()) - self.submitted_at, 1),
+            'running_seconds': round(time.time() - self.started_at, 1) if self.started_at else 0
+        }
+
+
+class RenderQueue:
+    """Priority queue of FFmpeg jobs executed by ``slots`` worker threads.
+
+    Lower priority numbers run first; equal priorities run in submission
+    order. FFmpeg's ``-progress`` output is parsed as it streams and reported
+    every PROGRESS_INTERVAL_SECONDS; only the tail of stderr is kept. A job is
+    killed when it exceeds its timeout, when its output time stops advancing
+    for STALL_TIMEOUT_SECONDS, or when it is cancelled.
+    """
+
+    def __init__(self, slots: Optional[int] = None):
+        self.slots = slots or int(os.getenv('FFMPEG_RENDER_SLOTS', str(max(1, (os.cpu_count() or 2) // 4))))
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, RenderJob] = {}
+        self._lock = threading.Lock()
+
+        for i in range(self.slots):
+            threading.Thread(target=self._worker, name=f'ffmpeg-render-{i}', daemon=True).start()
+        print(f"🎬 Render queue started with {self.slots} FFmpeg slot(s)")
+
+    def submit(self, cmd: List[str], priority: int = RENDER_PRIORITY_NORMAL, timeout: Optional[float] = None,
+               duration: Optional[float] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+               tag: Optional[str] = None, feed: Optional[Callable[[BinaryIO], None]] = None) -> RenderJob:
+        """Queue an FFmpeg command; ``job.future`` resolves to a CompletedProcess
+
+        ``progress(info)`` receives ``{'fraction', 'out_time', 'duration',
+        'speed', 'fps', 'eta_seconds'}``; ``fraction`` and the ETA need
+        ``duration`` (seconds of output). ``tag`` groups jobs for cancel_tag(),
+        e.g. the task id of the pipeline that submitted them. ``feed(stdin)``
+        runs on its own thread once FFmpeg starts and writes input for
+        ``-i pipe:0`` (for example a streaming download); FFmpeg sees EOF when
+        it returns.
+        """
+        job = RenderJob(list(cmd), priority, timeout, duration, progress, tag, feed)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._queue.put((priority, next(self._sequence), job))
+        return job
+
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """Submit a job and block until it finishes (see submit() for arguments)"""
+        return self.submit(cmd, **kwargs).future.result()
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or kill a running one"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in ('cancelled', 'finished'):
+                return False
+            job.status = 'cancelled'
+            process = job.process
+        if process is not None:
+            process.kill()
+        else:
+            job.future.set_exception(RenderCancelledError(f"Render job {job_id} cancelled"))
+        print(f"🎬 Render job {job_id} cancelled")
+        return True
+
+    def cancel_tag(self, tag: str) -> int:
+        """Cancel every job submitted with ``tag``; returns how many were cancelled"""
+        with self._lock:
+            job_ids = [job.job_id for job in self._jobs.values() if job.tag == tag]
+        return sum(1 for job_id in job_ids if self.cancel(job_id))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = [job.to_dict() for job in self._jobs.values()]
+        return {
+            'slots': self.slots,
+            'running': sum(1 for job in jobs if job['status'] == 'running'),
+            'queued': sum(1 for job in jobs if job['status'] == 'queued'),
+            'jobs': jobs
+        }
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                if job.status == 'cancelled':
+                    continue
+                self._execute(job)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._jobs.pop(job.job_id, None)
+
+    def _execute(self, job: RenderJob):
+        cmd = job.cmd
+        if '-progress' not in cmd:
+            cmd = cmd[:1] + ['-nostdin', '-progress', 'pipe:1', '-nostats'] + cmd[1:]
+
+        stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+        killed_reason: Dict[str, str] = {}
+        finished = threading.Event()
+
+        with self._lock:
+            if job.status == 'cancelled':
+                return
+            # A raw pipe keeps stdin binary while stdout/stderr are read as text
+            stdin_read, stdin_write = os.pipe() if job.feed else (subprocess.DEVNULL, None)
+            try:
+                job.process = subprocess.Popen(cmd, stdin=stdin_read, stdout=subprocess.PIPE,
+                                               stderr=subprocess.PIPE, text=True, errors='replace')
+            except Exception:
+                if job.feed:
+                    os.close(stdin_read)
+                    os.close(stdin_write)
+                raise
+            job.status = 'running'
+            job.started_at = job.last_advance_at = time.time()
+
+        feeder = None
+        if job.feed:
+            os.close(stdin_read)
+
+            def feed_stdin():
+                try:
+                    with os.fdopen(stdin_write, 'wb') as stdin:
+                        job.feed(stdin)
+                except BrokenPipeError:
+                    pass  # FFmpeg exited early; its return code says why
+                except Exception as e:
+                    print(f"⚠️ Render job {job.job_id} input feed failed: {e}")
+
+            feeder = threading.Thread(target=feed_stdin, name=f'ffmpeg-feed-{job.job_id}', daemon=True)
+            feeder.start()
+
+        def drain_stderr():
+            for line in job.process.stderr:
+                stderr_tail.append(line)
+
+        def watchdog():
+            # Reading stdout blocks while FFmpeg is silent, so timeouts are enforced here
+            while not finished.wait(1):
+                now = time.time()
+                if job.timeout and now - job.started_at > job.timeout:
+                    killed_reason['reason'] = 'timeout'
+                elif STALL_TIMEOUT_SECONDS and now - job.last_advance_at > STALL_TIMEOUT_SECONDS:
+                    killed_reason['reason'] = 'stalled'
+                else:
+                    continue
+                job.process.kill()
+                return
+
+        stderr_reader = threading.Thread(target=drain_stderr, name=f'ffmpeg-stderr-{job.job_id}', daemon=True)
+        stderr_reader.start()
+        threading.Thread(target=watchdog, name=f'ffmpeg-watchdog-{job.job_id}', daemon=True).start()
+
+        try:
+            self._read_progress(job)
+            job.process.wait()
+        finally:
+            finished.set()
+            stderr_reader.join(timeout=5)
+            if feeder:
+                feeder.join(timeout=30)
+
+        with self._lock:
+            cancelled = job.status == 'cancelled'
+            job.status = 'finished'
+
+        reason = killed_reason.get('reason')
+        if cancelled:
+            job.future.set_exception(RenderCancelledError(f"Render job {job.job_id} cancelled"))
+        elif reason == 'timeout':
+            print(f"⏱️ Render job {job.job_id} killed after {job.timeout:.0f}s")
+            job.future.set_exception(subprocess.TimeoutExpired(cmd, job.timeout, stderr=''.join(stderr_tail)))
+        elif reason == 'stalled':
+            print(f"⚠️ Render job {job.job_id} stalled at {job.out_time:.0f}s of output, killed")
+            job.future.set_exception(RenderStalledError(
+                f"FFmpeg made no progress for {STALL_TIMEOUT_SECONDS:.0f}s (at {job.out_time:.0f}s of output)"
+            ))
+        else:
+            job.future.set_result(subprocess.CompletedProcess(cmd, job.process.returncode, '', ''.join(stderr_tail)))
+
+    def _read_progress(self, job: RenderJob):
+        """Consume FFmpeg's ``-progress`` key=value blocks, reporting at a fixed interval"""
+        block: Dict[str, str] = {}
+        last_report = 0.0
+        for line in job.process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key != 'progress':
+                block[key] = value
+                continue
+
+            out_time_us = block.get('out_time_us', '')
+            if out_time_us.isdigit() and int(out_time_us) / 1_000_000 > job.out_time:
+                job.out_time = int(out_time_us) / 1_000_000
+                job.last_advance_at = time.time()
+                if job.duration:
+                    job.fraction = min(1.0, job.out_time / job.duration)
+            job.speed = _parse_speed(block.get('speed', '')) or job.speed
+            try:
+                job.fps = float(block.get('fps', '')) or job.fps
+            except ValueError:
+                pass
+            block = {}
+
+            now = time.time()
+            if job.progress and (value == 'end' or now - last_report >= PROGRESS_INTERVAL_SECONDS):
+                last_report = now
+                try:
+                    job.progress(job.progress_info())
+                except Exception as e:
+                    print(f"⚠️ Render progress callback failed: {e}")
+
+
+_render_queue: Optional[RenderQueue] = None
+_render_queue_lock = threading.Lock()
+
+
+def get_render_queue() -> RenderQueue:
+    """Process-wide render queue"""
+    global _render_queue
+    if _render_queue is None:
+        with _render_queue_lock:
+            if _render_queue is None:
+                _render_queue = RenderQueue()
+    return _render_queue
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from core.database.sqlite_connections import get_connection
+from core.utils.task_journal import json_default
+
+
+class TaskLogBuffer(list):
+    """List of task log lines that keeps only the newest ``maxlen`` entries.
+
+    It is still a plain list as far as JSON and the existing
+    ``task['logs'].append(...)`` call sites are concerned.
+    """
+
+    def __init__(self, iterable=(), maxlen: int = 200):
+        super().__init__(iterable)
+        self.maxlen = maxlen
+        self._trim()
+
+    def _trim(self) -> None:
+        overflow = len(self) - self.maxlen
+        if overflow > 0:
+            del self[:overflow]
+
+    def append(self, item) -> None:
+        super().append(item)
+        self._trim()
+
+    def extend(self, iterable) -> None:
+        super().extend(iterable)
+        self._trim()
+
+
+class TaskArchive:
+    """SQLite archive for generation tasks evicted from memory.
+
+    Tasks are stored as zlib-compressed JSON keyed by task_id and only read
+    back when a status lookup misses the in-memory store.
+    """
+
+    def __init__(self, db_path: str = 'data/task_archive.db'):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        with get_connection(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archived_tasks (
+                    task_id TEXT PRIMARY KEY,
+                    task_type TEXT,
+                    status TEXT,
+                    archived_at REAL NOT NULL,
+                    data BLOB NOT NULL
+                )
+            ''')
+
+    def archive(self, tasks: Dict[str, Dict[str, Any]]) -> int:
+        """Store a batch of tasks in a single transaction"""
+        if not tasks:
+            return 0
+        now = time.time()
+        rows = [
+            (
+                task_id,
+                task.get('type'),
+                task.get('status'),
+                now,
+                zlib.compress(json.dumps(task, ensure_ascii=False, default=json_default).encode('utf-8'))
+            )
+            for task_id, task in tasks.items()
+        ]
+        with self._lock, get_connection(self.db_path) as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO archived_tasks (task_id, task_type, status, archived_at, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Load one archived task, or None if it was never archived"""
+        with get_connection(self.db_path) as conn:
+            row = conn.execute('SELECT data FROM archived_tasks WHERE task_id = ?', (task_id,)).fetchone()
+        if not row:
+            return None
+        task = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+        task['archived'] = True
+        return task
+
+    def count(self) -> int:
+        with get_connection(self.db_path) as conn:
+            return conn.execute('SELECT COUNT(*) FROM archived_tasks').fetchone()[0]
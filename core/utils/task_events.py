@@ -0,0 +1,92 @@
+import json
+import queue
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class TaskEventBroker:
+    """In-process pub/sub for task progress events.
+
+    Each task gets its own increasing event id sequence and a short history so
+    that a reconnecting Server-Sent Events client can resume from its
+    ``Last-Event-ID`` without missing updates.
+    """
+
+    def __init__(self, history_size: int = 50, max_tasks: int = 1000):
+        self.history_size = history_size
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._history: 'OrderedDict[str, deque]' = OrderedDict()
+        self._last_id: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+
+    def publish(self, task_id: str, payload: Dict[str, Any]) -> int:
+        """Record an event for a task and hand it to every live subscriber"""
+        with self._lock:
+            event_id = self._last_id.get(task_id, 0) + 1
+            self._last_id[task_id] = event_id
+
+            history = self._history.get(task_id)
+            if history is None:
+                history = self._history[task_id] = deque(maxlen=self.history_size)
+            else:
+                self._history.move_to_end(task_id)
+            history.append((event_id, payload))
+
+            # Forget the least recently active tasks nobody is listening to
+            while len(self._history) > self.max_tasks:
+                oldest = next(iter(self._history))
+                if self._subscribers.get(oldest):
+                    self._history.move_to_end(oldest)
+                    break
+                del self._history[oldest]
+                self._last_id.pop(oldest, None)
+
+            subscribers = list(self._subscribers.get(task_id, ()))
+
+        for subscriber in subscribers:
+            subscriber.put((event_id, payload))
+        return event_id
+
+    def subscribe(self, task_id: str, last_event_id: Optional[int] = None) -> Tuple[queue.Queue, bool, int]:
+        """Register a subscriber queue, pre-filled with events after ``last_event_id``.
+
+        Returns the queue, whether the replay is complete, and the task's
+        current event id. The replay is incomplete for fresh connections
+        (``last_event_id`` is None) and when the requested events have
+        already fallen out of the history; the caller should then send a full
+        snapshot of the task tagged with the current event id.
+        """
+        subscriber: queue.Queue = queue.Queue()
+        with self._lock:
+            current_id = self._last_id.get(task_id, 0)
+            history = self._history.get(task_id, ())
+            complete = last_event_id is not None and (
+                last_event_id == current_id or bool(history) and history[0][0] <= last_event_id + 1 <= current_id
+            )
+            if complete:
+                for event_id, payload in history:
+                    if event_id > last_event_id:
+                        subscriber.put((event_id, payload))
+            self._subscribers.setdefault(task_id, []).append(subscriber)
+        return subscriber, complete, current_id
+
+    def unsubscribe(self, task_id: str, subscriber: queue.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(task_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(task_id, None)
+
+
+def format_sse(data: Dict[str, Any], event_id: Optional[int] = None, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,220 @@
+import os
+import json
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+
+def json_default(value: Any) -> Any:
+    """Serialize datetime-like values the same way the snapshot always has"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class TaskJournal:
+    """Append-only persistence for generation tasks.
+
+    Every change is written as one JSON line to ``<snapshot>.journal``. On
+    startup the snapshot is loaded and the journal replayed on top of it.
+    Once the journal grows past ``compact_every`` entries the full task dict
+    is written back to the snapshot and the journal is truncated.
+    """
+
+    def __init__(self, snapshot_file: str = 'data/generation_tasks.json',
+                 journal_file: Optional[str] = None, compact_every: int = 500):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or f"{os.path.splitext(snapshot_file)[0]}.journal"
+        self.compact_every = compact_every
+        self.entries_since_compact = 0
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the snapshot and replay any journal entries written after it"""
+        tasks: Dict[str, Dict[str, Any]] = {}
+        directory = os.path.dirname(self.snapshot_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                tasks = json.load(f)
+
+        replayed = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write - everything before it is intact
+                        print(f"⚠️ Skipping corrupt journal entry in {self.journal_file}")
+                        continue
+                    self._apply(tasks, entry)
+                    replayed += 1
+
+        self.entries_since_compact = replayed
+        if replayed:
+            print(f"📁 Replayed {replayed} task journal entries")
+        return tasks
+
+    @staticmethod
+    def _apply(tasks: Dict[str, Dict[str, Any]], entry: Dict[str, Any]) -> None:
+        task_id = entry.get('task_id')
+        op = entry.get('op')
+        if op == 'put':
+            tasks[task_id] = entry.get('task', {})
+        elif op == 'update' and task_id in tasks:
+            tasks[task_id].update(entry.get('fields', {}))
+            if entry.get('append_logs'):
+                tasks[task_id].setdefault('logs', []).extend(entry['append_logs'])
+        elif op == 'delete':
+            tasks.pop(task_id, None)
+
+    def write_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """Append a batch of entries with a single write and flush"""
+        if not entries:
+            return
+        lines = ''.join(json.dumps(entry, ensure_ascii=False, default=json_default) + '\n'
+                        for entry in entries)
+        with self._lock:
+            if self._handle is None:
+                self._handle = open(self.journal_file, 'a', encoding='utf-8')
+            self._handle.write(lines)
+            self._handle.flush()
+            self.entries_since_compact += len(entries)
+
+    def needs_compaction(self) -> bool:
+        return self.entries_since_compact >= self.compact_every
+
+    def compact(self, tasks: Dict[str, Dict[str, Any]]) -> None:
+        """Write a full snapshot atomically and truncate the journal"""
+        with self._lock:
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(tasks, f, ensure_ascii=False, default=json_default)
+            os.replace(tmp_file, self.snapshot_file)
+
+            if self._handle is not None:
+                self._handle.close()
+            self._handle = open(self.journal_file, 'w', encoding='utf-8')
+            self.entries_since_compact = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+class TaskJournalWriter(threading.Thread):
+    """Background thread that coalesces task changes and flushes them in batches.
+
+    Callers mark tasks dirty through ``put``/``update`` and return immediately.
+    Every ``flush_interval_ms`` the accumulated deltas are merged per task and
+    written as one batch; ``urgent=True`` (terminal states) wakes the thread
+    straight away. ``lock`` must be held by callers while they mutate a task and
+    enqueue its delta so compaction never sees half-applied changes.
+    """
+
+    def __init__(self, journal: TaskJournal, snapshot_provider: Callable[[], Dict[str, Dict[str, Any]]],
+                 flush_interval_ms: int = 500):
+        super().__init__(name='task-journal-writer', daemon=True)
+        self.journal = journal
+        self.snapshot_provider = snapshot_provider
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.lock = threading.RLock()
+        self._wakeup = threading.Condition(self.lock)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_requested = False
+        self._stopped = False
+
+    def put(self, task_id: str, task: Dict[str, Any]) -> None:
+        """Mark a task as newly created; its full state is written on the next flush"""
+        with self.lock:
+            self._pending[task_id] = {'task': task, 'fields': {}, 'logs': []}
+
+    def delete(self, task_id: str) -> None:
+        """Mark a task as removed from the journal; any pending changes are dropped"""
+        with self.lock:
+            self._pending[task_id] = {'task': None, 'fields': {}, 'logs': [], 'deleted': True}
+
+    def update(self, task_id: str, fields: Dict[str, Any], log: Optional[str] = None,
+               urgent: bool = False) -> None:
+        """Merge a field delta into the task's pending entry"""
+        with self.lock:
+            pending = self._pending.setdefault(task_id, {'task': None, 'fields': {}, 'logs': []})
+            if pending['task'] is None and not pending.get('deleted'):
+                pending['fields'].update(fields)
+                if log:
+                    pending['logs'].append(log)
+            if urgent:
+                self._flush_requested = True
+                self._wakeup.notify()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            pending, self._pending = self._pending, {}
+            self._flush_requested = False
+            entries = []
+            for task_id, change in pending.items():
+                if change.get('deleted'):
+                    entries.append({'op': 'delete', 'task_id': task_id})
+                elif change['task'] is not None:
+                    entries.append({'op': 'put', 'task_id': task_id, 'task': copy_task(change['task'])})
+                else:
+                    entry = {'op': 'update', 'task_id': task_id, 'fields': change['fields']}
+                    if change['logs']:
+                        entry['append_logs'] = change['logs']
+                    entries.append(entry)
+            return entries
+
+    def flush(self) -> None:
+        """Write everything pending, compacting if the journal has grown too large"""
+        try:
+            if self.journal.needs_compaction():
+                self.compact()
+            else:
+                self.journal.write_entries(self._drain())
+        except Exception as e:
+            print(f"⚠️ Error flushing task journal: {e}")
+
+    def compact(self) -> None:
+        """Replace the journal with a full snapshot of the current task state"""
+        with self.lock:
+            # The snapshot already contains every pending delta, so they can be dropped
+            self._pending = {}
+            self._flush_requested = False
+            snapshot = self.snapshot_provider()
+        self.journal.compact(snapshot)
+
+    def run(self) -> None:
+        while True:
+            with self.lock:
+                if not self._stopped and not self._flush_requested:
+                    self._wakeup.wait(self.flush_interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def stop(self) -> None:
+        """Stop the thread after a final flush"""
+        with self.lock:
+            self._stopped = True
+            self._wakeup.notify()
+        if self.is_alive():
+            self.join(timeout=5)
+        else:
+            self.flush()
+
+
+def copy_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a task deep enough that appends to its log list after the copy are not captured"""
+    task_copy = dict(task)
+    if isinstance(task_copy.get('logs'), list):
+        task_copy['logs'] = list(task_copy['logs'])
+    return task_copy
@@ -9,9 +9,24 @@ import subprocess
 import tempfile
 import requests
 from pathlib import Path
-from typing import Optional, Dict, Any
-import json
+from typing import Optional, Dict, Any, Callable
 import time
+import uuid
+import hashlib
+from urllib.parse import urlparse
+
+from core.services.media_probe import get_media_probe
+from core.utils.render_cache import get_render_cache, file_digest
+from core.utils.render_queue import get_render_queue, RENDER_PRIORITY_NORMAL
+
+# Bump when FFmpeg arguments change in a way the settings below don't capture
+RENDER_PROFILE_VERSION = 1
+
+# Hosts serving finished Suno clips: a clip URL's bytes never change, so the URL alone identifies the audio
+IMMUTABLE_AUDIO_HOSTS = tuple(
+    host.strip() for host in os.getenv('RENDER_CACHE_IMMUTABLE_AUDIO_HOSTS', 'cdn1.suno.ai,cdn2.suno.ai,mfile.erweima.ai').split(',')
+    if host.strip()
+)
 
 class VideoCreator:
     """Professional video creation using FFmpeg for YouTube optimization"""
@@ -31,6 +46,16 @@ class VideoCreator:
             'preset': 'fast',          # Encoding speed vs quality balance
             'crf': '23'                # Constant Rate Factor (18-28 range, lower = better quality)
         }
+        
+        # Static visual mode: the picture never changes, so encode few frames with rare keyframes
+        self.still_image_mode = os.getenv('VIDEO_STILL_IMAGE_MODE', 'true').lower() == 'true'
+        self.still_image_settings = {
+            'fps': os.getenv('VIDEO_STILL_IMAGE_FPS', '2'),
+            'gop_seconds': int(os.getenv('VIDEO_STILL_IMAGE_GOP_SECONDS', '30')),
+            'tune': 'stillimage'
+        }
+        
+        self.render_cache_enabled = os.getenv('RENDER_CACHE_ENABLED', 'true').lower() == 'true'
     
     def download_file(self, url: str, output_path: str, file_type: str = "audio") -> bool:
         """Enhanced download with better error reporting"""
@@ -90,109 +115,250 @@ class VideoCreator:
             return False
     
     def get_audio_duration(self, audio_path: str) -> Optional[float]:
-        """Get audio duration using ffprobe"""
+        """Get audio duration using ffprobe (cached per file size/mtime)"""
+        duration = get_media_probe().duration(audio_path)
+        if duration is None:
+            print(f"⚠️ Could not get audio duration: {audio_path}")
+            return None
+        print(f"🎵 Audio duration: {duration:.1f} seconds")
+        return duration
+    
+    def prepare_still_image(self, image_path: str) -> str:
+        """Scale/letterbox the image once to the output resolution so FFmpeg never rescales per frame"""
         try:
-            cmd = [
-                'ffprobe', 
-                '-v', 'quiet', 
-                '-print_format', 'json', 
-                '-show_format', 
-                audio_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                duration = float(data['format']['duration'])
-                print(f"🎵 Audio duration: {duration:.1f} seconds")
-                return duration
-            else:
-                print(f"⚠️ Could not get audio duration: {result.stderr}")
-                return None
-                
+            from PIL import Image, ImageOps
+        except ImportError:
+            return image_path
+        
+        try:
+            width, height = (int(value) for value in self.youtube_settings['resolution'].split('x'))
+            prepared_path = self.temp_dir / f"still_{uuid.uuid4().hex}.png"
+            with Image.open(image_path) as image:
+                ImageOps.pad(image.convert('RGB'), (width, height), color='black').save(prepared_path)
+            return str(prepared_path)
         except Exception as e:
-            print(f"❌ Error getting audio duration: {e}")
+            print(f"⚠️ Could not pre-scale image, FFmpeg will scale it: {e}")
+            return image_path
+    
+    def _image_input_args(self, image_path: str) -> list:
+        """FFmpeg input arguments for the looped cover image"""
+        if self.still_image_mode:
+            return ['-loop', '1', '-framerate', self.still_image_settings['fps'], '-i', image_path]
+        return ['-loop', '1', '-i', image_path]
+    
+    def _video_encode_args(self, prescaled: bool = False) -> list:
+        """libx264 arguments for the video stream"""
+        if not self.still_image_mode:
+            return ['-c:v', 'libx264', '-pix_fmt', 'yuv420p']
+        
+        width, height = self.youtube_settings['resolution'].split('x')
+        fps = self.still_image_settings['fps']
+        args = [
+            '-c:v', 'libx264',
+            '-tune', self.still_image_settings['tune'],
+            '-preset', self.youtube_settings['preset'],
+            '-crf', self.youtube_settings['crf'],
+            '-r', fps,
+            '-g', str(int(float(fps) * self.still_image_settings['gop_seconds'])),
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart'
+        ]
+        if not prescaled:
+            # Pre-scaling failed; let FFmpeg letterbox it instead
+            args[2:2] = ['-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2']
+        return args
+    
+    def _report_encode_speed(self, duration: Optional[float], encode_time: float) -> Optional[float]:
+        """Print and return how many seconds of video were encoded per second of wall time"""
+        if not duration or encode_time <= 0:
             return None
+        speed_ratio = duration / encode_time
+        mode = 'still-image' if self.still_image_mode else 'standard'
+        print(f"⚡ Encode speed: {speed_ratio:.1f}x realtime ({mode} profile)")
+        return speed_ratio
+    
+    def _render_profile(self, variant: str, **extra) -> Dict[str, Any]:
+        """Everything besides the input bytes that determines the rendered file (render cache key)"""
+        return {
+            'version': RENDER_PROFILE_VERSION,
+            'variant': variant,
+            'youtube_settings': self.youtube_settings,
+            'still_image_mode': self.still_image_mode,
+            'still_image_settings': self.still_image_settings,
+            **extra
+        }
+    
+    @staticmethod
+    def _is_remote(source: str) -> bool:
+        return source.startswith(('http://', 'https://'))
+    
+    def _remote_audio_key(self, url: str) -> Optional[str]:
+        """Render cache key for remote audio, or None when the URL's content can't be pinned down
+        
+        Immutable clip URLs are keyed by URL. Anything else is revalidated with
+        a HEAD request and keyed by its ETag / Last-Modified / Content-Length,
+        so a URL whose content changes never returns a stale render.
+        """
+        if urlparse(url).hostname in IMMUTABLE_AUDIO_HOSTS:
+            return f"url:{url}"
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException:
+            return None
+        validators = [response.headers.get(name, '') for name in ('ETag', 'Last-Modified', 'Content-Length')]
+        if not (validators[0] or validators[1]):
+            return None
+        return f"url:{url}:{':'.join(validators)}"
+    
+    def _audio_feeder(self, url: str, digest, stream_state: Dict[str, Any]) -> Callable:
+        """Stream ``url`` into FFmpeg's stdin chunk by chunk, hashing the bytes on the way"""
+        def feed(stdin):
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+            try:
+                with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        digest.update(chunk)
+                        stdin.write(chunk)
+                        stream_state['bytes'] += len(chunk)
+                stream_state['complete'] = True
+            except BrokenPipeError:
+                raise  # FFmpeg stopped reading; the render queue handles it
+            except Exception as e:
+                stream_state['error'] = str(e)
+        return feed
+    
+    def _render(self, ffmpeg_cmd: list, duration: Optional[float], priority: int = RENDER_PRIORITY_NORMAL,
+                render_tag: Optional[str] = None, on_progress: Optional[Callable] = None,
+                feed: Optional[Callable] = None) -> tuple:
+        """Run FFmpeg through the shared render queue; returns (result, encode seconds excluding queue wait)"""
+        # Generous ceiling: still-image encodes run far faster than realtime. Without a known
+        # duration only the queue's stall watchdog applies
+        timeout = max(600, duration * 2) if duration else None
+        job = get_render_queue().submit(ffmpeg_cmd, priority=priority, timeout=timeout, duration=duration,
+                                        progress=on_progress, tag=render_tag, feed=feed)
+        result = job.future.result()
+        return result, time.time() - (job.started_at or job.submitted_at)
+    
+    def _encode(self, audio_source: str, image_path: str, output_path: str, output_args: list,
+                duration: Optional[float], profile: Dict[str, Any], priority: int = RENDER_PRIORITY_NORMAL,
+                render_tag: Optional[str] = None, on_progress: Optional[Callable] = None) -> tuple:
+        """Encode audio + looped still image into ``output_path``; returns (result, encode seconds, cache hit)
+        
+        Remote audio is streamed into FFmpeg while it downloads and is never
+        written to disk. Renders are reused through the render cache: local
+        audio is looked up by content, remote audio by URL (an alias of the
+        content key stored after the first render, see _remote_audio_key()).
+        """
+        remote = self._is_remote(audio_source)
+        cache = get_render_cache() if self.render_cache_enabled else None
+        lookup_key = None
+        if cache:
+            image_digest = file_digest(image_path)
+            audio_key = self._remote_audio_key(audio_source) if remote else file_digest(audio_source)
+            lookup_key = cache.make_key(audio_key, image_digest, profile) if audio_key else None
+            if lookup_key and cache.fetch(lookup_key, output_path):
+                return subprocess.CompletedProcess([], 0, '', ''), 0.0, True
+        
+        audio_digest = hashlib.sha256()
+        stream_state = {'bytes': 0, 'complete': False, 'error': None}
+        
+        still_image = self.prepare_still_image(image_path) if self.still_image_mode else image_path
+        ffmpeg_cmd = [
+            'ffmpeg', '-y',  # Overwrite output file
+            '-i', 'pipe:0' if remote else audio_source,  # Audio first (streamed when remote)
+            *self._image_input_args(still_image),  # Loop static image
+            *self._video_encode_args(still_image != image_path),  # Video codec
+            '-c:a', 'aac',          # Audio codec
+            '-b:a', '128k',         # Audio bitrate
+            *output_args,
+            output_path
+        ]
+        
+        # The old output may be a hardlink into the render cache, so replace it rather than overwrite in place
+        Path(output_path).unlink(missing_ok=True)
+        try:
+            result, encode_time = self._render(
+                ffmpeg_cmd, duration, priority, render_tag, on_progress,
+                feed=self._audio_feeder(audio_source, audio_digest, stream_state) if remote else None
+            )
+        finally:
+            if still_image != image_path:
+                Path(still_image).unlink(missing_ok=True)
+        
+        if stream_state['error']:
+            # FFmpeg saw a clean EOF, so the file would look valid while missing audio
+            Path(output_path).unlink(missing_ok=True)
+            return subprocess.CompletedProcess(ffmpeg_cmd, 1, '', f"Audio download failed: {stream_state['error']}"), encode_time, False
+        
+        if cache and result.returncode == 0:
+            if not remote:
+                cache.store(lookup_key, output_path)
+            elif stream_state['complete']:
+                alias_keys = [lookup_key] if lookup_key else []
+                cache.store(cache.make_key(audio_digest.hexdigest(), image_digest, profile), output_path, *alias_keys)
+            elif lookup_key:
+                # FFmpeg stopped before the download ended (e.g. -t), so only the URL identifies the render
+                cache.store(lookup_key, output_path)
+        return result, encode_time, False
     
     def create_video(self, music_url: str, thumbnail_url: str, output_path: str, 
-                    title: str = "Generated Music Video") -> Dict[str, Any]:
+                    title: str = "Generated Music Video", priority: int = RENDER_PRIORITY_NORMAL,
+                    render_tag: Optional[str] = None, on_progress: Optional[Callable] = None) -> Dict[str, Any]:
         """
         Create optimized video from audio URL + thumbnail URL
         
         Args:
-            music_url: URL to audio file
+            music_url: URL to audio file (streamed into FFmpeg) or a local path / file:// URL
             thumbnail_url: URL to thumbnail image  
             output_path: Path where to save the final video
             title: Video title for metadata
+            priority: Render queue priority (lower runs first)
+            render_tag: Tag for cancelling the render, e.g. the task id
+            on_progress: Called with FFmpeg progress (fraction, out_time, speed, fps, eta_seconds) while encoding
             
         Returns:
             Dict with success status, file paths, and metadata
         """
+        temp_thumbnail = self.temp_dir / f"thumb_{uuid.uuid4().hex}.jpg"
         try:
             print(f"🎥 Creating video: {title}")
             print(f"🎵 Audio: {music_url}")
             print(f"🖼️ Thumbnail: {thumbnail_url}")
             
-            # Create temporary files
-            temp_audio = self.temp_dir / f"audio_{int(time.time())}.mp3"
-            temp_thumbnail = self.temp_dir / f"thumb_{int(time.time())}.jpg"
-            
             # Ensure output directory exists
             Path(output_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Step 1: Download audio
-            if not self.download_file(music_url, str(temp_audio), "audio"):
+            # Step 1: Resolve audio - remote audio is streamed straight into FFmpeg, local files are read in place
+            audio_source = music_url[len('file://'):] if music_url.startswith('file://') else music_url
+            if not self._is_remote(audio_source) and not Path(audio_source).exists():
+                print(f"❌ Local file not found: {audio_source}")
                 return {'success': False, 'error': 'Failed to download audio'}
             
             # Step 2: Download thumbnail
             if not self.download_file(thumbnail_url, str(temp_thumbnail), "thumbnail"):
                 return {'success': False, 'error': 'Failed to download thumbnail'}
             
-            # Step 3: Get audio duration for video length
-            duration = self.get_audio_duration(str(temp_audio))
-            if not duration:
-                duration = 180  # Default 3 minutes if can't detect
-            
-            # Step 4: Create video with FFmpeg (YouTube optimized)
-            print(f"🔄 Creating {duration:.1f}s video with FFmpeg...")
-            
-            # Simplified FFmpeg command for better compatibility
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # Overwrite output file
-                '-i', str(temp_audio),                     # Audio file first
-                '-loop', '1', '-i', str(temp_thumbnail),  # Loop static image
-                '-c:v', 'libx264',      # Video codec
-                '-c:a', 'aac',          # Audio codec  
-                '-b:a', '128k',         # Audio bitrate
-                '-pix_fmt', 'yuv420p',  # Pixel format
-                '-shortest',            # End when shortest stream ends
-                '-metadata', f'title={title}',
-                output_path
-            ]
-            
-            # Execute FFmpeg
-            print("🔄 Running FFmpeg...")
-            start_time = time.time()
-            
-            # Execute with proper process handling
-            try:
-                result = subprocess.run(
-                    ffmpeg_cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=None  # No timeout - let it complete
-                )
-            except subprocess.TimeoutExpired:
-                print("⚠️ FFmpeg timeout - but may have succeeded")
-                # Check if output file exists and has reasonable size
-                if Path(output_path).exists() and Path(output_path).stat().st_size > 1000:
-                    print("✅ Video file created despite timeout")
-                    result = type('Result', (), {'returncode': 0})()  # Mock success
-                else:
-                    raise
+            # Step 3: Get audio duration for video length (ffprobe reads just the headers of a URL)
+            duration = self.get_audio_duration(audio_source)
+            
+            # Step 4: Create video with FFmpeg (YouTube optimized), reusing an identical earlier render
+            print(f"🔄 Creating {duration or 0:.1f}s video with FFmpeg...")
+            print("🔄 Queueing FFmpeg render...")
+            result, encode_time, cache_hit = self._encode(
+                audio_source, str(temp_thumbnail), output_path,
+                [
+                    '-shortest',            # End when shortest stream ends
+                    '-metadata', f'title={title}'
+                ],
+                duration, self._render_profile('create_video', title=title),
+                priority, render_tag, on_progress
+            )
             
-            encode_time = time.time() - start_time
+            speed_ratio = self._report_encode_speed(duration, encode_time)
             
             # Check success - either return code 0 OR output file exists with good size
             output_exists = Path(output_path).exists()
@@ -210,16 +376,15 @@ class VideoCreator:
                 print(f"📊 Size: {file_size_mb:.1f} MB")
                 print(f"⏱️ Encoding time: {encode_time:.1f}s")
                 
-                # Cleanup temp files
-                temp_audio.unlink(missing_ok=True)
-                temp_thumbnail.unlink(missing_ok=True)
-                
                 return {
                     'success': True,
                     'video_path': output_path,
                     'file_size_mb': file_size_mb,
-                    'duration_seconds': duration,
+                    'duration_seconds': duration or 180,
                     'encoding_time_seconds': encode_time,
+                    'encode_speed_ratio': speed_ratio,
+                    'encoding_profile': 'still_image' if self.still_image_mode else 'standard',
+                    'cache_hit': cache_hit,
                     'audio_url': music_url,
                     'thumbnail_url': thumbnail_url,
                     'resolution': self.youtube_settings['resolution'],
@@ -231,10 +396,6 @@ class VideoCreator:
                 error_msg = result.stderr or result.stdout or "Unknown FFmpeg error"
                 print(f"❌ FFmpeg failed: {error_msg}")
                 
-                # Cleanup temp files
-                temp_audio.unlink(missing_ok=True)
-                temp_thumbnail.unlink(missing_ok=True)
-                
                 return {
                     'success': False, 
                     'error': f'FFmpeg encoding failed: {error_msg}',
@@ -249,11 +410,19 @@ class VideoCreator:
         except Exception as e:
             print(f"❌ Video creation error: {e}")
             return {'success': False, 'error': str(e)}
+        
+        finally:
+            # Cleanup temp files
+            temp_thumbnail.unlink(missing_ok=True)
     
     def create_video_from_audio_and_image(self, audio_path: str, image_path: str, 
-                                         output_path: str, title: str = "Generated Music Video") -> bool:
+                                         output_path: str, title: str = "Generated Music Video",
+                                         priority: int = RENDER_PRIORITY_NORMAL,
+                                         render_tag: Optional[str] = None) -> bool:
         """
         Simplified video creation with better error handling
+        
+        ``audio_path`` may also be an http(s) URL, which is streamed into FFmpeg.
         """
         try:
             print(f"🎥 Creating video: {title}")
@@ -261,7 +430,7 @@ class VideoCreator:
             print(f"🖼️ Image: {image_path}")
             
             # Validate input files
-            if not Path(audio_path).exists():
+            if not self._is_remote(audio_path) and not Path(audio_path).exists():
                 print(f"❌ Audio file not found: {audio_path}")
                 return False
                 
@@ -272,10 +441,10 @@ class VideoCreator:
             # Get audio duration
             duration = self.get_audio_duration(audio_path)
             if not duration or duration <= 0:
-                duration = 180  # Default 3 minutes
-                print(f"⚠️ Could not detect duration, using {duration}s")
-            
-            print(f"⏱️ Audio duration: {duration} seconds")
+                duration = None
+                print("⚠️ Could not detect duration, encoding until the audio ends")
+            else:
+                print(f"⏱️ Audio duration: {duration} seconds")
             
             # Ensure output directory exists and create output file path
             output_dir = Path(output_path)
@@ -287,36 +456,23 @@ class VideoCreator:
             video_file = output_dir / f"{safe_title}.mp4"
             
             print(f"📁 Output: {video_file}")
-            
-            # Simple FFmpeg command that works reliably
-            import subprocess
-            
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # Overwrite existing
-                '-i', audio_path,  # Audio input
-                '-loop', '1', '-i', image_path,  # Image input (looped)
-                '-c:v', 'libx264',  # Video codec
-                '-c:a', 'aac',      # Audio codec
-                '-b:a', '128k',     # Audio bitrate
-                '-pix_fmt', 'yuv420p',  # Pixel format
-                '-t', str(duration),    # Duration
-                '-shortest',        # Stop when shortest input ends
-                '-f', 'mp4',        # Force MP4 format
-                str(video_file)     # Output
-            ]
-            
             print("🔄 Running simplified FFmpeg...")
             
-            # Run FFmpeg with proper input handling
-            result = subprocess.run(
-                ffmpeg_cmd,
-                input='',  # Send empty input to avoid hanging on "Press [q] to stop"
-                capture_output=True,
-                text=True,
-                timeout=120  # 2 minute timeout
+            # Run FFmpeg through the shared render queue (stdin only ever carries streamed audio,
+            # so it never waits for "q")
+            result, encode_time, cache_hit = self._encode(
+                audio_path, image_path, str(video_file),
+                [
+                    *(['-t', str(duration)] if duration else []),  # Duration
+                    '-shortest',        # Stop when shortest input ends
+                    '-f', 'mp4'         # Force MP4 format
+                ],
+                duration, self._render_profile('audio_and_image'),
+                priority, render_tag
             )
             
-            print(f"📊 FFmpeg exit code: {result.returncode}")
+            print(f"📊 FFmpeg exit code: {result.returncode}{' (render cache hit)' if cache_hit else ''}")
+            self._report_encode_speed(duration, encode_time)
             
             # Check if video was created successfully
             if video_file.exists():
@@ -351,7 +507,8 @@ class VideoCreator:
             return False
     def create_video_with_progress(self, music_url: str, thumbnail_url: str, 
                                  output_path: str, title: str = "Generated Music Video",
-                                 progress_callback=None) -> Dict[str, Any]:
+                                 progress_callback=None, priority: int = RENDER_PRIORITY_NORMAL,
+                                 render_tag: Optional[str] = None) -> Dict[str, Any]:
         """Create video with progress callbacks for UI updates"""
         
         def update_progress(step: str, percent: int):
@@ -360,12 +517,27 @@ class VideoCreator:
             else:
                 print(f"🎥 [{percent}%] {step}")
         
+        def clock(seconds: float) -> str:
+            return time.strftime('%H:%M:%S' if seconds >= 3600 else '%M:%S', time.gmtime(seconds))
+        
+        def encode_progress(info: Dict[str, Any]):
+            # Encoding covers 25-95% of the overall progress
+            step = f"Encoding {clock(info['out_time'])}"
+            if info['duration']:
+                step += f" / {clock(info['duration'])}"
+            if info['speed']:
+                step += f" at {info['speed']:.1f}x"
+            if info['eta_seconds'] is not None:
+                step += f", ETA {clock(info['eta_seconds'])}"
+            update_progress(step, 25 + int(70 * info['fraction']))
+        
         try:
             update_progress("Starting video creation", 5)
             
-            # Download phase
-            update_progress("Downloading audio", 20)
-            result = self.create_video(music_url, thumbnail_url, output_path, title)
+            # Download phase (audio itself is streamed during encoding)
+            update_progress("Preparing audio and thumbnail", 20)
+            result = self.create_video(music_url, thumbnail_url, output_path, title,
+                                       priority=priority, render_tag=render_tag, on_progress=encode_progress)
             
             if result['success']:
                 update_progress("Video creation completed", 100)
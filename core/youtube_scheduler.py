@@ -10,13 +10,13 @@ import time
 import schedule
 import logging
 from datetime import datetime, timedelta
-import sqlite3
 from pathlib import Path
 
 # Add the parent directory to sys.path to import our modules
 sys.path.append(str(Path(__file__).parent.parent))
 
 from core.youtube_api_client import youtube_client
+from core.database.sqlite_connections import get_connection
 
 class YouTubeDataScheduler:
     """Automatic YouTube data synchronization scheduler"""
@@ -68,7 +68,7 @@ class YouTubeDataScheduler:
     def _get_channels_to_sync(self):
         """Get channels that need syncing"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT id, youtube_channel_id 
@@ -86,7 +86,7 @@ class YouTubeDataScheduler:
         updated_count = 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 for i, youtube_id in enumerate(youtube_ids):
@@ -117,8 +117,6 @@ class YouTubeDataScheduler:
                         else:
                             self.logger.warning(f"⚠️ Failed to get data for channel {db_id}: {stats.get('error', 'Unknown error')}")
                 
-                conn.commit()
-                
         except Exception as e:
             self.logger.error(f"Error updating database: {e}")
             
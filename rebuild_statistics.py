@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Rebuild the trigger-maintained dashboard statistics from the source tables.
+Run this if the stats_counters table is suspected to have drifted.
+"""
+
+import sys
+
+from core.database.youtube_channels_db import get_channels_db
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "data/youtube_channels.db"
+    db = get_channels_db(db_path)
+
+    print(f"🔧 Rebuilding statistics counters in {db_path}...")
+    if not db.rebuild_statistics():
+        print("❌ Rebuild failed - see log above")
+        sys.exit(1)
+
+    print(f"✅ Channels: {db.get_statistics()}")
+    print(f"✅ Video gallery: {db.get_video_gallery_stats()}")
+    print(f"✅ Music queue: {db.get_music_queue_stats()}")
+
+
+if __name__ == "__main__":
+    main()
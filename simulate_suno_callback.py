@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Suno's callBackUrl notifications.
+POSTs sample "first" and "complete" payloads to the admin app's /api/suno/callback
+so the webhook path can be exercised without a real Suno generation.
+
+Usage:
+    python simulate_suno_callback.py <suno_task_id> [--url http://localhost:3000] [--token TOKEN] [--error]
+"""
+
+import os
+import sys
+import time
+import argparse
+import requests
+from dotenv import load_dotenv
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample_clip(task_id, number, ready=True):
+    """Build one clip in Suno's callback (snake_case) format"""
+    clip_id = f"{task_id[:8]}-clip-{number}"
+    return {
+        'id': clip_id,
+        'audio_url': f"https://example.com/audio/{clip_id}.mp3" if ready else '',
+        'source_audio_url': f"https://example.com/audio/{clip_id}.mp3" if ready else '',
+        'stream_audio_url': f"https://example.com/stream/{clip_id}",
+        'source_stream_audio_url': f"https://example.com/stream/{clip_id}",
+        'image_url': f"https://example.com/image/{clip_id}.jpeg",
+        'source_image_url': f"https://example.com/image/{clip_id}.jpeg",
+        'prompt': '[Verse] Simulated callback lyrics',
+        'model_name': 'chirp-v4-5',
+        'title': f"Simulated Track {number}",
+        'tags': 'lofi, chill',
+        'createTime': '2025-01-01 00:00:00',
+        'duration': 180.0 if ready else None
+    }
+
+
+def build_payload(task_id, callback_type):
+    """Build a callback payload for the given stage"""
+    if callback_type == 'error':
+        return {
+            'code': 501,
+            'msg': 'Audio generation failed (simulated)',
+            'data': {'callbackType': 'error', 'task_id': task_id, 'data': None}
+        }
+    ready = callback_type == 'complete'
+    clips = [sample_clip(task_id, 1, ready)]
+    if ready:
+        clips.append(sample_clip(task_id, 2, ready))
+    return {
+        'code': 200,
+        'msg': 'All generated successfully.' if ready else 'First track generated.',
+        'data': {'callbackType': callback_type, 'task_id': task_id, 'data': clips}
+    }
+
+
+def send(url, token, payload):
+    params = {'token': token} if token else None
+    response = requests.post(f"{url}/api/suno/callback", json=payload, params=params, timeout=10)
+    print(f"📬 {payload['data']['callbackType']:>8} -> {response.status_code} {response.text.strip()}")
+    return response.ok
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Simulate Suno callBackUrl notifications')
+    parser.add_argument('task_id', help='Suno task ID the app is waiting on')
+    parser.add_argument('--url', default='http://localhost:3000', help='Admin app base URL')
+    parser.add_argument('--token', default=os.getenv('SUNO_CALLBACK_TOKEN'), help='Callback token (defaults to SUNO_CALLBACK_TOKEN)')
+    parser.add_argument('--delay', type=float, default=2.0, help='Seconds between callbacks')
+    parser.add_argument('--error', action='store_true', help='Send an error callback instead of success')
+    args = parser.parse_args()
+
+    print(f"🧪 Simulating Suno callbacks for task {args.task_id}")
+    stages = ['text', 'error'] if args.error else ['text', 'first', 'complete']
+    for i, stage in enumerate(stages):
+        if i:
+            time.sleep(args.delay)
+        if not send(args.url, args.token, build_payload(args.task_id, stage)):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
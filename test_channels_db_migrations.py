@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test script to verify YouTube channels database migrations, statistics counters and track claiming
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database.youtube_channels_db import YouTubeChannelsDB, SCHEMA_MIGRATIONS
+
+def create_baseline_database(db_path):
+    """Create a database with the original, pre-versioned schema holding duplicate clips and videos"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # The original schema as created before schema_version existed
+    baseline = YouTubeChannelsDB.__new__(YouTubeChannelsDB)
+    baseline._migration_initial_schema(cursor)
+    baseline._migration_oauth_columns(cursor)
+
+    cursor.execute('''
+        INSERT INTO youtube_channels (channel_uuid, channel_name, primary_genre, total_subscribers, total_views)
+        VALUES (?, 'Baseline Channel', 'lofi', 120, 4500)
+    ''', (str(uuid.uuid4()),))
+    channel_id = cursor.lastrowid
+
+    expiry_date = (datetime.now() + timedelta(days=30)).isoformat()
+    for clip_id, status in [('clip-a', 'available'), ('clip-a', 'used'), ('clip-a', 'available'),
+                            ('clip-b', 'available'), ('clip-b', 'available'), ('clip-c', 'expired')]:
+        cursor.execute('''
+            INSERT INTO music_queue (queue_uuid, suno_task_id, suno_clip_id, channel_id, genre,
+                                     title, audio_url, vocal_type, status, expiry_date)
+            VALUES (?, 'task-1', ?, ?, 'lofi', ?, 'https://example.com/a.mp3', 'instrumental', ?, ?)
+        ''', (str(uuid.uuid4()), clip_id, channel_id, f'Track {clip_id}', status, expiry_date))
+
+    for file_path, youtube_video_id in [('output/videos/one.mp4', None), ('output/videos/one.mp4', 'yt123'),
+                                        ('output/videos/two.mp4', None), ('output/videos/two.mp4', None)]:
+        cursor.execute('''
+            INSERT INTO video_gallery (video_uuid, title, file_path, file_size, genre, youtube_video_id)
+            VALUES (?, 'Video', ?, 1000, 'lofi', ?)
+        ''', (str(uuid.uuid4()), file_path, youtube_video_id))
+
+    conn.commit()
+    conn.close()
+    return channel_id
+
+def assert_counters_match_rebuild(db, label):
+    """Trigger-maintained counters must equal a full recount of the source tables"""
+    maintained = db._read_statistics()
+    assert db.rebuild_statistics(), "rebuild_statistics() failed"
+    rebuilt = db._read_statistics()
+    assert maintained == rebuilt, f"{label}: counters {maintained} != rebuild {rebuilt}"
+    print(f"✅ Counters match a rebuild {label}")
+
+def test_upgrade_baseline_database():
+    """Test upgrading a pre-versioned database to the latest schema"""
+    print("🧪 Testing baseline database upgrade...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'baseline.db')
+        channel_id = create_baseline_database(db_path)
+        check_upgraded_database(db_path, channel_id)
+
+def check_upgraded_database(db_path, channel_id):
+    """Open (and so migrate) a baseline database and check the result"""
+    db = YouTubeChannelsDB(db_path)
+
+    conn = sqlite3.connect(db_path)
+    versions = [row[0] for row in conn.execute('SELECT version FROM schema_version ORDER BY version')]
+    assert versions == [m[0] for m in SCHEMA_MIGRATIONS], f"Unexpected schema versions: {versions}"
+    print(f"✅ Schema upgraded to version {versions[-1]}")
+
+    clips = dict(conn.execute('SELECT suno_clip_id, status FROM music_queue').fetchall())
+    count = conn.execute('SELECT COUNT(*) FROM music_queue').fetchone()[0]
+    assert count == 3, f"Expected 3 clips after dedup, found {count}"
+    assert clips['clip-a'] == 'used', "Dedup should keep the clip that was already used"
+    videos = conn.execute('SELECT file_path, youtube_video_id FROM video_gallery ORDER BY file_path').fetchall()
+    assert videos == [('output/videos/one.mp4', 'yt123'), ('output/videos/two.mp4', None)], videos
+    print("✅ Duplicate clips and videos removed, uploaded/used rows kept")
+
+    try:
+        conn.execute('''
+            INSERT INTO music_queue (queue_uuid, suno_task_id, suno_clip_id, channel_id, genre,
+                                     title, audio_url, vocal_type)
+            VALUES (?, 'task-2', 'clip-b', ?, 'lofi', 'Again', 'https://example.com/b.mp3', 'vocal')
+        ''', (str(uuid.uuid4()), channel_id))
+        raise AssertionError("Duplicate suno_clip_id was accepted")
+    except sqlite3.IntegrityError:
+        print("✅ suno_clip_id is unique")
+    conn.close()
+
+    # Re-opening must not re-apply anything
+    YouTubeChannelsDB(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM schema_version').fetchone()[0] == len(SCHEMA_MIGRATIONS)
+    conn.close()
+    print("✅ Re-opening the database applies no migrations")
+
+    assert_counters_match_rebuild(db, "after the upgrade")
+
+def test_statistics_counters():
+    """Test that counters follow inserts, updates and deletes"""
+    print("\n🧪 Testing trigger-maintained statistics counters...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'counters.db')
+        channel_id = create_baseline_database(db_path)
+        check_statistics_counters(YouTubeChannelsDB(db_path), channel_id)
+
+def check_statistics_counters(db, channel_id):
+    """Exercise every counted table through the public API"""
+
+    result = db.add_channel({'channel_name': 'Second Channel', 'primary_genre': 'jazz'})
+    assert result.get('success'), result
+    second_channel_id = result['channel_id']
+
+    added = db.add_to_music_queue([{
+        'suno_task_id': 'task-3', 'suno_clip_id': f'clip-new-{i}', 'channel_id': channel_id,
+        'genre': 'lofi', 'title': f'New {i}', 'audio_url': 'https://example.com/n.mp3',
+        'vocal_type': 'vocal' if i % 2 else 'instrumental'
+    } for i in range(4)] + [{
+        'suno_task_id': 'task-3', 'suno_clip_id': 'clip-b', 'channel_id': channel_id,
+        'genre': 'lofi', 'title': 'Duplicate', 'audio_url': 'https://example.com/b.mp3',
+        'vocal_type': 'vocal'
+    }], original_task_id='bg-task')
+    assert added == 4, f"Expected 4 new tracks (duplicate skipped), added {added}"
+
+    gallery = db.add_videos_to_gallery([
+        {'title': 'Three', 'file_path': 'output/videos/three.mp4', 'genre': 'jazz'},
+        {'title': 'One again', 'file_path': 'output/videos/one.mp4', 'genre': 'lofi'}
+    ])
+    assert gallery['success'], gallery
+    assert_counters_match_rebuild(db, "after inserts and upserts")
+
+    db.claim_tracks(channel_id, genre='lofi', count=2, task_id='claim-test')
+    db.update_channel(second_channel_id, {'channel_name': 'Renamed Channel', 'primary_genre': 'ambient'})
+    assert_counters_match_rebuild(db, "after updates")
+
+    video_id = gallery['videos'][0]['video_id']
+    assert db.delete_video_from_gallery(video_id)['success']
+    assert db.delete_channel(second_channel_id)['success']
+    assert_counters_match_rebuild(db, "after deletes")
+
+def test_claim_tracks_exclusive():
+    """Test that concurrent claim_tracks() calls never hand out the same track twice"""
+    print("\n🧪 Testing claim_tracks exclusivity...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_claim_tracks_exclusive(YouTubeChannelsDB(os.path.join(tmp_dir, 'claims.db')))
+
+def check_claim_tracks_exclusive(db):
+    """Drain a queue from 8 threads at once"""
+    result = db.add_channel({'channel_name': 'Claim Channel', 'primary_genre': 'lofi'})
+    channel_id = result['channel_id']
+
+    track_count = 40
+    db.add_to_music_queue([{
+        'suno_task_id': 'task-claim', 'suno_clip_id': f'claim-{i}', 'channel_id': channel_id,
+        'genre': 'lofi', 'title': f'Claim {i}', 'audio_url': 'https://example.com/c.mp3',
+        'vocal_type': 'instrumental'
+    } for i in range(track_count)])
+
+    claimed = []
+    claimed_lock = threading.Lock()
+    start = threading.Barrier(8)
+
+    def worker(worker_id):
+        start.wait()
+        while True:
+            tracks = db.claim_tracks(channel_id, genre='lofi', vocal_type='instrumental',
+                                     count=3, task_id=f'worker-{worker_id}')
+            if not tracks:
+                return
+            with claimed_lock:
+                claimed.extend(track['id'] for track in tracks)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == len(set(claimed)), "A track was claimed more than once"
+    assert len(claimed) == track_count, f"Expected {track_count} claimed tracks, got {len(claimed)}"
+    print(f"✅ {track_count} tracks claimed by 8 threads, none twice")
+
+    conn = sqlite3.connect(db.db_path)
+    available = conn.execute("SELECT COUNT(*) FROM music_queue WHERE status = 'available'").fetchone()[0]
+    conn.close()
+    assert available == 0, f"{available} tracks still available"
+    assert_counters_match_rebuild(db, "after concurrent claims")
+
+if __name__ == "__main__":
+    print("🧪 YouTube Channels Database Test Suite")
+    print("=" * 50)
+
+    test_upgrade_baseline_database()
+    test_statistics_counters()
+    test_claim_tracks_exclusive()
+
+    print("\n" + "=" * 50)
+    print("🏁 Test suite completed!")